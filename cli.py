@@ -1,31 +1,30 @@
 """Convert JSON to CSV for open_parliament_at source."""
 
+import collections
 import csv
+import heapq
+import itertools
 import json
 import logging
 import os
-import re
-import subprocess
+import tempfile
 
 import click
 
+from open_parliament import columnar, jsonlines, vocabulary
+from open_parliament.convert import OUTPUT_FIELDS, convert_mp
+from open_parliament.database import MPDatabase
+from open_parliament.diff import (
+    ADDED,
+    CSV_FIELDS,
+    MODIFIED,
+    REMOVED,
+    change_to_row,
+    diff_items,
+)
 
 logger = logging.getLogger(__name__)
 
-WANTED_FIELDS = [
-    "first_name",
-    "last_name",
-    "salutation",
-    "title",
-    "political_affiliation",
-    "state",
-    "occupation",
-    "place_of_birth",
-    "date_of_birth",
-]
-
-party_extract_re = re.compile(r"^.* \((?P<party>\w+)\)$")
-
 
 @click.group()
 def cli():
@@ -34,99 +33,565 @@ def cli():
 
 @cli.command()
 @click.argument("output", default="-")
-def scrape(output):
-    """Command to scrape parlament.gv.at."""
-    proc = subprocess.run(
-        [
-            "scrapy",
-            "runspider",
-            os.path.join(os.path.dirname(__file__), "spider.py"),
-            "-o",
-            output,
-            "--loglevel=INFO",
+@click.option(
+    "--csv",
+    "as_csv",
+    is_flag=True,
+    help="Write the CSV rows of convert-to-csv instead of JSON Lines.",
+)
+@click.option(
+    "--compression",
+    type=click.Choice([jsonlines.GZIP, jsonlines.ZSTD]),
+    help="Compress the JSON Lines, by default from the output's extension (.gz or .zst).",
+)
+@click.option(
+    "--backend",
+    type=click.Choice(["bs4", "lxml"]),
+    default="bs4",
+    show_default=True,
+    help="The parser backend.",
+)
+@click.option(
+    "--store", help="Path of the page store used to skip unchanged MPs' pages."
+)
+@click.option("--base", help="Scrape a mirror of parlament.gv.at at this URL.")
+@click.option(
+    "--metrics",
+    type=click.Path(dir_okay=False),
+    help="Write the crawl's metrics to this Prometheus textfile.",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Profile the parsers and log their top functions and allocation sites.",
+)
+@click.option(
+    "--trace",
+    type=click.Path(dir_okay=False),
+    help="Write a trace of the requests for chrome://tracing or Perfetto to this file.",
+)
+@click.option(
+    "--sqlite",
+    type=click.Path(dir_okay=False),
+    help="Also write the items to this SQLite database.",
+)
+@click.option(
+    "--record",
+    type=click.Path(file_okay=False),
+    help="Record all responses in a Scrapy HTTP cache directory.",
+)
+@click.option(
+    "--replay",
+    type=click.Path(exists=True),
+    help="Serve all responses from a Scrapy HTTP cache directory or a WARC file.",
+)
+@click.option(
+    "--workers",
+    type=int,
+    default=0,
+    show_default=True,
+    help="Number of processes parsing pages, 0 parses in the crawling process.",
+)
+@click.option(
+    "--engine",
+    type=click.Choice(["scrapy", "asyncio"]),
+    default="scrapy",
+    show_default=True,
+    help="Crawl with Scrapy or with the lightweight asyncio engine (requires aiohttp).",
+)
+@click.option(
+    "--concurrency",
+    type=int,
+    default=16,
+    show_default=True,
+    help="Maximum number of concurrent requests.",
+)
+@click.option(
+    "--periods",
+    default="AKT",
+    show_default=True,
+    help="Experimental: comma separated legislative periods, e.g. AKT,XXV,XXIV.",
+)
+@click.option(
+    "--chambers",
+    default="NR",
+    show_default=True,
+    help="Experimental: comma separated chambers, NR (Nationalrat) and/or BR (Bundesrat).",
+)
+def scrape(
+    output,
+    as_csv,
+    compression,
+    backend,
+    store,
+    base,
+    metrics,
+    profile,
+    trace,
+    sqlite,
+    record,
+    replay,
+    workers,
+    engine,
+    concurrency,
+    periods,
+    chambers,
+):
+    """
+    Command to scrape parlament.gv.at.
+
+    With --replay nothing is downloaded, requests missing in the archive are skipped.
+
+    JSON Lines are written with the fast exporter of open_parliament.exporters, compressed
+    with gzip or zstd if the output ends with .gz or .zst or with --compression.
+
+    The asyncio engine starts faster and needs less memory, but doesn't support --store,
+    --record, --replay, --workers, --metrics, --profile and --trace.
+    """
+    if compression is None and not as_csv:
+        compression = jsonlines.compression_for(output)
+    try:
+        jsonlines.check_compression(compression)
+    except ValueError as error:
+        raise click.ClickException(str(error))
+
+    if engine == "asyncio":
+        options = [
+            ("--store", store),
+            ("--record", record),
+            ("--replay", replay),
+            ("--workers", workers),
+            ("--metrics", metrics),
+            ("--profile", profile),
+            ("--trace", trace),
         ]
+        unsupported = [name for name, value in options if value]
+        if unsupported:
+            raise click.UsageError(
+                "The asyncio engine doesn't support {}.".format(", ".join(unsupported))
+            )
+        scrape_asyncio(
+            output,
+            as_csv,
+            compression,
+            backend,
+            base,
+            sqlite,
+            concurrency,
+            periods,
+            chambers,
+        )
+        return
+
+    # Scrapy is only imported when needed to keep the other commands fast.
+    from scrapy.crawler import CrawlerProcess
+
+    from open_parliament.exporters import FEED_EXPORTERS, FEED_FORMATS
+
+    from spider import NationalratsSpider
+
+    settings = {
+        "LOG_LEVEL": "INFO",
+        "ITEM_PIPELINES": {},
+        "CONCURRENT_REQUESTS": concurrency,
+    }
+    if sqlite:
+        settings["ITEM_PIPELINES"]["open_parliament.pipelines.SqlitePipeline"] = 700
+        settings["SQLITE_OUTPUT"] = sqlite
+    if as_csv:
+        settings["ITEM_PIPELINES"]["open_parliament.pipelines.CsvPipeline"] = 800
+        settings["CSV_OUTPUT"] = output
+    else:
+        settings["FEED_URI"] = "stdout:" if output == "-" else output
+        settings["FEED_FORMAT"] = FEED_FORMATS[compression]
+        settings["FEED_EXPORTERS"] = FEED_EXPORTERS
+    if record:
+        settings.update(
+            {"HTTPCACHE_ENABLED": True, "HTTPCACHE_DIR": os.path.abspath(record)}
+        )
+    if replay and os.path.isdir(replay):
+        settings.update(
+            {
+                "HTTPCACHE_ENABLED": True,
+                "HTTPCACHE_DIR": os.path.abspath(replay),
+                "HTTPCACHE_IGNORE_MISSING": True,
+            }
+        )
+    elif replay:
+        settings["DOWNLOADER_MIDDLEWARES"] = {
+            "open_parliament.middlewares.WarcReplayMiddleware": 950
+        }
+        settings["WARC_REPLAY"] = replay
+
+    process = CrawlerProcess(settings)
+    process.crawl(
+        NationalratsSpider,
+        backend=backend,
+        store=store,
+        base=base,
+        workers=workers,
+        periods=periods,
+        chambers=chambers,
+        metrics=metrics,
+        profile=profile,
+        trace=trace,
     )
-    return proc.returncode == 0
+    process.start()
+
+
+def scrape_asyncio(
+    output, as_csv, compression, backend, base, sqlite, concurrency, periods, chambers
+):
+    """Scrape with the asyncio engine, writing the items with the spider's pipelines."""
+    from open_parliament import engine, pages, pipelines
+
+    if engine.aiohttp is None:
+        raise click.ClickException(
+            "The asyncio engine requires aiohttp (pip install aiohttp)."
+        )
+    # Scrapy configures logging for its crawls, the engine logs like Scrapy to stderr.
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s [%(name)s] %(levelname)s: %(message)s"
+    )
+    if as_csv:
+        sinks = [pipelines.CsvPipeline(output)]
+    else:
+        sinks = [pipelines.JsonLinesPipeline(output, compression)]
+    if sqlite:
+        sinks.append(pipelines.SqlitePipeline(sqlite))
+
+    def write(item):
+        for sink in sinks:
+            sink.process_item(item, None)
+
+    crawler = engine.Crawler(
+        backend=backend,
+        base=base or pages.BASE,
+        periods=periods,
+        chambers=chambers,
+        concurrency=concurrency,
+    )
+    for sink in sinks:
+        sink.open_spider(None)
+    try:
+        count = crawler.crawl(write)
+    finally:
+        for sink in sinks:
+            sink.close_spider(None)
+    logger.info("Scraped %d items, %d errors", count, crawler.errors)
+
+
+def read_items(jsonfile):
+    """
+    Read scraped items from a JSON or a JSON Lines file.
+
+    Dictionary encoded JSON Lines (see :mod:`open_parliament.vocabulary`) are decoded,
+    gzip and zstd compressed files are decompressed (see :mod:`open_parliament.jsonlines`).
+
+    JSON Lines are read one line at a time, so items are available as soon as they are
+    written to the file. A JSON file has to be read completely first.
+    """
+    jsonfile = jsonlines.decompress(jsonfile)
+    first = jsonfile.readline()
+    while first and not first.strip():
+        first = jsonfile.readline()
+    if first.lstrip().startswith(b"["):
+        yield from jsonlines.loads(first + jsonfile.read())
+        return
+    items = (
+        jsonlines.loads(line)
+        for line in itertools.chain([first], jsonfile)
+        if line.strip()
+    )
+    first_item = next(items, None)
+    if first_item is None:
+        return
+    if vocabulary.is_encoded(first_item):
+        yield from vocabulary.decode_items(items)
+    else:
+        yield first_item
+        yield from items
+
+
+def sort_by_id(items, buffer_size=10000):
+    """
+    Sort items by their id using at most :code:`buffer_size` items in memory.
+
+    Items beyond that are sorted in chunks that are written to temporary files
+    and merged afterwards.
+    """
+
+    def key(mp_data):
+        return int(mp_data["id"])
+
+    chunks = []
+    try:
+        while True:
+            chunk = sorted(itertools.islice(items, buffer_size), key=key)
+            if not chunks and len(chunk) < buffer_size:
+                # Everything fits into memory.
+                yield from chunk
+                return
+            if not chunk:
+                break
+            f = tempfile.TemporaryFile("w+", encoding="utf-8")
+            chunks.append(f)
+            for mp_data in chunk:
+                f.write(json.dumps(mp_data) + "\n")
+            f.seek(0)
+        yield from heapq.merge(*[map(json.loads, f) for f in chunks], key=key)
+    finally:
+        for f in chunks:
+            f.close()
 
 
 @cli.command()
 @click.argument("jsonfile", type=click.File("rb"), default="-")
 @click.argument("output", type=click.File("w"), default="-")
-def convert_to_csv(jsonfile, output):
-    """Command to convert JSON to CSV."""
-    scraped = json.load(jsonfile)
-
-    sorted_input = sorted(scraped, key=lambda x: int(x["id"]))
-
-    contacts = []
-    for mp_data in sorted_input:
-        mp = {"identifier": mp_data["id"]}
-        emails = mp_data.pop("emails")
-        if len(emails) > 0:
-            mp["email"] = emails[0]
-        else:
-            mp["email"] = ""
-            logger.warning(
-                "Contact without email: %s (%s %s)",
-                mp_data["id"],
-                mp_data["first_name"],
-                mp_data["last_name"],
-            )
-        mp.update({k: mp_data[k] for k in WANTED_FIELDS})
-        if "committees" in mp_data:
-            committees = sorted(
-                [c["name"] for f in mp_data["committees"].values() for c in f.values()]
-            )
-            mp["committees"] = "," + ",".join(committees) + ","
-        else:
-            mp["committees"] = ""
-        mandates = [m["title"] for m in mp_data["mandates"]]
-        mp["mandates"] = "," + ",".join(mandates) + ","
-        # extract party from political_affiliation field
-        party = party_extract_re.match(mp_data["political_affiliation"])
-        if party and party.group("party"):
-            mp["party"] = party.group("party")
+@click.option(
+    "--stream",
+    is_flag=True,
+    help="Write every row as soon as its item is read instead of sorting by id.",
+)
+@click.option(
+    "--sort-buffer",
+    type=int,
+    default=10000,
+    show_default=True,
+    help="Maximum number of items sorted in memory.",
+)
+def convert_to_csv(jsonfile, output, stream, sort_buffer):
+    """
+    Command to convert JSON or JSON Lines to CSV.
+
+    The rows are sorted by the MPs' ids unless --stream is given.
+    """
+    items = read_items(jsonfile)
+    if not stream:
+        items = sort_by_id(items, sort_buffer)
+
+    csvwriter = csv.DictWriter(output, fieldnames=OUTPUT_FIELDS, extrasaction="ignore")
+    csvwriter.writeheader()
+    for mp_data in items:
+        csvwriter.writerow(convert_mp(mp_data))
+        if stream:
+            output.flush()
+
+
+@cli.command()
+@click.argument("previous", type=click.File("rb"))
+@click.argument("current", type=click.File("rb"))
+@click.argument("output", type=click.File("w"), default="-")
+@click.option(
+    "--csv",
+    "as_csv",
+    is_flag=True,
+    help="Write the changed rows of convert-to-csv instead of JSON Lines.",
+)
+@click.option(
+    "--sort-buffer",
+    type=int,
+    default=10000,
+    show_default=True,
+    help="Maximum number of items sorted in memory.",
+)
+def diff(previous, current, output, as_csv, sort_buffer):
+    """
+    Command to write the MPs added, removed or modified between two scrapes.
+
+    Both snapshots are JSON or JSON Lines. Every change is written as a JSON line with the
+    changed fields of modified MPs and the current items of added and modified ones.
+    With --csv the rows of convert-to-csv are compared instead. The current rows of added
+    and modified MPs are written, removed MPs as rows with only their identifier.
+    """
+    previous = sort_by_id(read_items(previous), sort_buffer)
+    current = sort_by_id(read_items(current), sort_buffer)
+    if as_csv:
+        previous = map(convert_mp, previous)
+        current = map(convert_mp, current)
+        csvwriter = csv.DictWriter(output, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        csvwriter.writeheader()
+
+    counts = collections.Counter()
+    for change in diff_items(previous, current, "identifier" if as_csv else "id"):
+        counts[change["change"]] += 1
+        if as_csv:
+            csvwriter.writerow(change_to_row(change))
         else:
-            mp["party"] = ""
-            logger.warning(
-                "Contact without party: %s (%s %s)",
-                mp_data["id"],
-                mp_data["first_name"],
-                mp_data["last_name"],
-            )
-        contacts.append(mp)
-
-        display_title = ""
-        if mp_data["title"]:
-            display_title = ", " + mp_data["title"]
-        display_party = ""
-        if mp["party"]:
-            display_party = " (" + mp["party"] + ")"
-        mp["display_name"] = "{} {}{}{}".format(
-            mp_data["last_name"], mp_data["first_name"], display_title, display_party
+            output.write(json.dumps(change, ensure_ascii=False) + "\n")
+    logger.info(
+        "%d added, %d removed, %d modified",
+        counts[ADDED],
+        counts[REMOVED],
+        counts[MODIFIED],
+    )
+
+
+@cli.command()
+@click.argument("jsonfile", type=click.File("rb"), default="-")
+@click.argument("database", type=click.Path(dir_okay=False))
+@click.option(
+    "--batch-size",
+    type=int,
+    default=500,
+    show_default=True,
+    help="Number of items written in one transaction.",
+)
+def convert_to_sqlite(jsonfile, database, batch_size):
+    """
+    Command to write JSON or JSON Lines to an SQLite database.
+
+    MPs, mandates and committee memberships are inserted or updated, MPs that didn't change
+    since the last run are skipped.
+    """
+    db = MPDatabase(database)
+    try:
+        changed = db.write(read_items(jsonfile), batch_size)
+    finally:
+        db.close()
+    logger.info("%d MPs changed in %s", changed, database)
+
+
+@cli.command()
+@click.argument("jsonfile", type=click.File("rb"))
+@click.argument("output", type=click.Path(dir_okay=False))
+@click.option(
+    "--format",
+    "format_",
+    type=click.Choice(columnar.FORMATS),
+    default="parquet",
+    show_default=True,
+    help="Parquet or Arrow IPC file.",
+)
+@click.option(
+    "--row-group-size",
+    type=int,
+    default=10000,
+    show_default=True,
+    help="Number of items per row group.",
+)
+def convert(jsonfile, output, format_, row_group_size):
+    """
+    Command to convert JSON or JSON Lines to a columnar file.
+
+    Unlike convert-to-csv this keeps all fields, writes mandates and committees as list
+    columns and dictionary encodes values repeated across MPs. Requires pyarrow.
+    """
+    if columnar.pyarrow is None:
+        raise click.ClickException(
+            "Writing columnar files requires pyarrow (pip install pyarrow)."
         )
+    try:
+        count = columnar.write_table(
+            read_items(jsonfile), output, format_, row_group_size
+        )
+    except ValueError as error:
+        raise click.ClickException(str(error))
+    logger.info("Wrote %d items to %s", count, output)
 
-    output_mapping = [
-        "identifier",
-        "first_name",
-        "last_name",
-        "email",
-        "salutation",
-        "display_name",
-        "title",
-        "party",
-        "political_affiliation",
-        "state",
-        "occupation",
-        "place_of_birth",
-        "date_of_birth",
-        "mandates",
-        "committees",
-    ]
-    csvwriter = csv.DictWriter(output, fieldnames=output_mapping, extrasaction="ignore")
-    csvwriter.writeheader()
-    for item in contacts:
-        csvwriter.writerow(item)
+
+@cli.command()
+@click.argument("jsonfile", type=click.File("rb"), default="-")
+@click.argument("output", type=click.File("w"), default="-")
+def encode(jsonfile, output):
+    """
+    Command to write scraped items as dictionary encoded JSON Lines.
+
+    Values repeated across MPs (parties, states, electoral districts, mandates and committees)
+    are written once and referenced by their ids. convert-to-csv reads the encoded items.
+    """
+    for item in vocabulary.encode_items(read_items(jsonfile)):
+        output.write(json.dumps(item) + "\n")
+
+
+@cli.command()
+@click.argument("source", type=click.Path(exists=True))
+@click.argument("output", type=click.File("w"), default="-")
+@click.option(
+    "--backend",
+    type=click.Choice(["bs4", "lxml"]),
+    default="bs4",
+    show_default=True,
+    help="The parser backend.",
+)
+@click.option(
+    "--workers",
+    type=int,
+    default=os.cpu_count(),
+    help="Number of parsing processes, all cores by default.",
+)
+def parse(source, output, backend, workers):
+    """
+    Command to parse saved MPs' pages into JSON Lines.
+
+    SOURCE is a directory or a tarball of pages. Every MP's page becomes one line with
+    the parsed data and the page's name and kind, in the order of the input. Other pages
+    are skipped.
+    """
+    from open_parliament import corpus
+    from open_parliament.pool import map_in_order
+
+    pages = ((backend, name, html) for name, html in corpus.iter_pages(source))
+    for data in map_in_order(corpus.parse_mp_page, pages, workers):
+        if data is not None:
+            output.write(json.dumps(data) + "\n")
+
+
+@cli.command()
+@click.argument(
+    "directory",
+    type=click.Path(exists=True, file_okay=False),
+    default=os.path.join(os.path.dirname(__file__), "tests", "data"),
+)
+@click.option(
+    "--backend",
+    type=click.Choice(["bs4", "lxml", "all"]),
+    default="all",
+    show_default=True,
+    help="The parser backend to benchmark.",
+)
+@click.option(
+    "--repeat",
+    type=int,
+    default=5,
+    show_default=True,
+    help="Number of runs per page, the fastest one counts.",
+)
+@click.option("--save", type=click.Path(), help="Save the results as a baseline.")
+@click.option(
+    "--baseline",
+    type=click.Path(exists=True),
+    help="Fail if the results are worse than this baseline.",
+)
+@click.option(
+    "--tolerance",
+    type=float,
+    default=0.25,
+    show_default=True,
+    help="Allowed regression as a fraction of the baseline.",
+)
+def bench(directory, backend, repeat, save, baseline, tolerance):
+    """
+    Command to benchmark the parsers over a directory of saved pages.
+
+    Reports per-page latency, pages per second and peak memory of Row.parse,
+    PersonalPage.parse and CommitteesPage.parse.
+    """
+    from open_parliament import bench as benchmarks
+
+    backends = ["bs4", "lxml"] if backend == "all" else [backend]
+    results = benchmarks.run_benchmarks(directory, backends, repeat)
+    click.echo(benchmarks.format_results(results))
+    if save:
+        benchmarks.save_results(results, save)
+    if baseline:
+        regressions = benchmarks.find_regressions(
+            results, benchmarks.load_results(baseline), tolerance
+        )
+        for regression in regressions:
+            click.echo("Regression: " + regression, err=True)
+        if regressions:
+            raise SystemExit(1)
 
 
 if __name__ == "__main__":
@@ -1,8 +1,18 @@
 import contextlib
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
 from unittest.mock import Mock, patch
 
 import requests
+import scrapy
 from bs4 import BeautifulSoup
+from scrapy.http import HtmlResponse
 
 import pytest
 from open_parliament import parsers
@@ -45,6 +55,20 @@ def request_response_from_files():
 
 
 BASE = "https://www.parlament.gv.at"
+SPIDER = os.path.join(os.path.dirname(__file__), "spider.py")
+SHOW_ALL = (
+    "/WWER/NR/AKT/index.shtml?xdocumentUri=%2FWWER%2FNR%2FAKT%2Findex.shtml&pageNumber=&GP=AKT&STEP=1110&"
+    "BL=ALLE&feldRnr=1&FR=ALLE&FUNK=ALLE&M=M&ascDesc=ASC&NRBR=NR&FBEZ=FW_002&WK=ALLE&"
+    "requestId=6DFF285AA9&LISTE=&jsMode=&R_PBW=PLZ&W=W&WP=ALLE&listeId=2&R_WF=FR&PLZ="
+)
+# The pages of the data directory served by the stand-in for parlament.gv.at.
+PAGES = {
+    "/WWER/NR/AKT/index.shtml": "nationalrat_aktuell.html",
+    SHOW_ALL: "nationalrat_aktuell_full.html",
+    "/WWER/PAD_51879/": "nationalrat_hannes.html",
+    "/WWER/PAD_35468/": "nationalrat_belakowitsch.html",
+    "/WWER/PAD_14836/": "nationalrat_ruth.html",
+}
 AKTUELL = BASE + "/WWER/NR/AKT/index.shtml"
 
 
@@ -99,3 +123,115 @@ def parse_page(request_response_from_files, shared_datadir):
         return parser.parse(**kwargs)
 
     return _parse_page
+
+
+@pytest.fixture(scope="function")
+def spider_response(shared_datadir):
+    """Provide a factory for scrapy responses built from the files in the data directory."""
+
+    def _spider_response(url, path, meta=None):
+        request = scrapy.Request(BASE + url, meta=meta or {})
+        body = (shared_datadir / path).read_bytes()
+        return HtmlResponse(request.url, body=body, encoding="utf-8", request=request)
+
+    return _spider_response
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class ParlamentServer:
+    """A local stand-in for parlament.gv.at serving pages from the data directory."""
+
+    last_modified = "Thu, 24 Jan 2019 10:00:00 GMT"
+
+    def __init__(self, pages):
+        """
+        :param pages: A dictionary mapping paths (including the query) to files.
+        """
+        self.pages = pages
+        self.log = []
+        #: Events by path, responses to these paths wait until their event is set.
+        self.held = {}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path in server.held:
+                    server.held[self.path].wait()
+                path = server.pages.get(self.path)
+                if path is None:
+                    server.log.append((self.path, 404))
+                    self.send_error(404)
+                    return
+                body = path.read_bytes()
+                etag = '"{}"'.format(hashlib.md5(body).hexdigest())
+                if self.headers.get("If-None-Match") == etag:
+                    server.log.append((self.path, 304))
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                server.log.append((self.path, 200))
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", server.last_modified)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = "http://127.0.0.1:{}".format(self.httpd.server_address[1])
+
+    def statuses(self, path):
+        """Return the statuses of all responses for a path."""
+        return [status for p, status in self.log if p == path]
+
+
+@pytest.fixture(scope="function")
+def parlament_pages(shared_datadir):
+    """Provide the URLs of the pages in the data directory served by the stand-in server."""
+    return {BASE + p: shared_datadir / f for p, f in PAGES.items()}
+
+
+@pytest.fixture(scope="function")
+def parlament_server(shared_datadir):
+    """Run a local HTTP server serving the MPs table and a few MPs' pages."""
+    server = ParlamentServer({p: shared_datadir / f for p, f in PAGES.items()})
+    thread = threading.Thread(target=server.httpd.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+
+@pytest.fixture(scope="function")
+def run_spider(tmp_path):
+    """Provide a function running the spider in a separate process and returning its items."""
+
+    def _run_spider(*arguments):
+        output = tmp_path / "items.jl"
+        if output.exists():
+            output.unlink()
+        command = [
+            sys.executable,
+            "-m",
+            "scrapy",
+            "runspider",
+            SPIDER,
+            "-o",
+            str(output),
+        ]
+        for argument in arguments:
+            command += ["-a", argument]
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(SPIDER))
+        subprocess.run(command, check=True, cwd=str(tmp_path), env=env)
+        with output.open(encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    return _run_spider
@@ -0,0 +1,174 @@
+"""
+Benchmarks of the parsers over a directory of saved pages.
+
+Building the documents (:code:`parse_html`) and running the parsers on them are measured
+separately, so that changes to the parsers aren't hidden by the cost of building the trees.
+Every parser runs over all pages of its kind (see :mod:`open_parliament.corpus`).
+The results can be saved as a baseline and later runs compared against it.
+"""
+
+import json
+import statistics
+import time
+import tracemalloc
+
+from open_parliament import corpus
+from open_parliament.pages import BACKENDS
+
+
+def _parse_html(backend, html, document):
+    return backend.parse_html(html)
+
+
+def _parse_table(backend, html, document):
+    return [backend.Row(row).parse() for row in backend.find_table_rows(document)]
+
+
+def _parse_personal_page(backend, html, document):
+    return backend.PersonalPage(document).parse(corpus.is_president_details(html))
+
+
+def _parse_committees_page(backend, html, document):
+    return backend.CommitteesPage(document).parse()
+
+
+#: The benchmarks as tuples of a name, the kind of pages, the scope of their documents
+#: and the measured function.
+PARSERS = [
+    ("parse_html", None, None, _parse_html),
+    ("Row.parse", corpus.TABLE, "table", _parse_table),
+    ("PersonalPage.parse", corpus.PERSONAL, "content", _parse_personal_page),
+    ("CommitteesPage.parse", corpus.COMMITTEES, "content", _parse_committees_page),
+]
+
+
+def measure(function, pages, repeat):
+    """
+    Measure a function over a list of pages.
+
+    Every page is processed :code:`repeat` times and the fastest run counts as its latency.
+    The peak memory is measured with :mod:`tracemalloc` in a separate run, because tracing
+    slows down the function.
+
+    :returns: A dictionary with keys :code:`pages, mean_ms, median_ms, max_ms,
+              pages_per_second, peak_memory_kib`.
+    """
+    latencies = []
+    for page in pages:
+        runs = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function(page)
+            runs.append(time.perf_counter() - start)
+        latencies.append(min(runs))
+
+    peak = 0
+    for page in pages:
+        tracemalloc.start()
+        try:
+            function(page)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "pages": len(pages),
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "median_ms": statistics.median(latencies) * 1000,
+        "max_ms": max(latencies) * 1000,
+        "pages_per_second": len(pages) / sum(latencies),
+        "peak_memory_kib": peak / 1024,
+    }
+
+
+def run_benchmarks(directory, backends=("bs4", "lxml"), repeat=5):
+    """
+    Run the benchmarks of all parsers over the pages in a directory.
+
+    :returns: A dictionary of the results of :func:`measure` indexed by the benchmarks'
+              names (e.g. :code:`"lxml:PersonalPage.parse"`).
+    """
+    pages = {None: [], corpus.TABLE: [], corpus.PERSONAL: [], corpus.COMMITTEES: []}
+    for _, html in corpus.iter_pages(directory):
+        kinds = corpus.page_kinds(html)
+        if kinds:
+            pages[None].append(html)
+        for kind in kinds:
+            pages[kind].append(html)
+
+    results = {}
+    for name in backends:
+        backend = BACKENDS[name]
+        for parser, kind, scope, parse in PARSERS:
+            if not pages[kind]:
+                continue
+            documents = [
+                (html, backend.parse_html(html, scope) if scope else None)
+                for html in pages[kind]
+            ]
+            results[name + ":" + parser] = measure(
+                lambda page: parse(backend, *page), documents, repeat
+            )
+    return results
+
+
+def find_regressions(results, baseline, tolerance=0.25):
+    """
+    Compare results with a baseline.
+
+    A benchmark has regressed if its median latency or its peak memory exceeds the
+    baseline by more than :code:`tolerance` (a fraction of the baseline).
+
+    :returns: A list of messages describing the regressions.
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+        for key in ("median_ms", "peak_memory_kib"):
+            limit = baseline[name][key] * (1 + tolerance)
+            if result[key] > limit:
+                regressions.append(
+                    "{} {}: {:.2f} > {:.2f} (baseline {:.2f})".format(
+                        name, key, result[key], limit, baseline[name][key]
+                    )
+                )
+    return regressions
+
+
+def format_results(results):
+    """Format results as a table."""
+    lines = [
+        "{:<28} {:>5} {:>10} {:>10} {:>10} {:>10} {:>10}".format(
+            "benchmark",
+            "pages",
+            "mean ms",
+            "median ms",
+            "max ms",
+            "pages/s",
+            "peak KiB",
+        )
+    ]
+    for name, r in sorted(results.items()):
+        lines.append(
+            "{:<28} {:>5} {:>10.2f} {:>10.2f} {:>10.2f} {:>10.1f} {:>10.0f}".format(
+                name,
+                r["pages"],
+                r["mean_ms"],
+                r["median_ms"],
+                r["max_ms"],
+                r["pages_per_second"],
+                r["peak_memory_kib"],
+            )
+        )
+    return "\n".join(lines)
+
+
+def save_results(results, path):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,176 @@
+"""
+Conversion of scraped items to columnar files (Parquet or Arrow) with :mod:`pyarrow`.
+
+Unlike the CSV rows of :mod:`open_parliament.convert`, multi-valued fields are written as list
+columns (e.g. :code:`mandates` as a list of structs) and values repeated across MPs as
+dictionary encoded strings. Items are streamed into the file in row groups, so files of any
+size can be written with bounded memory.
+
+:mod:`pyarrow` is an optional dependency (:code:`pip install open-parliament[columnar]`).
+"""
+
+import itertools
+
+from open_parliament.vocabulary import Vocabulary
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+FORMATS = ["parquet", "arrow"]
+
+#: The dictionary typed columns.
+CATEGORIES = ("political_affiliation", "state", "wahlkreis")
+
+
+def make_schema():
+    """
+    Return the :class:`pyarrow.Schema` of the MPs table.
+
+    The columns in :data:`CATEGORIES` are dictionary typed. Parquet dictionary encodes
+    all columns including the fields of lists, but Arrow can't read dictionary typed fields
+    of lists from several row groups, so those are plain strings in the schema.
+    """
+    string = pyarrow.string()
+    category = pyarrow.dictionary(pyarrow.int32(), string)
+    strings = pyarrow.list_(string)
+    history = pyarrow.struct([("current", strings), ("former", strings)])
+    return pyarrow.schema(
+        [
+            ("id", string),
+            ("url", string),
+            ("first_name", string),
+            ("last_name", string),
+            ("title", string),
+            ("salutation", string),
+            ("political_affiliation", category),
+            ("state", category),
+            ("wahlkreis", category),
+            ("is_president", pyarrow.bool_()),
+            ("in_committees", pyarrow.bool_()),
+            ("date_of_birth", string),
+            ("place_of_birth", string),
+            ("occupation", string),
+            ("address", string),
+            ("picture", pyarrow.struct([("full", string), ("thumbnail", string)])),
+            ("emails", strings),
+            ("phone_numbers", strings),
+            ("websites", strings),
+            ("education", strings),
+            ("posts", history),
+            ("work_history", history),
+            (
+                "mandates",
+                pyarrow.list_(
+                    pyarrow.struct(
+                        [("title", string), ("party", string), ("since", string)]
+                    )
+                ),
+            ),
+            (
+                "committees",
+                pyarrow.list_(
+                    pyarrow.struct(
+                        [
+                            ("position", string),
+                            ("id", string),
+                            ("name", string),
+                            ("url", string),
+                            ("since", string),
+                        ]
+                    )
+                ),
+            ),
+        ]
+    )
+
+
+def mp_to_row(mp, names=None):
+    """
+    Convert a scraped item to a row of the MPs table.
+
+    The committees are flattened into a list of memberships, each with the MP's position.
+
+    :param names: The names of the table's columns, by default those of :func:`make_schema`.
+    :raises ValueError: If the item has fields without a column, which would be dropped.
+    """
+    if names is None:
+        names = make_schema().names
+    unknown = [key for key in mp if key not in names]
+    if unknown:
+        raise ValueError(
+            "Fields without a column in the MPs table: {}".format(", ".join(unknown))
+        )
+    row = dict(mp)
+    if mp.get("committees") is not None:
+        row["committees"] = [
+            dict(committee, position=position, id=id_)
+            for position, committees in mp["committees"].items()
+            for id_, committee in committees.items()
+        ]
+    return row
+
+
+def _encode_categories(table, vocabularies):
+    """
+    Replace the category columns of a table with dictionary arrays indexed by the vocabularies.
+
+    The vocabularies are kept across row groups, so the dictionary of every row group extends
+    the previous one. Arrow IPC files can only store such deltas, not a new dictionary per
+    row group.
+    """
+    for name in CATEGORIES:
+        vocabulary = vocabularies[name]
+        values = table.column(name).cast(pyarrow.string()).to_pylist()
+        indices = [None if v is None else vocabulary.id(v) for v in values]
+        column = pyarrow.DictionaryArray.from_arrays(
+            pyarrow.array(indices, pyarrow.int32()),
+            pyarrow.array(vocabulary.values, pyarrow.string()),
+        )
+        index = table.schema.get_field_index(name)
+        table = table.set_column(index, table.schema.field(name), column)
+    return table
+
+
+def write_table(items, path, format_="parquet", row_group_size=10000):
+    """
+    Write scraped items to a Parquet or Arrow IPC file.
+
+    :param items: An iterable of scraped items as dictionaries.
+    :param format_: One of :data:`FORMATS`.
+    :param row_group_size: The number of items converted and written at a time.
+    :returns: The number of items written.
+    """
+    schema = make_schema()
+    if format_ == "parquet":
+        writer = pyarrow.parquet.ParquetWriter(path, schema, compression="zstd")
+    else:
+        options = pyarrow.ipc.IpcWriteOptions(
+            compression="zstd", emit_dictionary_deltas=True
+        )
+        writer = pyarrow.ipc.new_file(path, schema, options=options)
+
+    names = frozenset(schema.names)
+    vocabularies = {name: Vocabulary() for name in CATEGORIES}
+    count = 0
+    items = iter(items)
+    try:
+        while True:
+            rows = [
+                mp_to_row(mp, names) for mp in itertools.islice(items, row_group_size)
+            ]
+            if not rows:
+                break
+            # Table.from_pylist needs pyarrow 7, the last version for Python 3.6 is 6.
+            table = pyarrow.Table.from_pydict(
+                {name: [row.get(name) for row in rows] for name in schema.names},
+                schema=schema,
+            )
+            writer.write_table(_encode_categories(table, vocabularies))
+            count += len(rows)
+    finally:
+        writer.close()
+    return count
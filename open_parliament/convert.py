@@ -0,0 +1,87 @@
+"""Conversion of scraped items to rows of a CSV file."""
+
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+WANTED_FIELDS = [
+    "first_name",
+    "last_name",
+    "salutation",
+    "title",
+    "political_affiliation",
+    "state",
+    "occupation",
+    "place_of_birth",
+    "date_of_birth",
+]
+
+OUTPUT_FIELDS = [
+    "identifier",
+    "first_name",
+    "last_name",
+    "email",
+    "salutation",
+    "display_name",
+    "title",
+    "party",
+    "political_affiliation",
+    "state",
+    "occupation",
+    "place_of_birth",
+    "date_of_birth",
+    "mandates",
+    "committees",
+]
+
+party_extract_re = re.compile(r"^.* \((?P<party>\w+)\)$")
+
+
+def convert_mp(mp_data):
+    """Convert a scraped item to a row of the CSV file."""
+    mp = {"identifier": mp_data["id"]}
+    emails = mp_data.pop("emails")
+    if len(emails) > 0:
+        mp["email"] = emails[0]
+    else:
+        mp["email"] = ""
+        logger.warning(
+            "Contact without email: %s (%s %s)",
+            mp_data["id"],
+            mp_data["first_name"],
+            mp_data["last_name"],
+        )
+    mp.update({k: mp_data[k] for k in WANTED_FIELDS})
+    if "committees" in mp_data:
+        committees = sorted(
+            [c["name"] for f in mp_data["committees"].values() for c in f.values()]
+        )
+        mp["committees"] = "," + ",".join(committees) + ","
+    else:
+        mp["committees"] = ""
+    mandates = [m["title"] for m in mp_data["mandates"]]
+    mp["mandates"] = "," + ",".join(mandates) + ","
+    # extract party from political_affiliation field
+    party = party_extract_re.match(mp_data["political_affiliation"])
+    if party and party.group("party"):
+        mp["party"] = party.group("party")
+    else:
+        mp["party"] = ""
+        logger.warning(
+            "Contact without party: %s (%s %s)",
+            mp_data["id"],
+            mp_data["first_name"],
+            mp_data["last_name"],
+        )
+
+    display_title = ""
+    if mp_data["title"]:
+        display_title = ", " + mp_data["title"]
+    display_party = ""
+    if mp["party"]:
+        display_party = " (" + mp["party"] + ")"
+    mp["display_name"] = "{} {}{}{}".format(
+        mp_data["last_name"], mp_data["first_name"], display_title, display_party
+    )
+    return mp
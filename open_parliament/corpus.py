@@ -0,0 +1,100 @@
+"""
+Saved pages of parlament.gv.at, like the ones in :code:`tests/data`.
+
+The kind of a page is determined from its text, so pages can be processed without knowing
+the URLs they were downloaded from.
+"""
+
+import os
+import re
+import tarfile
+
+from open_parliament import pages
+from open_parliament.pages import COMMITTEES, PERSONAL, PRESIDENT, TABLE
+from open_parliament.parsers import MPS_TABLE_CLASS
+
+EXTENSIONS = (".html", ".shtml", ".htm")
+
+president_heading_re = re.compile(r'<h1 id="inhalt">[^<]* - [^<]*</h1>')
+mps_table_re = re.compile(
+    r'<table[^>]* class="(?:[^"]* )?{}[ "]'.format(re.escape(MPS_TABLE_CLASS))
+)
+
+
+def page_kinds(html):
+    """
+    Return the kinds of a saved page.
+
+    A page can have several kinds, e.g. MPs' personal pages usually also contain their committees.
+
+    :returns: A list containing :data:`TABLE`, :data:`PERSONAL` and :data:`COMMITTEES`
+              for the MPs table, MPs' personal pages and pages with committees.
+    """
+    kinds = []
+    if mps_table_re.search(html):
+        kinds.append(TABLE)
+    if 'class="rechteSpalte60"' in html:
+        kinds.append(PERSONAL)
+    if 'class="contentBlockContent showContentBlock"' in html:
+        kinds.append(COMMITTEES)
+    return kinds
+
+
+def is_president_details(html):
+    """
+    Return whether a personal page is the president's :code:`zurPerson.shtml`.
+
+    Its heading contains the name of the page after the name of the president.
+    """
+    return president_heading_re.search(html) is not None
+
+
+def mp_page_kind(html):
+    """
+    Return the kind of an MP's page as used in :data:`open_parliament.pages.PAGES`.
+
+    :returns: :data:`~open_parliament.pages.PERSONAL`, :data:`~open_parliament.pages.PRESIDENT`,
+              :data:`~open_parliament.pages.COMMITTEES` or :code:`None` if the page is not
+              an MP's page.
+    """
+    kinds = page_kinds(html)
+    if PERSONAL in kinds:
+        return PRESIDENT if is_president_details(html) else PERSONAL
+    if COMMITTEES in kinds:
+        return COMMITTEES
+    return None
+
+
+def parse_mp_page(backend, name, html):
+    """
+    Parse a saved MP's page.
+
+    :returns: The parsed data as a dictionary with the page's :code:`name` and :code:`kind`
+              or :code:`None` if the page is not an MP's page.
+    """
+    kind = mp_page_kind(html)
+    if kind is None:
+        return None
+    data = pages.parse_page(backend, kind, html).to_dict()
+    data.update({"page": name, "kind": kind})
+    return data
+
+
+def iter_pages(path):
+    """
+    Yield the file names and texts of all HTML pages in a directory or a tarball.
+
+    Pages in a directory are sorted by name, pages in a tarball are in the order of the archive.
+    """
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.endswith(EXTENSIONS):
+                with open(os.path.join(path, name), encoding="utf-8") as f:
+                    yield name, f.read()
+        return
+
+    with tarfile.open(path) as tar:
+        for member in tar:
+            if member.isfile() and member.name.endswith(EXTENSIONS):
+                with tar.extractfile(member) as f:
+                    yield member.name, f.read().decode("utf-8")
@@ -0,0 +1,218 @@
+"""
+A normalised SQLite database of the scraped MPs.
+
+The database has a table of MPs, their mandates, the committees and the MPs' memberships in
+them. It is indexed, so that e.g. the members of a committee or the MPs of a party in a state
+are found with an index lookup.
+
+Every MP's complete item is stored as JSON as well. Items are written in batches, each in one
+transaction, and only MPs whose item differs from the stored one are written, so re-running a
+scrape into the same database only touches what changed.
+"""
+
+import itertools
+import json
+import sqlite3
+
+from open_parliament.records import json_default
+
+#: The columns of the :code:`mps` table taken from the items, besides the JSON :code:`data`.
+MP_COLUMNS = (
+    "id",
+    "url",
+    "first_name",
+    "last_name",
+    "title",
+    "salutation",
+    "political_affiliation",
+    "state",
+    "wahlkreis",
+    "is_president",
+    "date_of_birth",
+    "place_of_birth",
+    "occupation",
+    "address",
+)
+
+#: The maximum number of variables in a statement of SQLite before 3.32.0, so stored items
+#: are looked up in chunks of this many ids.
+MAX_VARIABLES = 999
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS mps ("
+    " id TEXT PRIMARY KEY,"
+    " url TEXT,"
+    " first_name TEXT,"
+    " last_name TEXT,"
+    " title TEXT,"
+    " salutation TEXT,"
+    " political_affiliation TEXT,"
+    " state TEXT,"
+    " wahlkreis TEXT,"
+    " is_president INTEGER,"
+    " date_of_birth TEXT,"
+    " place_of_birth TEXT,"
+    " occupation TEXT,"
+    " address TEXT,"
+    " data TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS mps_party_state ON mps (political_affiliation, state)",
+    "CREATE INDEX IF NOT EXISTS mps_state ON mps (state)",
+    "CREATE TABLE IF NOT EXISTS mandates ("
+    " mp_id TEXT NOT NULL REFERENCES mps (id),"
+    " number INTEGER NOT NULL,"
+    " title TEXT,"
+    " party TEXT,"
+    " since TEXT,"
+    " PRIMARY KEY (mp_id, number))",
+    "CREATE TABLE IF NOT EXISTS committees ("
+    " id TEXT PRIMARY KEY,"
+    " name TEXT,"
+    " url TEXT)",
+    "CREATE TABLE IF NOT EXISTS memberships ("
+    " mp_id TEXT NOT NULL REFERENCES mps (id),"
+    " committee_id TEXT NOT NULL REFERENCES committees (id),"
+    " position TEXT NOT NULL,"
+    " since TEXT,"
+    " PRIMARY KEY (mp_id, committee_id, position))",
+    "CREATE INDEX IF NOT EXISTS memberships_committee ON memberships (committee_id)",
+)
+
+
+def serialize(item):
+    """Return the JSON stored for an item, which is the same for equal items."""
+    return json.dumps(item, ensure_ascii=False, sort_keys=True, default=json_default)
+
+
+class MPDatabase:
+    """
+    Writes scraped items to an SQLite database and answers the common queries.
+
+    The primary key of the :code:`mps` table and the primary keys starting with
+    :code:`mp_id` index the MPs' ids, further indexes cover parties, states and committees.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: The path of the database file, which is created if it doesn't exist.
+        """
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            for statement in SCHEMA:
+                self.connection.execute(statement)
+
+    def write(self, items, batch_size=500):
+        """
+        Insert or update MPs, their mandates and committee memberships.
+
+        :param items: An iterable of scraped items as dictionaries.
+        :param batch_size: The number of items written in one transaction.
+        :returns: The number of MPs inserted or updated.
+        """
+        changed = 0
+        items = iter(items)
+        while True:
+            batch = list(itertools.islice(items, batch_size))
+            if not batch:
+                return changed
+            changed += self.write_batch(batch)
+
+    def write_batch(self, items):
+        """
+        Write a batch of items in one transaction, skipping the unchanged ones.
+
+        :returns: The number of MPs inserted or updated.
+        """
+        data = {item["id"]: serialize(item) for item in items}
+        ids = list(data)
+        stored = {}
+        for start in range(0, len(ids), MAX_VARIABLES):
+            chunk = ids[start : start + MAX_VARIABLES]
+            stored.update(
+                self.connection.execute(
+                    "SELECT id, data FROM mps WHERE id IN ({})".format(
+                        ", ".join("?" * len(chunk))
+                    ),
+                    chunk,
+                )
+            )
+        changed = [item for item in items if stored.get(item["id"]) != data[item["id"]]]
+        with self.connection:
+            for item in changed:
+                self._write_mp(item, data[item["id"]])
+        return len(changed)
+
+    def _write_mp(self, item, data):
+        id_ = item["id"]
+        self.connection.execute(
+            "INSERT OR REPLACE INTO mps ({}, data) VALUES ({}, ?)".format(
+                ", ".join(MP_COLUMNS), ", ".join("?" * len(MP_COLUMNS))
+            ),
+            [item.get(column) for column in MP_COLUMNS] + [data],
+        )
+
+        self.connection.execute("DELETE FROM mandates WHERE mp_id = ?", (id_,))
+        self.connection.executemany(
+            "INSERT INTO mandates (mp_id, number, title, party, since)"
+            " VALUES (?, ?, ?, ?, ?)",
+            [
+                (id_, number, m.get("title"), m.get("party"), m.get("since"))
+                for number, m in enumerate(item.get("mandates") or [])
+            ],
+        )
+
+        self.connection.execute("DELETE FROM memberships WHERE mp_id = ?", (id_,))
+        for position, committees in (item.get("committees") or {}).items():
+            for committee_id, committee in committees.items():
+                self._write_committee(committee_id, committee)
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO memberships"
+                    " (mp_id, committee_id, position, since) VALUES (?, ?, ?, ?)",
+                    (id_, committee_id, position, committee.get("since")),
+                )
+
+    def _write_committee(self, id_, committee):
+        name, url = committee.get("name"), committee.get("url")
+        self.connection.execute(
+            "INSERT OR IGNORE INTO committees (id, name, url) VALUES (?, ?, ?)",
+            (id_, name, url),
+        )
+        self.connection.execute(
+            "UPDATE committees SET name = ?, url = ?"
+            " WHERE id = ? AND (name IS NOT ? OR url IS NOT ?)",
+            (name, url, id_, name, url),
+        )
+
+    def get(self, id_):
+        """Return the item of an MP or :code:`None` if the MP isn't in the database."""
+        row = self.connection.execute(
+            "SELECT data FROM mps WHERE id = ?", (id_,)
+        ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def committee_members(self, committee_id):
+        """
+        Return the members of a committee.
+
+        :returns: A list of :code:`(mp_id, position)` tuples ordered by the MPs' ids.
+        """
+        return self.connection.execute(
+            "SELECT mp_id, position FROM memberships WHERE committee_id = ?"
+            " ORDER BY mp_id",
+            (committee_id,),
+        ).fetchall()
+
+    def party_members(self, party, state=None):
+        """Return the ids of the MPs of a party, optionally only those of a state."""
+        query = "SELECT id FROM mps WHERE political_affiliation = ?"
+        parameters = [party]
+        if state is not None:
+            query += " AND state = ?"
+            parameters.append(state)
+        return [
+            id_ for id_, in self.connection.execute(query + " ORDER BY id", parameters)
+        ]
+
+    def close(self):
+        """Commit all changes and close the database."""
+        self.connection.commit()
+        self.connection.close()
@@ -0,0 +1,77 @@
+"""
+Differences between two snapshots of the scraped MPs.
+
+Consumers of the data only need to process the MPs that were added, removed or modified
+since the previous run. :func:`diff_items` compares two snapshots sorted by the MPs' ids
+(as returned by :code:`cli.sort_by_id`) in a single pass, so neither snapshot has to fit
+into memory.
+"""
+
+from open_parliament.convert import OUTPUT_FIELDS
+
+ADDED = "added"
+REMOVED = "removed"
+MODIFIED = "modified"
+
+#: The columns of the CSV rows written for changes, see :func:`change_to_row`.
+CSV_FIELDS = ["change", "changed_fields"] + OUTPUT_FIELDS
+
+
+def field_changes(old, new):
+    """
+    Return the fields whose values differ between two versions of an item.
+
+    :returns: A dictionary mapping the names of the changed fields to dictionaries with the
+              :code:`old` and the :code:`new` value, :code:`None` for missing fields.
+    """
+    return {
+        name: {"old": old.get(name), "new": new.get(name)}
+        for name in sorted(set(old) | set(new))
+        if old.get(name) != new.get(name)
+    }
+
+
+def diff_items(previous, current, key="id"):
+    """
+    Yield the changes between two snapshots.
+
+    :param previous: The items of the previous snapshot sorted by their numeric ids.
+    :param current: The items of the current snapshot sorted the same way.
+    :param key: The field of the items holding the id.
+    :returns: An iterator of changes, i.e. dictionaries with the :code:`change` (one of
+              :data:`ADDED`, :data:`REMOVED` and :data:`MODIFIED`) and the :code:`id`.
+              Added and modified MPs also have their current :code:`item` and modified MPs
+              the changed :code:`fields` (see :func:`field_changes`).
+    """
+    previous, current = iter(previous), iter(current)
+    old, new = next(previous, None), next(current, None)
+    while old is not None or new is not None:
+        if new is None or (old is not None and int(old[key]) < int(new[key])):
+            yield {"change": REMOVED, "id": old[key]}
+            old = next(previous, None)
+        elif old is None or int(new[key]) < int(old[key]):
+            yield {"change": ADDED, "id": new[key], "item": new}
+            new = next(current, None)
+        else:
+            fields = field_changes(old, new)
+            if fields:
+                yield {
+                    "change": MODIFIED,
+                    "id": new[key],
+                    "fields": fields,
+                    "item": new,
+                }
+            old, new = next(previous, None), next(current, None)
+
+
+def change_to_row(change):
+    """
+    Convert a change between rows of :code:`convert-to-csv` to a row of the changes CSV file.
+
+    Added and modified MPs are written with their current row, removed MPs only with their
+    identifier. :code:`changed_fields` lists the changed columns of modified MPs.
+    """
+    row = dict(change.get("item", {"identifier": change["id"]}))
+    row["change"] = change["change"]
+    row["changed_fields"] = ",".join(change.get("fields", ()))
+    return row
@@ -0,0 +1,229 @@
+"""
+A lightweight crawler running on :mod:`asyncio` instead of Scrapy.
+
+:class:`Crawler` follows the same flow as :class:`spider.NationalratsSpider`: it requests the
+MPs tables of the given periods and chambers, follows their links to the whole tables, parses
+the rows and requests every MP's personal page once, and the first president's details and
+committees from their separate pages. The pages are parsed with the same functions of
+:mod:`open_parliament.pages`, so the items are the same as the spider's.
+
+Without Scrapy and Twisted a crawl starts much faster and needs less memory, which suits
+frequent small refreshes. Downloads share a pool of keep-alive connections of
+:mod:`aiohttp`, which is an optional dependency (:code:`pip install open-parliament[asyncio]`).
+The page store, the parse pool, the HTTP cache and the metrics of the spider are not
+supported.
+"""
+
+import asyncio
+import logging
+from urllib.parse import urljoin
+
+from w3lib.encoding import html_to_unicode
+from w3lib.url import safe_url_string
+
+from open_parliament import pages, vocabulary
+from open_parliament.pages import BACKENDS
+
+try:
+    import aiohttp
+    import yarl
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+#: The response statuses after which a request is retried, as in Scrapy.
+RETRY_STATUSES = {500, 502, 503, 504, 522, 524, 408, 429}
+
+
+class Crawler:
+    """Crawls parlament.gv.at with at most :code:`concurrency` concurrent requests."""
+
+    def __init__(
+        self,
+        backend="bs4",
+        base=pages.BASE,
+        periods="AKT",
+        chambers="NR",
+        concurrency=16,
+        retries=2,
+        timeout=180,
+    ):
+        """
+        :param backend: The name of the parser backend, see :data:`open_parliament.pages.BACKENDS`.
+        :param base: The URL of parlament.gv.at or of a mirror.
+        :param periods: Comma separated legislative periods as for the spider.
+        :param chambers: Comma separated chambers as for the spider.
+        :param retries: How often failed requests are retried.
+        :param timeout: The timeout of a request in seconds.
+        """
+        self.backend = backend
+        self.parsers = BACKENDS[backend]
+        self.base = base
+        self.start_urls = [
+            base + pages.table_path(chamber, period)
+            for chamber in chambers.split(",")
+            for period in periods.split(",")
+        ]
+        self.concurrency = concurrency
+        self.retries = retries
+        self.timeout = timeout
+        #: The ids of all persons requested so far.
+        self.seen_ids = set()
+        #: The number of tables and MPs whose crawl failed with an error.
+        self.errors = 0
+
+    def crawl(self, on_item):
+        """
+        Crawl all MPs, calling a function with every item as soon as it is scraped.
+
+        Errors crawling an MP or a table are logged and counted in :attr:`errors`, the other
+        MPs are still crawled.
+
+        The items are the MPs' records (see :mod:`open_parliament.records`), which are passed
+        on without converting them to dictionaries.
+
+        :returns: The number of scraped items.
+        """
+        if aiohttp is None:
+            raise RuntimeError("The asyncio engine requires aiohttp.")
+        self.vocabulary = vocabulary.reset()
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(self._crawl(on_item))
+        finally:
+            loop.close()
+
+    async def _crawl(self, on_item):
+        self.on_item = on_item
+        self.items = 0
+        self.errors = 0
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            headers={"User-Agent": "open-parliament"},
+        ) as session:
+            self.session = session
+            await asyncio.gather(*[self.crawl_table(url) for url in self.start_urls])
+        return self.items
+
+    async def fetch(self, url):
+        """
+        Download a page.
+
+        Failed requests and responses with a status in :data:`RETRY_STATUSES` are retried.
+
+        :returns: The final URL, the content type and the body of the page, or :code:`None` if
+                  the page couldn't be downloaded.
+        """
+        # Escape the URL like Scrapy, but don't let aiohttp requote it, which would unescape
+        # parts of the query like the %2F in the links to the whole MPs tables.
+        request_url = yarl.URL(safe_url_string(url), encoded=True)
+        for _ in range(self.retries + 1):
+            try:
+                async with self.session.get(request_url) as response:
+                    body = await response.read()
+                    status = response.status
+                    content_type = response.headers.get("Content-Type")
+                    final_url = str(response.url)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                logger.debug("Download of %s failed: %r", url, error)
+                status = None
+            if status == 200:
+                return final_url, content_type, body
+            if status not in RETRY_STATUSES and status is not None:
+                break
+        logger.warning("Ignoring %s (status %s)", url, status)
+        return None
+
+    async def fetch_text(self, url):
+        """Download a page and return its final URL and text, or :code:`None`."""
+        page = await self.fetch(url)
+        if page is None:
+            return None
+        final_url, content_type, body = page
+        # Decode like Scrapy's responses, from the header, a BOM or the page's meta tags.
+        _, text = html_to_unicode(content_type, body)
+        return final_url, text
+
+    async def crawl_table(self, url):
+        """
+        Follow the link to the whole MPs table of a period and crawl its MPs.
+
+        Tables on a single page have no such link and their rows are taken from the
+        document the link was looked for in. Errors are logged, like Scrapy logs the errors
+        of callbacks, and end only this table's crawl.
+        """
+        try:
+            await self._crawl_table(url)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.errors += 1
+            logger.exception("Error crawling the MPs table %s", url)
+
+    async def _crawl_table(self, url):
+        page = await self.fetch_text(url)
+        if page is None:
+            return
+        url, text = page
+        document = pages.parse_html(self.parsers, text, "content")
+        link = self.parsers.find_show_all_link(document)
+        if link is None:
+            # The whole table is on this page and already parsed.
+            table = pages.parse_table(self.parsers, document)
+        else:
+            page = await self.fetch_text(urljoin(url, link))
+            if page is None:
+                return
+            table = pages.iter_table(self.parsers, page[1])
+        mps = []
+        for mp in table:
+            if mp["id"] not in self.seen_ids:
+                self.seen_ids.add(mp["id"])
+                mps.append(mp)
+        await asyncio.gather(*[self.crawl_mp(mp) for mp in mps])
+
+    async def crawl_mp(self, mp):
+        """
+        Crawl an MP's pages and emit their item.
+
+        Errors, e.g. of a parser failing on a page, are logged and only skip this MP.
+        """
+        try:
+            await self._crawl_mp(mp)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.errors += 1
+            logger.exception("Error crawling MP %s", mp.get("id"))
+
+    async def _crawl_mp(self, mp):
+        url = self.base + mp["url"]
+        if not await self.load_page(mp, url, pages.PERSONAL):
+            return
+        if mp["is_president"]:
+            if not await self.load_page(
+                mp, url + pages.PRESIDENT_PAGE, pages.PRESIDENT
+            ):
+                return
+            if not await self.load_page(
+                mp, url + pages.COMMITTEES_PAGE, pages.COMMITTEES
+            ):
+                return
+        self.items += 1
+        self.on_item(mp)
+
+    async def load_page(self, mp, url, kind):
+        """
+        Download one of an MP's pages and add the parsed data to the MP.
+
+        :returns: Whether the page was downloaded.
+        """
+        page = await self.fetch_text(url)
+        if page is None:
+            return False
+        mp.update(pages.parse_page(self.backend, kind, page[1]))
+        return True
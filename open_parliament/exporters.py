@@ -0,0 +1,54 @@
+"""
+Feed exporters writing JSON Lines with :mod:`open_parliament.jsonlines`.
+
+They replace Scrapy's :code:`jsonlines` exporter, which encodes every item with the
+:mod:`json` module, and compress the feed. :data:`FEED_EXPORTERS` registers them for the
+formats :code:`jsonlines`, :code:`jsonlines.gz` and :code:`jsonlines.zst`.
+"""
+
+from scrapy.exporters import BaseItemExporter
+
+from open_parliament.jsonlines import GZIP, ZSTD, Writer
+
+
+class JsonLinesExporter(BaseItemExporter):
+    """Writes the items as uncompressed JSON Lines in UTF-8."""
+
+    #: The compression of the feed, see :func:`open_parliament.jsonlines.compress`.
+    compression = None
+
+    def __init__(self, file, **kwargs):
+        # Options like the feed's encoding don't apply, the feed is always UTF-8.
+        self._configure(kwargs, dont_fail=True)
+        self.writer = Writer(file, self.compression)
+
+    def export_item(self, item):
+        item = dict(item)
+        if self.fields_to_export:
+            item = {k: item[k] for k in self.fields_to_export if k in item}
+        self.writer.write(item)
+
+    def finish_exporting(self):
+        self.writer.close()
+
+
+class GzipJsonLinesExporter(JsonLinesExporter):
+    """Writes the items as gzip compressed JSON Lines."""
+
+    compression = GZIP
+
+
+class ZstdJsonLinesExporter(JsonLinesExporter):
+    """Writes the items as zstd compressed JSON Lines."""
+
+    compression = ZSTD
+
+
+#: The setting :code:`FEED_EXPORTERS` using the exporters of this module.
+FEED_EXPORTERS = {
+    "jsonlines": "open_parliament.exporters.JsonLinesExporter",
+    "jsonlines.gz": "open_parliament.exporters.GzipJsonLinesExporter",
+    "jsonlines.zst": "open_parliament.exporters.ZstdJsonLinesExporter",
+}
+#: The feed formats of :data:`FEED_EXPORTERS` by compression.
+FEED_FORMATS = {None: "jsonlines", GZIP: "jsonlines.gz", ZSTD: "jsonlines.zst"}
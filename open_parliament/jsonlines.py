@@ -0,0 +1,197 @@
+"""
+Fast reading and writing of JSON Lines with optional gzip or zstd compression.
+
+Items are encoded with :mod:`orjson` if it is installed, which is several times faster than
+the :mod:`json` module used otherwise, and written to files in blocks of :data:`BUFFER_SIZE`.
+Items written to pipes, e.g. :code:`open-parliament scrape | open-parliament convert-to-csv
+--stream`, are flushed one at a time, so that the reader gets every item as it is scraped.
+Compressed files are recognised by their magic bytes when they are read, so every command
+reading JSON Lines reads compressed files as well.
+
+zstd needs Python 3.14 or the :code:`backports.zstd` package, gzip is always available.
+"""
+
+import gzip
+import io
+import json
+import os
+import stat
+
+from open_parliament.records import json_default
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    from compression import zstd
+except ImportError:
+    try:
+        from backports import zstd
+    except ImportError:  # pragma: no cover
+        zstd = None
+
+GZIP = "gzip"
+ZSTD = "zstd"
+#: The compressions by file extension.
+EXTENSIONS = {".gz": GZIP, ".zst": ZSTD}
+MAGIC = {b"\x1f\x8b": GZIP, b"\x28\xb5\x2f\xfd": ZSTD}
+MAGIC_SIZE = max(len(magic) for magic in MAGIC)
+#: The size of the blocks written at a time in bytes.
+BUFFER_SIZE = 64 * 1024
+
+
+def dumps(item):
+    """
+    Return an item as a line of JSON encoded in UTF-8, without the line break.
+
+    Items may be dictionaries or records (see :mod:`open_parliament.records`).
+    """
+    if orjson is not None:
+        return orjson.dumps(item, default=json_default)
+    return json.dumps(item, ensure_ascii=False, default=json_default).encode("utf-8")
+
+
+def loads(line):
+    """Decode a line of JSON given as :class:`bytes` or :class:`str`."""
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+def compression_for(path):
+    """Return the compression of a file from its extension, :code:`None` if it has none."""
+    return EXTENSIONS.get(os.path.splitext(path)[1])
+
+
+def check_compression(compression):
+    """Raise a :class:`ValueError` if a compression is unknown or not available."""
+    if compression not in (None, GZIP, ZSTD):
+        raise ValueError("Unknown compression {!r}".format(compression))
+    if compression == ZSTD and zstd is None:
+        raise ValueError("zstd requires Python 3.14 or backports.zstd")
+
+
+def is_regular_file(file):
+    """
+    Return whether a binary file is a regular file, as opposed to a pipe or a terminal.
+
+    In-memory files and other files without a file descriptor count as regular files.
+    """
+    try:
+        return stat.S_ISREG(os.fstat(file.fileno()).st_mode)
+    except (AttributeError, OSError, ValueError):
+        return True
+
+
+def compress(file, compression):
+    """
+    Return a binary file compressing what is written to it into another binary file.
+
+    :param compression: :code:`"gzip"`, :code:`"zstd"` or :code:`None` to return the file.
+    """
+    check_compression(compression)
+    if compression == GZIP:
+        return gzip.GzipFile(fileobj=file, mode="wb")
+    if compression == ZSTD:
+        return zstd.ZstdFile(file, "wb")
+    return file
+
+
+def decompress(file):
+    """
+    Return a binary file reading a possibly compressed binary file.
+
+    The compression is detected from the first bytes, which are peeked at without consuming
+    them, so this works for pipes as well. If a pipe hasn't delivered enough bytes for the
+    magic bytes yet, they are read and put in front of the rest of the file.
+    """
+    if not hasattr(file, "peek"):
+        file = io.BufferedReader(file)
+    head = file.peek(MAGIC_SIZE)[:MAGIC_SIZE]
+    if len(head) < MAGIC_SIZE:
+        # peek only returns what is buffered or a single read of the pipe returns, read()
+        # waits for the bytes or the end of the file.
+        head = file.read(MAGIC_SIZE)
+        file = io.BufferedReader(_Prepended(head, file))
+    compression = next(
+        (c for magic, c in MAGIC.items() if head.startswith(magic)), None
+    )
+    if compression == GZIP:
+        return gzip.GzipFile(fileobj=file, mode="rb")
+    if compression == ZSTD:
+        if zstd is None:
+            raise ValueError("Reading zstd requires Python 3.14 or backports.zstd")
+        return zstd.ZstdFile(file, "rb")
+    return file
+
+
+class _Prepended(io.RawIOBase):
+    """A raw stream reading some bytes and then the rest of a binary file."""
+
+    def __init__(self, head, file):
+        self.head = head
+        self.file = file
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self.head:
+            data, self.head = self.head[: len(buffer)], self.head[len(buffer) :]
+        else:
+            # read1 returns what is available instead of waiting for a full buffer.
+            data = getattr(self.file, "read1", self.file.read)(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+class Writer:
+    """
+    Writes items as JSON Lines to a binary file in blocks of :data:`BUFFER_SIZE`.
+
+    Items written to a pipe or a terminal are flushed through the compression to the file
+    one at a time instead.
+    """
+
+    def __init__(self, file, compression=None, flush_items=None):
+        """
+        :param file: A binary file, which is not closed by :meth:`close`.
+        :param compression: See :func:`compress`.
+        :param flush_items: Whether to flush every item, by default if the file isn't a regular
+                            file (see :func:`is_regular_file`).
+        """
+        self.file = file
+        self.stream = compress(file, compression)
+        if flush_items is None:
+            flush_items = not is_regular_file(file)
+        self.flush_items = flush_items
+        self.lines = []
+        self.size = 0
+
+    def write(self, item):
+        line = dumps(item) + b"\n"
+        self.lines.append(line)
+        self.size += len(line)
+        if self.flush_items:
+            self.flush()
+            # Compressors hold back their output until they are flushed.
+            self.stream.flush()
+            self.file.flush()
+        elif self.size >= BUFFER_SIZE:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered lines."""
+        if self.lines:
+            self.stream.write(b"".join(self.lines))
+            self.lines = []
+            self.size = 0
+
+    def close(self):
+        """Write the buffered lines and end the compressed stream."""
+        self.flush()
+        if self.stream is not self.file:
+            self.stream.close()
+        self.file.flush()
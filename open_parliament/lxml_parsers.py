@@ -0,0 +1,508 @@
+"""
+Parsers for the pages of parlament.gv.at using :mod:`lxml`.
+
+The classes in this module have the same interface and return the same dictionaries as the
+:mod:`BeautifulSoup` based classes in :mod:`open_parliament.parsers`, but use precompiled XPath
+expressions on an :mod:`lxml` tree. The tree is built with :mod:`parsel`, which is what Scrapy
+uses for :attr:`scrapy.http.TextResponse.selector`, so a response's cached selector can be
+passed to the parsers directly.
+"""
+
+import re
+
+from lxml import etree
+from parsel import Selector
+
+from open_parliament.records import MP, Picture
+from open_parliament.vocabulary import intern
+from open_parliament.parsers import (
+    MPS_TABLE_CLASS,
+    split_birth,
+    split_committee_link,
+    split_current_and_former,
+    split_mandate,
+    slice_content,
+    split_name,
+)
+
+#: The size of the chunks fed to the parser by :func:`iter_table_rows`.
+CHUNK_SIZE = 16 * 1024
+
+
+def _has_class(name):
+    """Return an XPath predicate matching elements having the CSS class :code:`name`."""
+    return "contains(concat(' ', normalize-space(@class), ' '), ' {} ')".format(name)
+
+
+_text = etree.XPath("string()", smart_strings=False)
+_strings = etree.XPath(".//text()", smart_strings=False)
+
+# Expressions for a single element end with [1] on the descendant axis, so that the search
+# stops at the first match instead of collecting all matches in the subtree.
+_show_all_link = etree.XPath(
+    "descendant::div[{}][1]/descendant::a[1]/@href".format(
+        _has_class("paginationRechts")
+    ),
+    smart_strings=False,
+)
+_table_rows = etree.XPath(".//table[{}]//tr".format(_has_class(MPS_TABLE_CLASS)))
+_president_introduction = etree.XPath("descendant::*[@id='biogr_Einleitung'][1]")
+
+_cells = etree.XPath(".//td")
+_cell_prefix = etree.XPath(
+    "descendant::span[{}][1]".format(_has_class("table-responsive__prefix"))
+)
+_cell_inner = etree.XPath(
+    "descendant::span[{}][1]".format(_has_class("table-responsive__inner"))
+)
+_first_link = etree.XPath("descendant::a[1]")
+_first_span = etree.XPath("descendant::span[1]")
+
+_content = etree.XPath("descendant::*[@id='content'][1]")
+_inhalt = etree.XPath("descendant::*[@id='inhalt'][1]")
+_committees_tab = etree.XPath("descendant::a[@href='#tab-Ausschuesse'][1]")
+_picture = etree.XPath("descendant::picture[1]")
+_source = etree.XPath("descendant::source[1]")
+_img = etree.XPath("descendant::img[1]")
+_left_column = etree.XPath("descendant::div[{}][1]".format(_has_class("linkeSpalte40")))
+_graubox = etree.XPath("descendant::div[normalize-space(@class)='grauBox'][1]")
+_emails = etree.XPath(".//a[{}]".format(_has_class("mail")))
+_websites = etree.XPath(".//a[{}]".format(_has_class("noDecoration")))
+_telephones = etree.XPath(".//span[{}]".format(_has_class("telefonnummer")))
+_ems = etree.XPath(".//em")
+_list_items = etree.XPath(".//li")
+_first_list_item = etree.XPath("descendant::li[1]")
+_right_columns = etree.XPath(".//div[{}]".format(_has_class("rechteSpalte60")))
+_h3 = etree.XPath("descendant::h3[1]")
+_hidden_h3 = etree.XPath("descendant::h3[{}][1]".format(_has_class("hidden")))
+_active = etree.XPath(".//div[{}]".format(_has_class("aktiv")))
+_h4 = etree.XPath(".//h4")
+
+_committees_block = etree.XPath(
+    "descendant::div[@class='contentBlockContent showContentBlock'][1]"
+)
+_lists = etree.XPath(".//ul")
+_committee_links = etree.XPath(".//a[{}]".format(_has_class("link-indicator")))
+
+
+def parse_html(html, scope="content"):
+    """
+    Parse an HTML document with :mod:`lxml`.
+
+    Documents that have already been parsed are returned as they are, so a single tree
+    can be shared by several parsers.
+
+    :param html: The text of an HTML document, a :class:`parsel.Selector` or an :mod:`lxml` element.
+    :param scope: Which part of the document to parse, see :func:`open_parliament.parsers.parse_html`.
+                  Both :code:`"content"` and :code:`"table"` parse the main content of the page.
+    :rtype: :class:`lxml.html.HtmlElement`
+    """
+    if isinstance(html, etree._Element):
+        return html
+    if isinstance(html, Selector):
+        return html.root
+    if scope is not None:
+        html = slice_content(html)
+    return Selector(text=html).root
+
+
+def find_show_all_link(page):
+    """
+    Return the link to the page showing the whole MPs table.
+
+    :returns: The link or :code:`None` if the whole table is already on the page.
+    """
+    return _first(_show_all_link, page)
+
+
+def find_table_rows(page):
+    """Return the rows of the MPs table to be parsed by :class:`Row`, none without a table."""
+    return _table_rows(page)
+
+
+def iter_table_rows(html, encoding="utf-8"):
+    """
+    Yield the rows of the MPs table while the document is parsed incrementally.
+
+    Every row is yielded as soon as its end tag has been parsed and is discarded when the
+    next row is requested, so memory stays flat for tables of any size. Parsing stops at
+    the end of the table.
+
+    :param html: The text of the page as :class:`str` or :class:`bytes`.
+    :param encoding: The encoding of :code:`html` if it is :class:`bytes`.
+    """
+    parser = etree.HTMLPullParser(
+        events=("start", "end"),
+        encoding=encoding if isinstance(html, bytes) else None,
+    )
+    table = None
+    for event, element in _iter_events(parser, html):
+        if event == "start":
+            if table is None and _is_mps_table(element):
+                table = element
+        elif element is table:
+            return
+        elif table is not None and element.tag == "tr":
+            yield element
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+
+def _is_mps_table(element):
+    return (
+        element.tag == "table" and MPS_TABLE_CLASS in element.get("class", "").split()
+    )
+
+
+def _iter_events(parser, html):
+    """Feed a document to a pull parser in chunks and yield its events."""
+    for start in range(0, len(html), CHUNK_SIZE):
+        parser.feed(html[start : start + CHUNK_SIZE])
+        yield from parser.read_events()
+    parser.close()
+    yield from parser.read_events()
+
+
+def is_president_page(page):
+    """
+    Return whether the page is the first president's personal page.
+
+    .. seealso:: :func:`open_parliament.parsers.is_president_page`
+    """
+    return bool(_president_introduction(page))
+
+
+def _first(xpath, element):
+    """Return the first match of a compiled XPath expression or :code:`None`."""
+    matches = xpath(element)
+    return matches[0] if matches else None
+
+
+def _text_of(node):
+    """Return the text of an element or a text node."""
+    if isinstance(node, str):
+        return str(node)
+    return _text(node)
+
+
+def _following_nodes(element):
+    """Yield the elements and text nodes following an element, like :attr:`bs4.Tag.next_siblings`."""
+    if element.tail:
+        yield element.tail
+    for sibling in element.itersiblings():
+        yield sibling
+        if sibling.tail:
+            yield sibling.tail
+
+
+def _preceding_nodes(element):
+    """Yield the elements and text nodes preceding an element, like :attr:`bs4.Tag.previous_siblings`."""
+    for sibling in element.itersiblings(preceding=True):
+        if sibling.tail:
+            yield sibling.tail
+        yield sibling
+    parent = element.getparent()
+    if parent is not None and parent.text:
+        yield parent.text
+
+
+def _nth(nodes, n):
+    """Return the n-th (starting from 1) node of an iterator."""
+    for i, node in enumerate(nodes, 1):
+        if i == n:
+            return node
+    return None
+
+
+class Row:
+    """
+    Parses a row from the MPs table obtaining an MP's general information.
+
+    .. seealso:: :class:`open_parliament.parsers.Row`
+    """
+
+    def __init__(self, row):
+        """
+        :param row: An :mod:`lxml` element containing a single row from the MPs table.
+        """
+        self.row = row
+
+    def parse(self):
+        """
+        Parse an MP's general information.
+
+        :returns: An :class:`open_parliament.records.MP` with the keys described in
+                  :class:`open_parliament.parsers.Row`.
+        """
+        mp = MP()
+
+        for cell in _cells(self.row):
+            if "visible-mobile" in cell.get("class", "").split():
+                continue
+            title = self._get_cell_title(cell)
+            content = _first(_cell_inner, cell)
+
+            if title == "name":
+                mp.update(self._parse_name(cell, content))
+            elif title == "fraktion":
+                fraktion, klub = self._parse_abbreviation(content)
+                mp["political_affiliation"] = klub + " (" + fraktion + ")"
+            elif title == "wahlkreis":
+                mp["wahlkreis"] = _text(content).strip()
+            elif title == "bundesland":
+                mp["state"] = self._parse_abbreviation(content)[1]
+
+        return mp
+
+    def _get_cell_title(self, cell):
+        """Return the title of a cell."""
+        return (_text(_cell_prefix(cell)[0]).rstrip(":").strip()).lower()
+
+    def _parse_abbreviation(self, cell_content):
+        """
+        Parse a cell containing an abbreviation and a full name of something.
+
+        :returns: A tuple containing the abbreviation and the full name.
+        """
+        span = _first_span(cell_content)[0]
+        return _text(span).strip(), span.get("title").strip()
+
+    def _parse_name(self, cell, cell_content):
+        """
+        Parse the cell containing the name of the MP, as well as the link to their personal page.
+
+        :returns: A dictionary with keys :code:`id, url, first_name, last_name, title`.
+        """
+        mp_page = _first_link(cell_content)[0].get("href")
+        return split_name(mp_page, _text(cell_content).strip())
+
+
+class PersonalPage:
+    """
+    Parses an MP's personal page containing personal, contact and biographical information.
+
+    .. seealso:: :class:`open_parliament.parsers.PersonalPage`
+    """
+
+    def __init__(self, html):
+        """
+        :param html: A text response from an MP's personal page or its parsed :mod:`lxml` tree.
+        """
+        self.page = parse_html(html)
+
+    def _get_current_and_former(self, values):
+        """
+        Takes a list of elements and returns the texts of those who are currently active and former ones.
+
+        :rtype: dict
+        :returns: A dictionary as returned by :func:`open_parliament.parsers.split_current_and_former`.
+        """
+        return split_current_and_former([_text(v).strip() for v in values])
+
+    def parse(self, is_president):
+        """
+        Parses an MP's personal and contact information and biography.
+
+        :param is_president: Whether the MP is the first president of the Austrian Nationalrat.
+        :returns: An :class:`open_parliament.records.MP` with the keys described in
+                  :class:`open_parliament.parsers.PersonalPage`.
+        """
+        mp = MP()
+        self.content = _content(self.page)[0]
+
+        salutation = _text(_inhalt(self.content)[0]).strip()
+        if is_president:
+            salutation = salutation[: salutation.rfind(" - ")]
+        mp["is_president"] = is_president
+        mp["salutation"] = salutation
+        mp["in_committees"] = bool(_committees_tab(self.page))
+        mp.update(self._parse_picture())
+        mp.update(self._parse_contact_information())
+        mp.update(self._parse_biography())
+        return mp
+
+    def _parse_picture(self):
+        """
+        Parses an MP's portrait picture.
+
+        :returns: A dictionary with key :code:`picture`.
+        """
+        pic = _picture(self.content)[0]
+        full = _source(pic)[0].get("srcset")
+        thumb = _img(pic)[0].get("src")
+        return {"picture": Picture(full=full, thumbnail=thumb)}
+
+    def _parse_contact_information(self):
+        """
+        Parses an MP's contact information.
+
+        :returns: A dictionary with keys :code:`address, emails, phone_numbers, websites`.
+        """
+        left_column = _left_column(self.content)[0]
+        graubox = _graubox(left_column)[0]
+
+        address_raw = [e.getnext() for e in _ems(graubox) if _text(e) == "Anschrift:"]
+
+        address = None
+        if address_raw:
+            address = "\n".join(_strings(_first_list_item(address_raw[0])[0]))
+        emails = [re.sub(r"^mailto:", "", e.get("href")) for e in _emails(graubox)]
+        phone_numbers = [_text(t) for t in _telephones(graubox)]
+        websites = [w.get("href") for w in _websites(graubox)]
+
+        return {
+            "address": address,
+            "emails": emails,
+            "phone_numbers": phone_numbers,
+            "websites": websites,
+        }
+
+    def _parse_biography(self):
+        """
+        Parses an MP's biographical information.
+
+        :returns: A dictionary consisting of the return values of the section parsers.
+        """
+        data = {}
+        self.right_column = _right_columns(self.content)[0]
+        # The page of the second president hides the details information
+        # and displays a biography instead. By selecting the second div,
+        # we get the hidden div containing the MPs details.
+        if not _h3(self.right_column):
+            self.right_column = _right_columns(self.content)[1]
+        self.sections = self._index_sections()
+        data.update(self._parse_dob_job())
+        data.update(self._parse_political_mandates())
+        data.update(self._parse_political_posts())
+        data.update(self._parse_work_history())
+        data.update(self._parse_education())
+        return data
+
+    def _parse_dob_job(self):
+        """
+        Parses date/place of birth and side-occupation in the right column.
+
+        :returns: A dictionary with keys :code:`date_of_brith, place_of_birth, occupation`.
+        """
+        dob_job = _nth(_following_nodes(_hidden_h3(self.right_column)[0]), 2)
+        dob, job = _ems(dob_job)
+        dob, pob = split_birth(dob.tail)
+
+        return {
+            "date_of_birth": dob,
+            "place_of_birth": pob,
+            "occupation": job.tail.strip(),
+        }
+
+    def _parse_political_mandates(self):
+        """
+        Parses the political mandates in the right column.
+
+        :returns: A dictionary with key :code:`mandates`.
+        """
+        mandates = [
+            split_mandate("\n".join(_strings(m))) for m in _active(self.right_column)
+        ]
+        return {"mandates": mandates}
+
+    def _index_sections(self):
+        """
+        Index the sections of the right column by their headings.
+
+        .. seealso:: :meth:`open_parliament.parsers.PersonalPage._index_sections`
+        """
+        sections = {}
+        for heading in _h4(self.right_column):
+            sections.setdefault(_text(heading), heading)
+        return sections
+
+    def _section_items(self, heading):
+        """Return the list items of the section with the given heading or :code:`None`."""
+        heading = self.sections.get(heading)
+        if heading is None:
+            return None
+        return _list_items(_nth(_following_nodes(heading), 2))
+
+    def _parse_political_posts(self):
+        """
+        Parses the political posts in the right column.
+
+        :returns: A dictionary with key :code:`posts`.
+        """
+        functions = self._section_items("Politische Funktionen")
+        if functions is not None:
+            return {"posts": self._get_current_and_former(functions)}
+        return {}
+
+    def _parse_work_history(self):
+        """
+        Parses the work history in the right column.
+
+        :returns: A dictionary with :code:`work_history`.
+        """
+        work_history = self._section_items("Beruflicher Werdegang")
+        if work_history is not None:
+            return {"work_history": self._get_current_and_former(work_history)}
+        return {}
+
+    def _parse_education(self):
+        """
+        Parses the educational history in the right column.
+
+        :returns: A dictionary with :code:`education`.
+        """
+        education = self._section_items("Bildungsweg")
+        if education is not None:
+            return {"education": [_text(e).strip() for e in education]}
+        return {}
+
+
+class CommitteesPage:
+    """
+    Parses an MP's committee page.
+
+    .. seealso:: :class:`open_parliament.parsers.CommitteesPage`
+    """
+
+    def __init__(self, html):
+        """
+        :param html: A text response from an MP's committee page or its parsed :mod:`lxml` tree.
+        """
+        self.page = parse_html(html)
+
+    def parse(self):
+        """
+        Parse an MP's committees.
+
+        :returns: An :class:`open_parliament.records.MP` with the committees as returned by
+                  :func:`_parse_committee_links` for every position in :code:`committees`.
+        """
+        self.content = _committees_block(self.page)[0]
+        committees = {}
+
+        for p in _lists(self.content):
+            position = intern(_text_of(_nth(_preceding_nodes(p), 2)).strip())
+            try:
+                committees.update(
+                    {position: self._parse_committee_links(_committee_links(p))}
+                )
+            except StopIteration:
+                break
+
+        return MP(committees=committees)
+
+    def _parse_committee_links(self, links):
+        """
+        Parse the links to the committees where the MP holds a certain position.
+
+        :returns: A dictionary indexed by the committee's id containing the keys :code:`url`,
+        :code:`name` and :code:`since`.
+        """
+        committees = {}
+
+        for link in links:
+            id_, committee = split_committee_link(link.get("href"), _text(link))
+            committees[id_] = committee
+
+        return committees
@@ -0,0 +1,254 @@
+"""
+Metrics of a crawl.
+
+The spider records how long its callbacks, the downloads and the parsers take, the size of
+the parsed pages, the depth of the scheduler's queue and the number of scraped items in a
+:class:`Metrics` object. At the end of the crawl they are added to Scrapy's stats and can be
+written as a Prometheus textfile (see :meth:`Metrics.write_textfile`), e.g. for the textfile
+collector of the node exporter.
+
+The parsers' timings are recorded in the :data:`current` metrics by
+:mod:`open_parliament.pages`, the spider starts new metrics for every crawl with
+:func:`reset`. Pages parsed in a :class:`open_parliament.pool.ParsePool` are timed in the
+worker processes, so for them only the latency of the whole page is recorded.
+"""
+
+import bisect
+import contextlib
+import os
+import tempfile
+import time
+
+#: The prefix of the metrics' names in the Prometheus textfile.
+PREFIX = "open_parliament_"
+
+#: The upper bounds of the buckets of histograms of durations in seconds.
+SECONDS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+#: The upper bounds of the buckets of histograms of counts.
+COUNTS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+#: The type, the help text and, for histograms, the buckets of every metric.
+METRICS = {
+    "callback_seconds": ("histogram", "Time spent in the spider's callbacks.", SECONDS),
+    "download_seconds": ("histogram", "Download latency of the responses.", SECONDS),
+    "page_parse_seconds": (
+        "histogram",
+        "Time taken to parse a page, including waiting for a worker process.",
+        SECONDS,
+    ),
+    "parser_seconds": (
+        "histogram",
+        "Time spent in a parser in the crawling process.",
+        SECONDS,
+    ),
+    "queue_depth": (
+        "histogram",
+        "Requests waiting in the scheduler when a response is handled.",
+        COUNTS,
+    ),
+    "parsed_bytes_total": ("counter", "Size of the parsed pages in bytes.", None),
+    "items_total": ("counter", "Number of scraped items.", None),
+    "items_per_second": ("gauge", "Scraped items per second of the crawl.", None),
+    "duration_seconds": ("gauge", "Duration of the crawl.", None),
+}
+
+
+class Histogram:
+    """Counts observed values in buckets with fixed upper bounds."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        #: The number of values in every bucket, the last one counts values above all bounds.
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0
+        self.max = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def cumulative(self):
+        """Yield the upper bounds of the buckets and the number of values up to them."""
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+
+class Metrics:
+    """
+    The metrics of one crawl.
+
+    Every metric is declared in :data:`METRICS` and may have several series distinguished
+    by their labels, e.g. :code:`parser_seconds` with the label :code:`parser`.
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        #: The values of the series by metric name and sorted label items.
+        self.series = {}
+
+    def _get(self, name, labels, default):
+        key = (name, tuple(sorted(labels.items())))
+        value = self.series.get(key)
+        if value is None:
+            value = self.series[key] = default()
+        return value
+
+    def observe(self, name, value, **labels):
+        """Add a value to a histogram."""
+        buckets = METRICS[name][2]
+        self._get(name, labels, lambda: Histogram(buckets)).observe(value)
+
+    def inc(self, name, value=1, **labels):
+        """Increase a counter."""
+        key = (name, tuple(sorted(labels.items())))
+        self.series[key] = self.series.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        """Set a gauge."""
+        self.series[(name, tuple(sorted(labels.items())))] = value
+
+    def get(self, name, **labels):
+        """Return the histogram or the value of a series, :code:`None` if it wasn't recorded."""
+        return self.series.get((name, tuple(sorted(labels.items()))))
+
+    @contextlib.contextmanager
+    def time(self, name, **labels):
+        """Observe the duration of a :code:`with` block in a histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed_iter(self, iterable, name, **labels):
+        """
+        Yield from an iterable and observe the total time spent producing its items.
+
+        This times generators, whose work is done while they are consumed.
+        """
+        elapsed = 0
+        iterator = iter(iterable)
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    elapsed += time.perf_counter() - start
+                yield item
+        finally:
+            self.observe(name, elapsed, **labels)
+
+    def finish(self):
+        """Set the gauges of the whole crawl."""
+        duration = time.monotonic() - self.started
+        self.set("duration_seconds", duration)
+        self.set("items_per_second", (self.get("items_total") or 0) / duration)
+
+    def to_stats(self, stats):
+        """
+        Add the metrics to a Scrapy stats collector.
+
+        Histograms are added as their count, sum and maximum, e.g.
+        :code:`open_parliament/parser_seconds/PersonalPage.parse/count`.
+        """
+        for (name, labels), value in sorted(self.series.items()):
+            key = "/".join(["open_parliament", name] + [v for _, v in labels])
+            if isinstance(value, Histogram):
+                stats.set_value(key + "/count", value.count)
+                stats.set_value(key + "/sum", value.sum)
+                stats.set_value(key + "/max", value.max)
+            else:
+                stats.set_value(key, value)
+
+    def to_prometheus(self):
+        """Return the metrics in the Prometheus text exposition format."""
+        lines = []
+        for name, (type_, help_, _) in METRICS.items():
+            series = sorted(
+                (labels, value)
+                for (series_name, labels), value in self.series.items()
+                if series_name == name
+            )
+            if not series:
+                continue
+            lines.append("# HELP {}{} {}".format(PREFIX, name, help_))
+            lines.append("# TYPE {}{} {}".format(PREFIX, name, type_))
+            for labels, value in series:
+                if isinstance(value, Histogram):
+                    for bound, count in value.cumulative():
+                        le = (("le", _format_value(bound)),)
+                        lines.append(_sample(name + "_bucket", labels + le, count))
+                    lines.append(_sample(name + "_sum", labels, value.sum))
+                    lines.append(_sample(name + "_count", labels, value.count))
+                else:
+                    lines.append(_sample(name, labels, value))
+        return "".join(line + "\n" for line in lines)
+
+    def write_textfile(self, path):
+        """
+        Write the metrics to a Prometheus textfile.
+
+        The file is replaced atomically, so that a collector never reads a partial file.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.to_prometheus())
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(value)
+
+
+def _sample(name, labels, value):
+    label_text = ",".join(
+        '{}="{}"'.format(
+            key,
+            str(label).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for key, label in labels
+    )
+    if label_text:
+        label_text = "{" + label_text + "}"
+    return "{}{}{} {}".format(PREFIX, name, label_text, _format_value(value))
+
+
+#: The metrics of the current crawl.
+current = Metrics()
+
+
+def reset():
+    """Start new :data:`current` metrics and return them."""
+    global current
+    current = Metrics()
+    return current
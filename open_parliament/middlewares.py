@@ -0,0 +1,48 @@
+"""Downloader middlewares for the Nationalrat spider."""
+
+from scrapy import signals
+from scrapy.exceptions import IgnoreRequest, NotConfigured
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+
+from open_parliament.warc import WarcArchive
+
+
+class WarcReplayMiddleware:
+    """
+    Serves all responses from a WARC file instead of downloading them.
+
+    The middleware is enabled by setting :code:`WARC_REPLAY` to the path of the file.
+    Requests for URLs that are not in the archive are ignored.
+    """
+
+    def __init__(self, archive):
+        self.archive = archive
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        path = crawler.settings.get("WARC_REPLAY")
+        if not path:
+            raise NotConfigured
+        middleware = cls(WarcArchive(path))
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def spider_closed(self, spider):
+        self.archive.close()
+
+    def process_request(self, request, spider):
+        recorded = self.archive.get(request.url)
+        if recorded is None:
+            raise IgnoreRequest("Not in the WARC archive: {}".format(request.url))
+        status, headers, body = recorded
+        headers = Headers(headers)
+        respcls = responsetypes.from_args(headers=headers, url=request.url, body=body)
+        return respcls(
+            url=request.url,
+            status=status,
+            headers=headers,
+            body=body,
+            request=request,
+            flags=["warc"],
+        )
@@ -0,0 +1,136 @@
+"""
+Parsing whole pages into the data the spider yields.
+
+Every kind of page is parsed by a function taking a parser backend (see :data:`BACKENDS`)
+and the page's document. The functions only depend on the text of the page, so they can
+also run outside of the spider, e.g. in a :class:`open_parliament.pool.ParsePool`.
+
+The time spent in every parser is recorded in :data:`open_parliament.metrics.current` and,
+if profiling is enabled, the parsers are profiled (see :mod:`open_parliament.profiling`).
+"""
+
+import contextlib
+
+from open_parliament import lxml_parsers, metrics, parsers, profiling
+from open_parliament.records import MP
+
+#: The parser backends by name.
+BACKENDS = {"bs4": parsers, "lxml": lxml_parsers}
+
+TABLE = "table"
+PERSONAL = "personal"
+PRESIDENT = "president"
+COMMITTEES = "committees"
+
+#: The URL of parlament.gv.at.
+BASE = "https://www.parlament.gv.at"
+#: The paths of the MPs tables of current and former legislative periods. Only the table of
+#: the current Nationalrat has been checked against parlament.gv.at, the other paths are
+#: experimental.
+CURRENT_TABLE = "/WWER/{chamber}/AKT/index.shtml"
+PERIOD_TABLE = "/WWER/{chamber}/ABG/index.shtml?GP={period}&NRBR={chamber}"
+#: The pages with the first president's details and committees, relative to their page.
+PRESIDENT_PAGE = "zurPerson.shtml"
+COMMITTEES_PAGE = "ausschuesse.shtml"
+
+
+def table_path(chamber, period, current=CURRENT_TABLE, former=PERIOD_TABLE):
+    """
+    Return the path of the MPs table of a chamber in a legislative period.
+
+    :param current: The template of the path of the current MPs, :code:`period` :code:`AKT`.
+    :param former: The template of the paths of former legislative periods.
+    """
+    template = current if period == "AKT" else former
+    return template.format(chamber=chamber, period=period)
+
+
+@contextlib.contextmanager
+def measure(parser):
+    """Time and, if profiling is enabled, profile a :code:`with` block running a parser."""
+    with metrics.current.time("parser_seconds", parser=parser):
+        with profiling.profile(parser):
+            yield
+
+
+def parse_table(backend, document):
+    """Parse the MPs table into a list of MPs."""
+    mps = (parse_row(backend, row) for row in backend.find_table_rows(document))
+    return [mp for mp in mps if mp]
+
+
+def parse_row(backend, row):
+    """Parse a row of the MPs table."""
+    with measure("Row.parse"):
+        return backend.Row(row).parse()
+
+
+def iter_table(backend, html, encoding="utf-8"):
+    """
+    Yield the MPs of the MPs table as its rows are parsed.
+
+    :param html: The text of the page as :class:`str` or :class:`bytes`.
+    :param encoding: The encoding of :code:`html` if it is :class:`bytes`.
+    """
+    for row in backend.iter_table_rows(html, encoding):
+        mp = parse_row(backend, row)
+        if mp:
+            yield mp
+
+
+def parse_personal_page(backend, document):
+    """
+    Parse an MP's personal page including their committees.
+
+    The first president's details are on separate pages, so for them only
+    :code:`is_president` is returned.
+    """
+    if backend.is_president_page(document):
+        return MP(is_president=True)
+
+    with measure("PersonalPage.parse"):
+        data = backend.PersonalPage(document).parse(False)
+    # The committees tab is part of the personal page, so there is no need
+    # to download the same page again for it.
+    if data["in_committees"]:
+        data.update(parse_committees_page(backend, document))
+    return data
+
+
+def parse_president_page(backend, document):
+    """Parse the first president's :code:`zurPerson.shtml`."""
+    with measure("PersonalPage.parse"):
+        return backend.PersonalPage(document).parse(True)
+
+
+def parse_committees_page(backend, document):
+    """Parse a page listing an MP's committees."""
+    with measure("CommitteesPage.parse"):
+        return backend.CommitteesPage(document).parse()
+
+
+def parse_html(backend, html, scope):
+    """Build the document of a page with a backend's :code:`parse_html`."""
+    with measure("parse_html"):
+        return backend.parse_html(html, scope)
+
+
+#: The scope passed to :code:`parse_html` and the parsing function for every kind of page.
+PAGES = {
+    TABLE: ("table", parse_table),
+    PERSONAL: ("content", parse_personal_page),
+    PRESIDENT: ("content", parse_president_page),
+    COMMITTEES: ("content", parse_committees_page),
+}
+
+
+def parse_page(backend, kind, html):
+    """
+    Parse a page of the given kind.
+
+    :param backend: The name of a parser backend.
+    :param html: The page's text.
+    """
+    scope, parse = PAGES[kind]
+    module = BACKENDS[backend]
+    return parse(module, parse_html(module, html, scope))
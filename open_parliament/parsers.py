@@ -1,7 +1,218 @@
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer, Tag
 
 import re
 
+from open_parliament.records import MP, CommitteeMembership, Mandate, Picture
+from open_parliament.vocabulary import intern
+
+#: The CSS class of the MPs table. Its summary differs between chambers and periods, but
+#: it's the only table with this class on every page listing MPs.
+MPS_TABLE_CLASS = "filter"
+
+content_start_re = re.compile(r'<div id="content"[^>]*>')
+content_start_bytes_re = re.compile(rb'<div id="content"[^>]*>')
+CONTENT_END = '<!-- id="content" -->'
+
+# While parsing, the class attribute isn't split into classes yet, so it's matched by a regex.
+STRAINERS = {
+    "table": SoupStrainer(
+        "table", class_=re.compile(r"(^|\s){}(\s|$)".format(MPS_TABLE_CLASS))
+    )
+}
+
+# Precompiled matchers for the elements looked up on every page or in every row.
+CELL_PREFIX = SoupStrainer("span", class_="table-responsive__prefix")
+CELL_INNER = SoupStrainer("span", class_="table-responsive__inner")
+LEFT_COLUMN = SoupStrainer("div", class_="linkeSpalte40")
+RIGHT_COLUMN = SoupStrainer("div", class_="rechteSpalte60")
+GRAUBOX = SoupStrainer("div", class_="grauBox")
+MAIL = SoupStrainer("a", class_="mail")
+WEBSITE = SoupStrainer("a", class_="noDecoration")
+TELEPHONE = SoupStrainer("span", class_="telefonnummer")
+
+
+def slice_content(html):
+    """
+    Cut the main content (:code:`<div id="content">`) out of a page's text.
+
+    Everything the parsers look at is part of the main content, so navigation, footer and
+    scripts don't need to be parsed at all. Pages without the expected markers are returned
+    unchanged.
+
+    :param html: The text of a page as :class:`str` or :class:`bytes`.
+    """
+    if isinstance(html, bytes):
+        start = content_start_bytes_re.search(html)
+        end_marker = CONTENT_END.encode("ascii")
+    else:
+        start = content_start_re.search(html)
+        end_marker = CONTENT_END
+    if not start:
+        return html
+    end = html.find(end_marker, start.end())
+    return html[start.start() : end if end >= 0 else len(html)]
+
+
+def parse_html(html, scope="content"):
+    """
+    Parse an HTML document with :mod:`BeautifulSoup`.
+
+    Documents that have already been parsed are returned as they are, so a single tree
+    can be shared by several parsers.
+
+    :param html: The text of an HTML document or an already parsed :mod:`BeautifulSoup` object.
+    :param scope: Which part of the document to parse: :code:`"content"` for the main content
+                  (see :func:`slice_content`), :code:`"table"` for only the MPs table or
+                  :code:`None` for the whole document.
+    :rtype: :class:`bs4.Tag`
+    """
+    if isinstance(html, Tag):
+        return html
+    if scope is None:
+        return BeautifulSoup(html, features="html.parser")
+    return BeautifulSoup(
+        slice_content(html), features="html.parser", parse_only=STRAINERS.get(scope)
+    )
+
+
+def find_show_all_link(page):
+    """
+    Return the link to the page showing the whole MPs table.
+
+    :returns: The link or :code:`None` if the whole table is already on the page.
+    """
+    pagination = page.find("div", class_="paginationRechts")
+    link = pagination.a if pagination is not None else None
+    return link.attrs["href"] if link is not None else None
+
+
+def find_table_rows(page):
+    """Return the rows of the MPs table to be parsed by :class:`Row`, none without a table."""
+    table = page.find("table", class_=MPS_TABLE_CLASS)
+    return table.find_all("tr") if table is not None else []
+
+
+def iter_table_rows(html, encoding="utf-8"):
+    """
+    Yield the rows of the MPs table of a page.
+
+    :mod:`BeautifulSoup` can't parse incrementally, so unlike
+    :func:`open_parliament.lxml_parsers.iter_table_rows` this parses the whole table first.
+
+    :param html: The text of the page as :class:`str` or :class:`bytes`.
+    :param encoding: The encoding of :code:`html` if it is :class:`bytes`.
+    """
+    if isinstance(html, bytes):
+        html = html.decode(encoding)
+    return iter(find_table_rows(parse_html(html, "table")))
+
+
+def is_president_page(page):
+    """
+    Return whether the page is the first president's personal page.
+
+    Their details are on a separate page (:code:`zurPerson.shtml`), as are their committees
+    (:code:`ausschuesse.shtml`).
+    """
+    return page.find(id="biogr_Einleitung") is not None
+
+
+def split_current_and_former(values):
+    """
+    Takes a list of strings and returns those who are currently active and former ones.
+
+    Currently active values are determined by not containing a "–" in their last word,
+    which is used to connect years (e.g. "Teacher 2000–2018").
+
+    :rtype: dict
+    :returns: A dictionary containing the corresponding lists indexed by the keys
+              'current' and 'former'.
+    """
+    current = []
+    former = []
+
+    for s in values:
+        if "–" not in s.split(" ")[-1]:
+            current.append(s)
+        else:
+            former.append(s)
+
+    return {"current": current, "former": former}
+
+
+def split_name(mp_page, full_name):
+    """
+    Split the text and link of an MP's name cell into their id, url and names.
+
+    :returns: A dictionary with keys :code:`id, url, first_name, last_name, title`.
+    """
+    name, *title = full_name.split(",")
+    last, *first = name.split(" ")
+
+    id_ = mp_page[mp_page.find("PAD_") + 4 : mp_page.rfind("/")]
+    url = re.sub("index.shtml$", "", mp_page)
+
+    first_name = " ".join(first).rstrip(",").strip()
+    last_name = last.strip()
+    title = ",".join(title).strip()
+
+    return {
+        "id": id_,
+        "url": url,
+        "first_name": first_name,
+        "last_name": last_name,
+        "title": title,
+    }
+
+
+def split_birth(dob):
+    """
+    Split the text following "Geb.:" into the date and place of birth.
+
+    :returns: A tuple containing the date of birth and the place of birth (or :code:`None`).
+    """
+    dob = dob.strip()
+    try:
+        dob, pob = [d.strip() for d in dob.split(",")]
+    except ValueError:
+        try:
+            # https://www.parlament.gv.at/WWER/PAD_88823/
+            dob, pob = [d.strip().rstrip(")") for d in dob.split("(")]
+        except ValueError:
+            # https://www.parlament.gv.at/WWER/PAD_83142/
+            dob = dob.strip()
+            pob = None
+    return dob, pob
+
+
+def split_mandate(mandate):
+    """
+    Split the newline separated text of a political mandate.
+
+    :returns: A :class:`open_parliament.records.Mandate`.
+    """
+    mandate, since = [m.rstrip("–").strip() for m in mandate.strip().split("\n")]
+    mandate, *party = [m.strip() for m in mandate.split(",")]
+    return Mandate(title=mandate, party=party[0] if party else None, since=since)
+
+
+def split_committee_link(url, text):
+    """
+    Split the link to a committee into the committee's id and data.
+
+    :raises StopIteration: If the MP is no longer a member of the committee.
+    :returns: A tuple containing the committee's id and a
+              :class:`open_parliament.records.CommitteeMembership`.
+    """
+    id_ = re.sub("/index.shtml$", "", url)
+    id_ = id_[id_.rfind("/") + 1 :]
+    name, date = text.rsplit("(", maxsplit=1)
+    if not date.endswith("–)"):
+        raise StopIteration()
+    date = date.rstrip("–)")
+    membership = CommitteeMembership(url=url, name=name.strip(), since=date.strip())
+    return intern(id_), membership
+
 
 class Row:
     """
@@ -30,16 +241,16 @@ class Row:
         """
         Parse an MP's general information.
 
-        :returns: A dictionary containing the keys described in :class:`Row`.
+        :returns: An :class:`open_parliament.records.MP` with the keys described in :class:`Row`.
         """
-        mp = {}
+        mp = MP()
         cells = self.row.find_all("td")
 
         for cell in cells:
             if "visible-mobile" in cell.attrs["class"]:
                 continue
             title = self._get_cell_title(cell)
-            content = cell.find("span", class_="table-responsive__inner")
+            content = cell.find(CELL_INNER)
 
             if title == "name":
                 mp.update(self._parse_name(cell, content))
@@ -55,11 +266,7 @@ class Row:
 
     def _get_cell_title(self, cell):
         """Return the title of a cell."""
-        return (
-            cell.find("span", class_="table-responsive__prefix")
-            .text.rstrip(":")
-            .strip()
-        ).lower()
+        return cell.find(CELL_PREFIX).text.rstrip(":").strip().lower()
 
     def _parse_abbreviation(self, cell_content):
         """
@@ -79,25 +286,7 @@ class Row:
         :returns: A dictionary with keys :code:`id, url, first_name, last_name, title`.
         """
         mp_page = cell_content.find("a").attrs["href"]
-
-        full_name = cell_content.text.strip()
-        name, *title = full_name.split(",")
-        last, *first = name.split(" ")
-
-        id_ = mp_page[mp_page.find("PAD_") + 4 : mp_page.rfind("/")]
-        url = re.sub("index.shtml$", "", mp_page)
-
-        first_name = " ".join(first).rstrip(",").strip()
-        last_name = last.strip()
-        title = ",".join(title).strip()
-
-        return {
-            "id": id_,
-            "url": url,
-            "first_name": first_name,
-            "last_name": last_name,
-            "title": title,
-        }
+        return split_name(mp_page, cell_content.text.strip())
 
 
 class PersonalPage:
@@ -123,41 +312,27 @@ class PersonalPage:
 
     def __init__(self, html):
         """
-        :param html: A text response from an MP's personal page.
+        :param html: A text response from an MP's personal page or its parsed :mod:`BeautifulSoup` tree.
         """
-        self.page = BeautifulSoup(html, features="html.parser")
+        self.page = parse_html(html)
 
     def _get_current_and_former(self, values):
         """
-        Takes a list of strings and returns those who are currently active and former ones.
-
-        Currently active values are determined by not containing a "–" in their last word,
-        which is used to connect years (e.g. "Teacher 2000–2018").
+        Takes a list of tags and returns the texts of those who are currently active and former ones.
 
         :rtype: dict
-        :returns: A dictionary containing the corresponding lists indexed by the keys
-                  'current' and 'former'.
+        :returns: A dictionary as returned by :func:`split_current_and_former`.
         """
-        stripped = [v.text.strip() for v in values]
-        current = []
-        former = []
-
-        for s in stripped:
-            if "–" not in s.split(" ")[-1]:
-                current.append(s)
-            else:
-                former.append(s)
-
-        return {"current": current, "former": former}
+        return split_current_and_former([v.text.strip() for v in values])
 
     def parse(self, is_president):
         """
         Parses an MP's personal and contact information and biography.
 
         :param is_president: Whether the MP is the first president of the Austrian Nationalrat.
-        :returns: A dictionary containing the keys described in :class:`PersonalPage`.
+        :returns: An :class:`open_parliament.records.MP` with the keys described in :class:`PersonalPage`.
         """
-        mp = {}
+        mp = MP()
         self.content = self.page.find(id="content")
 
         salutation = self.content.find(id="inhalt").text.strip()
@@ -175,13 +350,13 @@ class PersonalPage:
         """
         Parses an MP's portrait picture.
 
-        :returns: A dictionary with key :code:`picture` indexing a dictionary containing a link to the
-        full resolution picture and a link to the thumbnail, with keys :code:`full` and :code:`thumbnail`.
+        :returns: A dictionary with key :code:`picture` indexing an :class:`open_parliament.records.Picture`
+        containing a link to the full resolution picture and a link to the thumbnail.
         """
         pic = self.content.find("picture")
         full = pic.find("source").attrs["srcset"]
         thumb = pic.find("img").attrs["src"]
-        return {"picture": {"full": full, "thumbnail": thumb}}
+        return {"picture": Picture(full=full, thumbnail=thumb)}
 
     def _parse_contact_information(self):
         """
@@ -189,14 +364,15 @@ class PersonalPage:
 
         :returns: A dictionary with keys :code:`address, emails, phone_numbers, websites`.
         """
-        left_column = self.content.find("div", class_="linkeSpalte40")
-        graubox = left_column.find(
-            lambda tag: tag.name == "div" and tag["class"] == ["grauBox"]
+        left_column = self.content.find(LEFT_COLUMN)
+        graubox = next(
+            (d for d in left_column.find_all(GRAUBOX) if d["class"] == ["grauBox"]),
+            None,
         )
 
-        emails_raw = graubox.find_all("a", class_="mail")
-        websites_raw = graubox.find_all("a", class_="noDecoration")
-        telephone_raw = graubox.find_all("span", class_="telefonnummer")
+        emails_raw = graubox.find_all(MAIL)
+        websites_raw = graubox.find_all(WEBSITE)
+        telephone_raw = graubox.find_all(TELEPHONE)
         address_raw = [
             e.nextSibling for e in graubox.find_all("em") if e.text == "Anschrift:"
         ]
@@ -222,13 +398,14 @@ class PersonalPage:
                   :func:`_parse_work_history`, :func:`parse_education`.
         """
         data = {}
-        self.right_column = self.content.find("div", class_="rechteSpalte60")
+        self.right_column = self.content.find(RIGHT_COLUMN)
         heading = self.right_column.find("h3")
         # The page of the second president hides the details information
         # and displays a biography instead. By selecting the second div,
         # we get the hidden div containing the MPs details.
         if not heading:
-            self.right_column = self.content.find_all("div", class_="rechteSpalte60")[1]
+            self.right_column = self.content.find_all(RIGHT_COLUMN)[1]
+        self.sections = self._index_sections()
         data.update(self._parse_dob_job())
         data.update(self._parse_political_mandates())
         data.update(self._parse_political_posts())
@@ -247,17 +424,7 @@ class PersonalPage:
         dob, job = dob_job.find_all("em")
 
         # Date/place of birth
-        dob = dob.nextSibling.strip()
-        try:
-            dob, pob = [d.strip() for d in dob.split(",")]
-        except ValueError:
-            try:
-                # https://www.parlament.gv.at/WWER/PAD_88823/
-                dob, pob = [d.strip().rstrip(")") for d in dob.split("(")]
-            except ValueError:
-                # https://www.parlament.gv.at/WWER/PAD_83142/
-                dob = dob.strip()
-                pob = None
+        dob, pob = split_birth(dob.nextSibling)
 
         return {
             "date_of_birth": dob,
@@ -275,28 +442,38 @@ class PersonalPage:
         mandates_raw = self.right_column.find_all("div", class_="aktiv")
 
         for m in mandates_raw:
-            mandate = m.get_text("\n").strip()
-            mandate, since = [m.rstrip("–").strip() for m in mandate.split("\n")]
-            mandate, *party = [m.strip() for m in mandate.split(",")]
-            mandates.append(
-                {"title": mandate, "party": party[0] if party else None, "since": since}
-            )
+            mandates.append(split_mandate(m.get_text("\n")))
 
         return {"mandates": mandates}
 
+    def _index_sections(self):
+        """
+        Index the sections of the right column by their headings.
+
+        The column is walked once and all section parsers share the index.
+
+        :returns: A dictionary mapping the texts of :code:`h4` headings to the headings.
+        """
+        sections = {}
+        for heading in self.right_column.find_all("h4"):
+            sections.setdefault(heading.text, heading)
+        return sections
+
+    def _section_items(self, heading):
+        """Return the list items of the section with the given heading or :code:`None`."""
+        heading = self.sections.get(heading)
+        if heading is None:
+            return None
+        return heading.nextSibling.nextSibling.find_all("li")
+
     def _parse_political_posts(self):
         """
         Parses the political posts in the right column.
 
         :returns: A dictionary with key :code:`posts`.
         """
-        functions = [
-            h
-            for h in self.right_column.find_all("h4")
-            if h.text == "Politische Funktionen"
-        ]
-        if functions:
-            functions = functions[0].nextSibling.nextSibling.find_all("li")
+        functions = self._section_items("Politische Funktionen")
+        if functions is not None:
             # TODO: Can we do better than just taking the whole string?
             return {"posts": self._get_current_and_former(functions)}
         return {}
@@ -307,13 +484,8 @@ class PersonalPage:
 
         :returns: A dictionary with :code:`work_history`.
         """
-        work_history = [
-            h
-            for h in self.right_column.find_all("h4")
-            if h.text == "Beruflicher Werdegang"
-        ]
-        if work_history:
-            work_history = work_history[0].nextSibling.nextSibling.find_all("li")
+        work_history = self._section_items("Beruflicher Werdegang")
+        if work_history is not None:
             # TODO: Can we do better than just taking the whole string?
             return {"work_history": self._get_current_and_former(work_history)}
         return {}
@@ -324,11 +496,8 @@ class PersonalPage:
 
         :returns: A dictionary with :code:`education`.
         """
-        education = [
-            h for h in self.right_column.find_all("h4") if h.text == "Bildungsweg"
-        ]
-        if education:
-            education = education[0].nextSibling.nextSibling.find_all("li")
+        education = self._section_items("Bildungsweg")
+        if education is not None:
             return {"education": [e.text.strip() for e in education]}
         return {}
 
@@ -343,16 +512,16 @@ class CommitteesPage:
 
     def __init__(self, html):
         """
-        :param html: A text response from an MP's committee page.
+        :param html: A text response from an MP's committee page or its parsed :mod:`BeautifulSoup` tree.
         """
-        self.page = BeautifulSoup(html, features="html.parser")
+        self.page = parse_html(html)
 
     def parse(self):
         """
         Parse an MP's committees.
 
-        :returns: A dictionary containing a list of committees as returned by
-                  :func:`_parse_committee_links` indexed with key :code:`committees`.
+        :returns: An :class:`open_parliament.records.MP` with the committees as returned by
+                  :func:`_parse_committee_links` for every position in :code:`committees`.
         """
         self.content = self.page.find(
             "div", class_="contentBlockContent showContentBlock"
@@ -361,7 +530,7 @@ class CommitteesPage:
         committees = {}
 
         for p in positions:
-            position = p.previousSibling.previousSibling.text.strip()
+            position = intern(p.previousSibling.previousSibling.text.strip())
             try:
                 committees.update(
                     {
@@ -373,25 +542,20 @@ class CommitteesPage:
             except StopIteration:
                 break
 
-        return {"committees": committees}
+        return MP(committees=committees)
 
     def _parse_committee_links(self, links):
         """
         Parse the links to the committees where the MP holds a certain position.
 
-        :returns: A dictionary indexed by the committee's id containing the keys :code:`url`,
-        :code:`name` and :code:`since` (indicating since when the MP is a member of said committee).
+        :returns: A dictionary of :class:`open_parliament.records.CommitteeMembership` records with
+        the keys :code:`url`, :code:`name` and :code:`since` (indicating since when the MP is a member
+        of said committee) indexed by the committee's id.
         """
         committees = {}
 
         for link in links:
-            url = link.attrs["href"]
-            id_ = re.sub("/index.shtml$", "", url)
-            id_ = id_[id_.rfind("/") + 1 :]
-            name, date = link.text.rsplit("(", maxsplit=1)
-            if not date.endswith("–)"):
-                raise StopIteration()
-            date = date.rstrip("–)")
-            committees[id_] = {"url": url, "name": name.strip(), "since": date.strip()}
+            id_, committee = split_committee_link(link.attrs["href"], link.text)
+            committees[id_] = committee
 
         return committees
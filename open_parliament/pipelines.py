@@ -0,0 +1,123 @@
+"""Item pipelines for the Nationalrat spider."""
+
+import csv
+import logging
+import sys
+
+from open_parliament.convert import OUTPUT_FIELDS, convert_mp
+from open_parliament.database import MPDatabase
+from open_parliament.jsonlines import Writer
+
+logger = logging.getLogger(__name__)
+
+
+class CsvPipeline:
+    """
+    Writes every scraped item as a row of a CSV file as soon as it is scraped.
+
+    The rows are the same as those written by :code:`open-parliament convert-to-csv --stream`.
+    The path of the file is taken from the setting :code:`CSV_OUTPUT`, :code:`"-"` (the default)
+    writes to stdout.
+    """
+
+    def __init__(self, path="-"):
+        self.path = path
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler.settings.get("CSV_OUTPUT", "-"))
+
+    def open_spider(self, spider):
+        if self.path == "-":
+            self.file = sys.stdout
+        else:
+            self.file = open(self.path, "w", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(
+            self.file, fieldnames=OUTPUT_FIELDS, extrasaction="ignore"
+        )
+        self.writer.writeheader()
+
+    def process_item(self, item, spider):
+        self.writer.writerow(convert_mp(dict(item)))
+        self.file.flush()
+        return item
+
+    def close_spider(self, spider):
+        if self.file is not sys.stdout:
+            self.file.close()
+
+
+class JsonLinesPipeline:
+    """
+    Writes the scraped items as JSON Lines like :class:`open_parliament.exporters.JsonLinesExporter`.
+
+    This is for crawls without Scrapy's feed exports (see :mod:`open_parliament.engine`).
+    :code:`"-"` writes to stdout.
+    """
+
+    def __init__(self, path="-", compression=None):
+        """
+        :param compression: See :func:`open_parliament.jsonlines.compress`.
+        """
+        self.path = path
+        self.compression = compression
+
+    def open_spider(self, spider):
+        if self.path == "-":
+            sys.stdout.flush()
+            self.file = sys.stdout.buffer
+        else:
+            self.file = open(self.path, "wb")
+        self.writer = Writer(self.file, self.compression)
+
+    def process_item(self, item, spider):
+        self.writer.write(dict(item))
+        return item
+
+    def close_spider(self, spider):
+        self.writer.close()
+        if self.file is not sys.stdout.buffer:
+            self.file.close()
+
+
+class SqlitePipeline:
+    """
+    Writes the scraped items to an SQLite database (see :mod:`open_parliament.database`).
+
+    The path of the database is taken from the setting :code:`SQLITE_OUTPUT`. Items are
+    written in batches of :code:`SQLITE_BATCH_SIZE` (500 by default), each in one transaction.
+    """
+
+    def __init__(self, path, batch_size=500):
+        self.path = path
+        self.batch_size = batch_size
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(
+            crawler.settings.get("SQLITE_OUTPUT"),
+            crawler.settings.getint("SQLITE_BATCH_SIZE", 500),
+        )
+
+    def open_spider(self, spider):
+        self.database = MPDatabase(self.path)
+        self.batch = []
+        self.written = 0
+        self.changed = 0
+
+    def process_item(self, item, spider):
+        self.batch.append(dict(item))
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+        return item
+
+    def flush(self):
+        if self.batch:
+            self.changed += self.database.write_batch(self.batch)
+            self.written += len(self.batch)
+            self.batch = []
+
+    def close_spider(self, spider):
+        self.flush()
+        self.database.close()
+        logger.info("%d of %d MPs changed in %s", self.changed, self.written, self.path)
@@ -0,0 +1,83 @@
+"""
+Parsing pages in a pool of worker processes.
+
+Parsing is CPU-bound and the spider's callbacks all run in the thread of the Twisted reactor,
+so while a page is parsed nothing is downloaded and a crawl is limited to one core.
+A :class:`ParsePool` sends the pages' text to worker processes instead and hands the
+parsed data back to the reactor as :class:`~twisted.internet.defer.Deferred` objects.
+"""
+
+import collections
+from concurrent.futures import ProcessPoolExecutor
+
+from twisted.internet import defer
+
+from open_parliament.pages import parse_page
+
+
+class ParsePool:
+    """A pool of processes running :func:`open_parliament.pages.parse_page`."""
+
+    def __init__(self, workers, backend="bs4"):
+        """
+        :param workers: The number of worker processes.
+        :param backend: The name of the parser backend used in the workers.
+        """
+        self.backend = backend
+        self.executor = ProcessPoolExecutor(workers)
+
+    def parse(self, kind, html):
+        """
+        Parse a page in one of the workers.
+
+        :returns: A :class:`~twisted.internet.defer.Deferred` firing with the parsed data
+                  in the reactor thread.
+        """
+        # The reactor is imported here, so that importing this module doesn't install one.
+        from twisted.internet import reactor
+
+        deferred = defer.Deferred()
+        future = self.executor.submit(parse_page, self.backend, kind, html)
+        future.add_done_callback(
+            lambda future: reactor.callFromThread(_fire, deferred, future)
+        )
+        return deferred
+
+    def close(self):
+        """Wait for running jobs and stop the workers."""
+        self.executor.shutdown(wait=True)
+
+
+def _fire(deferred, future):
+    exception = future.exception()
+    if exception is not None:
+        deferred.errback(exception)
+    else:
+        deferred.callback(future.result())
+
+
+def map_in_order(function, arguments, workers, window=None):
+    """
+    Yield the results of a function for every tuple of arguments, computed in worker processes.
+
+    The results are yielded in the order of the arguments as soon as they are available,
+    while at most :code:`window` calls are pending, so that long inputs are streamed.
+
+    :param workers: The number of worker processes, with less than 2 the function is called
+                    in this process.
+    :param window: The maximum number of pending calls, 4 per worker by default.
+    """
+    if workers < 2:
+        for args in arguments:
+            yield function(*args)
+        return
+
+    window = window or 4 * workers
+    with ProcessPoolExecutor(workers) as executor:
+        pending = collections.deque()
+        for args in arguments:
+            pending.append(executor.submit(function, *args))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,152 @@
+"""
+Opt-in profiling of the parsers.
+
+When profiling is enabled with :func:`enable`, every call of a parser in
+:mod:`open_parliament.pages` runs under :mod:`cProfile`, with a separate profile for every
+parser. Every few calls :mod:`tracemalloc` traces the memory allocated by the call, which
+is only started for these calls, since tracing all allocations slows down parsing as well.
+At the end of a crawl :meth:`Profiler.report` lists the functions taking the most time and
+the lines allocating the most memory for every parser, which shows e.g. which chain of
+:code:`find` and :code:`find_all` calls got slow after a change of the site's layout.
+
+Profiling slows parsing down considerably, so it is disabled by default.
+Pages parsed in a :class:`open_parliament.pool.ParsePool` are not profiled.
+"""
+
+import contextlib
+import cProfile
+import io
+import linecache
+import pstats
+import tracemalloc
+
+#: The profiler of the current crawl, :code:`None` if profiling is disabled.
+current = None
+
+
+class ParserProfile:
+    """The profile of one parser."""
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+        self.calls = 0
+        #: The number of calls whose allocations were traced.
+        self.snapshots = 0
+        #: The memory allocated in the traced calls in bytes and blocks by source line.
+        self.allocations = {}
+
+    def add_allocations(self, snapshot):
+        """Add the allocations of a call from a snapshot taken at its end."""
+        self.snapshots += 1
+        for statistic in snapshot.statistics("lineno"):
+            frame = statistic.traceback[0]
+            size, count = self.allocations.get(frame, (0, 0))
+            self.allocations[frame] = (size + statistic.size, count + statistic.count)
+
+
+class Profiler:
+    """Profiles the parsers and traces their memory allocations."""
+
+    def __init__(self, snapshot_every=10):
+        """
+        :param snapshot_every: Trace the allocations of every n-th call of a parser.
+        """
+        self.snapshot_every = snapshot_every
+        #: The profiles by the parsers' names.
+        self.parsers = {}
+        self._running = False
+
+    @contextlib.contextmanager
+    def profile(self, parser):
+        """Profile a :code:`with` block running a parser."""
+        if self._running:
+            # cProfile can't profile nested calls with a second profile.
+            yield
+            return
+
+        profile = self.parsers.get(parser)
+        if profile is None:
+            profile = self.parsers[parser] = ParserProfile()
+        # Allocations are not traced if tracemalloc was started by someone else.
+        trace = (
+            profile.calls % self.snapshot_every == 0 and not tracemalloc.is_tracing()
+        )
+        profile.calls += 1
+        self._running = True
+        if trace:
+            tracemalloc.start()
+        profile.profile.enable()
+        try:
+            yield
+        finally:
+            profile.profile.disable()
+            self._running = False
+            if trace:
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+                profile.add_allocations(
+                    snapshot.filter_traces(
+                        [
+                            tracemalloc.Filter(False, tracemalloc.__file__),
+                            tracemalloc.Filter(False, __file__),
+                        ]
+                    )
+                )
+
+    def report(self, top=20):
+        """
+        Return the top functions and allocation sites of every parser as text.
+
+        :param top: The number of functions and of allocation sites listed per parser.
+        """
+        output = io.StringIO()
+        for name, profile in sorted(self.parsers.items()):
+            output.write(
+                "{}: {} calls, allocations traced in {}\n".format(
+                    name, profile.calls, profile.snapshots
+                )
+            )
+            output.write("Top functions by cumulative time:\n")
+            stats = pstats.Stats(profile.profile, stream=output)
+            stats.strip_dirs().sort_stats("cumulative").print_stats(top)
+            output.write(
+                "Top allocation sites per traced call (memory still in use):\n"
+            )
+            allocations = sorted(
+                profile.allocations.items(), key=lambda item: item[1], reverse=True
+            )
+            for frame, (size, count) in allocations[:top]:
+                output.write(
+                    "{:>10.1f} KiB {:>7.1f} blocks  {}:{}  {}\n".format(
+                        size / profile.snapshots / 1024,
+                        count / profile.snapshots,
+                        frame.filename,
+                        frame.lineno,
+                        linecache.getline(frame.filename, frame.lineno).strip(),
+                    )
+                )
+            output.write("\n")
+        return output.getvalue()
+
+
+def enable(snapshot_every=10):
+    """Start a new :data:`current` profiler and return it."""
+    global current
+    current = Profiler(snapshot_every)
+    return current
+
+
+def disable():
+    """Stop profiling."""
+    global current
+    current = None
+
+
+@contextlib.contextmanager
+def profile(parser):
+    """Profile a :code:`with` block running a parser with the :data:`current` profiler, if any."""
+    if current is None:
+        yield
+    else:
+        with current.profile(parser):
+            yield
@@ -0,0 +1,194 @@
+"""
+Records of the data scraped about MPs.
+
+The parsers return records instead of dictionaries. Records store their fields in
+:code:`__slots__`, which needs much less memory than a dictionary per MP, mandate and
+committee. They are mappings of the fields that have been set, so they compare equal to
+dictionaries with the same items and can be used like the dictionaries they replace.
+Values repeated across MPs are interned in the crawl's vocabulary (see
+:mod:`open_parliament.vocabulary`).
+
+Records are passed on as they are wherever the consumer accepts mappings: the asyncio
+engine (see :mod:`open_parliament.engine`) hands them to the pipelines, and
+:func:`json_default` lets JSON encoders write them without converting them first. Scrapy 1.6
+only accepts dictionaries and Items from a spider, so the spider converts every MP with
+:meth:`Record.to_dict` when it yields it, which copies the record once. Until then, e.g.
+while an MP waits for the requests of their further pages, the MP is held as a record.
+"""
+
+from collections.abc import Mapping, MutableMapping
+
+from open_parliament import vocabulary
+
+
+class Record(Mapping):
+    """
+    Base class of records with the fields listed in :code:`__slots__`.
+
+    Fields that have not been set are missing from the mapping. The values of the fields
+    in :attr:`INTERNED` are interned in :data:`open_parliament.vocabulary.current`.
+    """
+
+    __slots__ = ()
+    #: The fields whose values repeat across MPs.
+    INTERNED = ()
+
+    def __init__(self, **fields):
+        for name, value in fields.items():
+            self._set(name, value)
+
+    def _set(self, name, value):
+        if name not in self.__slots__:
+            raise KeyError("{} has no field {!r}".format(type(self).__name__, name))
+        if name in self.INTERNED:
+            value = vocabulary.intern(value)
+        object.__setattr__(self, name, value)
+
+    def __reduce__(self):
+        # Records are rebuilt with their constructor, so that values unpickled from other
+        # processes are interned as well.
+        return (_rebuild, (type(self), tuple(self.items())))
+
+    def __getitem__(self, key):
+        if key in self.__slots__:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                pass
+        raise KeyError(key)
+
+    def __iter__(self):
+        return (name for name in self.__slots__ if hasattr(self, name))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        fields = ", ".join(
+            "{}={!r}".format(name, value) for name, value in self.items()
+        )
+        return "{}({})".format(type(self).__name__, fields)
+
+    def to_dict(self):
+        """Return the record and all records in its fields as dictionaries."""
+        return {name: to_dict(value) for name, value in self.items()}
+
+
+def _rebuild(cls, items):
+    return cls(**dict(items))
+
+
+def to_dict(value):
+    """Return a value with all records in it, including nested ones, converted to dictionaries."""
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [to_dict(v) for v in value]
+    if isinstance(value, dict):
+        return {k: to_dict(v) for k, v in value.items()}
+    return value
+
+
+def json_default(value):
+    """
+    Encode records as JSON objects, for the :code:`default` argument of JSON encoders.
+
+    Nested records are passed to the function again by the encoder.
+    """
+    if isinstance(value, Record):
+        return dict(value)
+    raise TypeError(
+        "Object of type {} is not JSON serializable".format(type(value).__name__)
+    )
+
+
+class Picture(Record):
+    """An MP's portrait with links to the full resolution picture and the thumbnail."""
+
+    __slots__ = ("full", "thumbnail")
+
+
+class Mandate(Record):
+    """A political mandate as returned by :func:`open_parliament.parsers.split_mandate`."""
+
+    __slots__ = ("title", "party", "since")
+    INTERNED = __slots__
+
+
+class CommitteeMembership(Record):
+    """
+    An MP's membership in a committee.
+
+    The committees are indexed by the MP's position and the committee's id in
+    :attr:`MP.committees`.
+    """
+
+    __slots__ = ("url", "name", "since")
+    INTERNED = __slots__
+
+
+class MP(Record, MutableMapping):
+    """
+    The data of an MP.
+
+    Every parser sets some of the fields, see :class:`open_parliament.parsers.Row`,
+    :class:`open_parliament.parsers.PersonalPage` and :class:`open_parliament.parsers.CommitteesPage`.
+    The spider merges them with :meth:`update`.
+    """
+
+    __slots__ = (
+        # The MPs table
+        "id",
+        "url",
+        "first_name",
+        "last_name",
+        "title",
+        "political_affiliation",
+        "wahlkreis",
+        "state",
+        # The personal page
+        "is_president",
+        "salutation",
+        "in_committees",
+        "picture",
+        "address",
+        "emails",
+        "phone_numbers",
+        "websites",
+        "date_of_birth",
+        "place_of_birth",
+        "occupation",
+        "mandates",
+        "posts",
+        "work_history",
+        "education",
+        # The committees
+        "committees",
+    )
+    INTERNED = ("political_affiliation", "state", "wahlkreis")
+
+    def __setitem__(self, key, value):
+        self._set(key, value)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        object.__delattr__(self, key)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from a dictionary as returned by :meth:`to_dict`."""
+        mp = cls(**data)
+        if data.get("picture") is not None:
+            mp.picture = Picture(**data["picture"])
+        if data.get("mandates") is not None:
+            mp.mandates = [Mandate(**m) for m in data["mandates"]]
+        if data.get("committees") is not None:
+            mp.committees = {
+                vocabulary.intern(position): {
+                    vocabulary.intern(id_): CommitteeMembership(**c)
+                    for id_, c in committees.items()
+                }
+                for position, committees in data["committees"].items()
+            }
+        return mp
@@ -0,0 +1,128 @@
+"""
+An on-disk store of the pages scraped in previous runs.
+
+For every page the store keeps the validators sent by the server (:code:`ETag` and
+:code:`Last-Modified`), a hash of the page's main content and the data parsed from it.
+This allows the spider to send conditional requests and to reuse the parsed data when
+the server answers with :code:`304 Not Modified` or when the main content of a page is
+the same as the last time it was scraped.
+
+The stored data is only valid for the parsers that produced it, so the store should be
+deleted when the parsers change.
+"""
+
+import hashlib
+import json
+import sqlite3
+
+from open_parliament.parsers import slice_content
+
+
+def content_hash(body):
+    """
+    Return a hash of a page's main content.
+
+    :param body: The body of a response as :class:`bytes`.
+    """
+    return hashlib.sha256(slice_content(body)).hexdigest()
+
+
+class PageStore:
+    """
+    Stores validators, content hashes and parsed data of pages in an SQLite database.
+
+    Changes are committed every :code:`commit_every` pages and when the store is closed, so a
+    crawl that is killed loses at most the last few pages.
+    """
+
+    def __init__(self, path, commit_every=50):
+        """
+        :param path: The path of the database file, which is created if it doesn't exist.
+        :param commit_every: The number of pages stored between commits.
+        """
+        self.commit_every = commit_every
+        self.pending = 0
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " hash TEXT,"
+            " data TEXT NOT NULL)"
+        )
+
+    def get(self, url):
+        """
+        Return what is stored about a page.
+
+        :returns: A dictionary with keys :code:`etag, last_modified, hash, data` or :code:`None`
+                  if the page is not in the store.
+        """
+        row = self.connection.execute(
+            "SELECT etag, last_modified, hash, data FROM pages WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, hash_, data = row
+        return {
+            "etag": etag,
+            "last_modified": last_modified,
+            "hash": hash_,
+            "data": json.loads(data),
+        }
+
+    def find(self, url, hash_):
+        """
+        Return the data parsed from a page if its content hash is still the same.
+
+        Only the page's own entry is looked up: two pages with the same main content,
+        e.g. the personal page and the committees tab of an MP, don't share their data.
+
+        :returns: The parsed data or :code:`None` if the page is not stored with that content.
+        """
+        row = self.connection.execute(
+            "SELECT data FROM pages WHERE url = ? AND hash = ?", (url, hash_)
+        ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def put(self, url, etag, last_modified, hash_, data):
+        """
+        Store the validators, the content hash and the parsed data of a page.
+
+        :param data: The data parsed from the page, which must be serializable to JSON.
+        """
+        self.connection.execute(
+            "INSERT OR REPLACE INTO pages (url, etag, last_modified, hash, data)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (url, etag, last_modified, hash_, json.dumps(data)),
+        )
+        self.pending += 1
+        if self.pending >= self.commit_every:
+            self.commit()
+
+    def commit(self):
+        """Commit the pages stored since the last commit."""
+        self.connection.commit()
+        self.pending = 0
+
+    def conditional_headers(self, url):
+        """
+        Return the headers for a conditional request of a page.
+
+        :returns: A dictionary containing :code:`If-None-Match` and :code:`If-Modified-Since`
+                  for the validators known for the page.
+        """
+        page = self.get(url)
+        headers = {}
+        if page is not None:
+            if page["etag"]:
+                headers["If-None-Match"] = page["etag"]
+            if page["last_modified"]:
+                headers["If-Modified-Since"] = page["last_modified"]
+        return headers
+
+    def close(self):
+        """Commit all changes and close the database."""
+        self.commit()
+        self.connection.close()
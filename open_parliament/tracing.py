@@ -0,0 +1,146 @@
+"""
+Tracing the requests of a crawl in the Chrome trace event format.
+
+A :class:`Tracer` follows every MP's path through the crawl: the row in the MPs table, the
+requests of the MP's pages, which are chained through :code:`request.meta["mp"]`, and the
+item. For every request it records spans for the time waiting in the scheduler, the download
+(including the wait for a free download slot) and the callback. Every MP gets a track of its
+own, the MPs tables share one track.
+
+The trace written by :meth:`Tracer.write` can be opened in :code:`chrome://tracing` or
+https://ui.perfetto.dev. It shows how the chained requests of an MP serialise their latencies
+and whether time is spent waiting for the scheduler and download slots, which more
+concurrency would help with, or in the downloads and callbacks themselves.
+"""
+
+import json
+import time
+
+from scrapy import signals
+
+#: The track of the MPs tables.
+TABLES = 0
+
+
+class Tracer:
+    """Collects the trace events of a crawl."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.events = []
+        #: The names of the tracks by id.
+        self.tracks = {TABLES: "MPs tables"}
+
+    def now(self):
+        """Return the time since the start of the trace in microseconds."""
+        return (time.perf_counter() - self.started) * 1e6
+
+    def connect(self, signal_manager):
+        """Record when requests are scheduled, reach the downloader and are downloaded."""
+        stamps = [
+            ("request_scheduled", "scheduled"),
+            ("request_reached_downloader", "downloading"),
+            ("response_downloaded", "downloaded"),
+        ]
+        for signal_name, stamp in stamps:
+            # request_reached_downloader is missing in older versions of Scrapy.
+            signal = getattr(signals, signal_name, None)
+            if signal is not None:
+                signal_manager.connect(self._stamper(stamp), signal=signal, weak=False)
+
+    def _stamper(self, stamp):
+        def stamp_request(request, **kwargs):
+            request.meta.setdefault("trace", {})[stamp] = self.now()
+
+        return stamp_request
+
+    def track(self, mp=None):
+        """Return the track of an MP, or of the MPs tables without an MP."""
+        if mp is None:
+            return TABLES
+        track = int(mp["id"])
+        if track not in self.tracks:
+            self.tracks[track] = "{} {} {}".format(
+                mp["id"], mp.get("first_name", ""), mp.get("last_name", "")
+            ).strip()
+        return track
+
+    def span(self, name, track, start, end, **args):
+        """Add a span from :code:`start` to :code:`end` (microseconds, see :meth:`now`)."""
+        self.events.append(
+            {
+                "name": name,
+                "ph": "X",
+                "ts": start,
+                "dur": max(end - start, 0),
+                "pid": 1,
+                "tid": track,
+                "args": args,
+            }
+        )
+
+    def instant(self, name, track, **args):
+        """Add an event happening now."""
+        self.events.append(
+            {
+                "name": name,
+                "ph": "i",
+                "s": "t",
+                "ts": self.now(),
+                "pid": 1,
+                "tid": track,
+                "args": args,
+            }
+        )
+
+    def request_spans(self, response, track):
+        """
+        Add the spans of the scheduler wait and the download of a response's request.
+
+        Stages that weren't recorded, e.g. because the response came from a cache, are left out.
+        """
+        stamps = response.meta.get("trace", {})
+        scheduled = stamps.get("scheduled")
+        downloading = stamps.get("downloading")
+        downloaded = stamps.get("downloaded")
+        if scheduled is not None and downloading is not None:
+            self.span("scheduler", track, scheduled, downloading, url=response.url)
+        if downloaded is not None:
+            self.span(
+                "download",
+                track,
+                downloading if downloading is not None else downloaded,
+                downloaded,
+                url=response.url,
+                status=response.status,
+                latency=response.meta.get("download_latency"),
+            )
+
+    def traced_iter(self, iterable, name, track, **args):
+        """Yield from an iterable and add a span from the first to the last item."""
+        start = self.now()
+        try:
+            yield from iterable
+        finally:
+            self.span(name, track, start, self.now(), **args)
+
+    def write(self, path):
+        """Write the trace as JSON."""
+        metadata = [
+            {"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "crawl"}}
+        ] + [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": 1,
+                "tid": track,
+                "args": {"name": name},
+            }
+            for track, name in sorted(self.tracks.items())
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"traceEvents": metadata + self.events, "displayTimeUnit": "ms"},
+                f,
+                ensure_ascii=False,
+            )
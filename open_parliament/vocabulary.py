@@ -0,0 +1,129 @@
+"""
+A shared vocabulary of the values repeated across MPs.
+
+Parties, states, electoral districts, mandate titles and committees are the same for many MPs.
+The records (see :mod:`open_parliament.records`) intern these values in the :data:`current`
+vocabulary, so every distinct value is held in memory only once. The spider starts a new
+vocabulary for every crawl with :func:`reset`.
+
+The vocabulary is also the basis of a dictionary encoded export: :func:`encode_items` writes
+JSON Lines in which the repeated values are replaced by their ids. New values are added to
+the :code:`"vocabulary"` of the first line using them, and :func:`decode_items` restores the
+original items.
+"""
+
+
+class Vocabulary:
+    """Maps every distinct value to a single instance and a numeric id."""
+
+    def __init__(self):
+        self.ids = {}
+        self.values = []
+
+    def intern(self, value):
+        """Return the instance of a value held by the vocabulary, adding it if it is new."""
+        if value is None:
+            return None
+        return self.values[self.id(value)]
+
+    def id(self, value):
+        """Return the id of a value, adding it if it is new."""
+        id_ = self.ids.get(value)
+        if id_ is None:
+            id_ = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return id_
+
+    def __len__(self):
+        return len(self.values)
+
+
+#: The vocabulary of the current crawl.
+current = Vocabulary()
+
+
+def intern(value):
+    """Intern a value in the :data:`current` vocabulary."""
+    return current.intern(value)
+
+
+def reset():
+    """Start a new :data:`current` vocabulary and return it."""
+    global current
+    current = Vocabulary()
+    return current
+
+
+#: The first line of dictionary encoded JSON Lines.
+HEADER = {"format": "open-parliament-dictionary", "version": 1}
+
+#: The encoded fields of MPs, mandates and committees.
+MP_FIELDS = ("political_affiliation", "state", "wahlkreis")
+MANDATE_FIELDS = ("title", "party", "since")
+COMMITTEE_FIELDS = ("url", "name", "since")
+
+
+def _map_fields(data, fields, function):
+    data = dict(data)
+    for field in fields:
+        if data.get(field) is not None:
+            data[field] = function(data[field])
+    return data
+
+
+def _map_mp(mp, function, key_function):
+    """
+    Apply a function to the encoded values of an MP.
+
+    :param key_function: The function applied to the committee positions and ids, which
+                         are keys of JSON objects and thus have to be strings when encoded.
+    """
+    mp = _map_fields(mp, MP_FIELDS, function)
+    if mp.get("mandates") is not None:
+        mp["mandates"] = [
+            _map_fields(m, MANDATE_FIELDS, function) for m in mp["mandates"]
+        ]
+    if mp.get("committees") is not None:
+        mp["committees"] = {
+            key_function(position): {
+                key_function(id_): _map_fields(c, COMMITTEE_FIELDS, function)
+                for id_, c in committees.items()
+            }
+            for position, committees in mp["committees"].items()
+        }
+    return mp
+
+
+def encode_items(items):
+    """
+    Dictionary encode MPs.
+
+    :param items: MPs as dictionaries.
+    :returns: An iterator of dictionaries to be written as JSON Lines, starting with :data:`HEADER`.
+    """
+    yield HEADER
+    vocabulary = Vocabulary()
+    for item in items:
+        known = len(vocabulary)
+        encoded = _map_mp(item, vocabulary.id, lambda key: str(vocabulary.id(key)))
+        if len(vocabulary) > known:
+            encoded["vocabulary"] = vocabulary.values[known:]
+        yield encoded
+
+
+def is_encoded(item):
+    """Return whether an item is the header of dictionary encoded JSON Lines."""
+    return item == HEADER
+
+
+def decode_items(items):
+    """
+    Decode dictionary encoded MPs.
+
+    :param items: The items following :data:`HEADER` as returned by :func:`encode_items`.
+    """
+    values = []
+    for item in items:
+        values.extend(item.get("vocabulary", []))
+        item = {k: v for k, v in item.items() if k != "vocabulary"}
+        yield _map_mp(item, values.__getitem__, lambda key: values[int(key)])
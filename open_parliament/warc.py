@@ -0,0 +1,168 @@
+"""
+Reading HTTP responses from WARC_ files.
+
+Both uncompressed files and gzip compressed files with one record per gzip member (the usual
+:code:`.warc.gz` layout) are supported. Only the positions of the response records are kept in
+memory, the records themselves are read when they are needed.
+
+.. _WARC: https://iipc.github.io/warc-specifications/specifications/warc-format/warc-1.1/
+"""
+
+import zlib
+
+from w3lib.url import canonicalize_url
+
+GZIP_MAGIC = b"\x1f\x8b"
+READ_SIZE = 64 * 1024
+
+
+def parse_headers(lines):
+    """Parse header lines into a list of :code:`(name, value)` tuples."""
+    headers = []
+    for line in lines:
+        name, _, value = line.partition(b":")
+        headers.append((name.strip().decode("latin-1"), value.strip()))
+    return headers
+
+
+def parse_record(data):
+    """
+    Parse the first WARC record in :code:`data`.
+
+    :returns: A tuple of the record's headers (a dictionary with lower case names)
+              and its content block.
+    """
+    head, _, rest = data.partition(b"\r\n\r\n")
+    lines = head.split(b"\r\n")
+    if not lines[0].startswith(b"WARC/"):
+        raise ValueError("Not a WARC record: {!r}".format(lines[0][:20]))
+    headers = {n.lower(): v.decode("utf-8") for n, v in parse_headers(lines[1:])}
+    length = int(headers["content-length"])
+    return headers, rest[:length]
+
+
+def dechunk(body):
+    """Decode a body sent with :code:`Transfer-Encoding: chunked`."""
+    chunks = []
+    while body:
+        size, _, body = body.partition(b"\r\n")
+        size = int(size.split(b";")[0], 16)
+        if size == 0:
+            break
+        chunks.append(body[:size])
+        body = body[size + 2 :]
+    return b"".join(chunks)
+
+
+def parse_http_response(block):
+    """
+    Parse the content block of a WARC response record.
+
+    :returns: A tuple of the status code, the headers as a list of :code:`(name, value)`
+              tuples and the body.
+    """
+    head, _, body = block.partition(b"\r\n\r\n")
+    lines = head.split(b"\r\n")
+    status = int(lines[0].split()[1])
+    headers = parse_headers(lines[1:])
+    if any(
+        n.lower() == "transfer-encoding" and v.lower() == b"chunked" for n, v in headers
+    ):
+        body = dechunk(body)
+        headers = [(n, v) for n, v in headers if n.lower() != "transfer-encoding"]
+    return status, headers, body
+
+
+class WarcArchive:
+    """
+    The HTTP responses stored in a WARC file, indexed by their URLs.
+
+    :meth:`get` looks up a response by its URL. URLs are compared in their canonical form
+    (see :func:`w3lib.url.canonicalize_url`), so the order of query arguments doesn't matter.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.compressed = self.file.read(2) == GZIP_MAGIC
+        self.index = {}
+        for offset, (headers, _) in self._records():
+            if headers.get("warc-type") == "response":
+                url = canonicalize_url(headers["warc-target-uri"])
+                self.index[url] = offset
+
+    def _read_member(self, offset):
+        """
+        Decompress the gzip member starting at :code:`offset`.
+
+        :returns: A tuple of the decompressed data and the offset of the next member.
+        """
+        self.file.seek(offset)
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        data = []
+        while not decompressor.eof:
+            chunk = self.file.read(READ_SIZE)
+            if not chunk:
+                break
+            data.append(decompressor.decompress(chunk))
+        end = self.file.tell() - len(decompressor.unused_data)
+        return b"".join(data), end
+
+    def _read_plain(self, offset):
+        """
+        Read the uncompressed record starting at :code:`offset`.
+
+        :returns: A tuple of the record's data and the offset of the next record.
+        """
+        self.file.seek(offset)
+        head = b""
+        while b"\r\n\r\n" not in head:
+            chunk = self.file.read(READ_SIZE)
+            if not chunk:
+                break
+            head += chunk
+        if b"\r\n\r\n" not in head:
+            return b"", offset + len(head)
+        header_end = head.find(b"\r\n\r\n") + 4
+        headers, _ = parse_record(head)
+        end = offset + header_end + int(headers["content-length"])
+        self.file.seek(offset)
+        data = self.file.read(end - offset)
+        # Records are separated by two newlines.
+        return data, end + 4
+
+    def _read(self, offset):
+        if self.compressed:
+            return self._read_member(offset)
+        return self._read_plain(offset)
+
+    def _records(self):
+        """Yield the offset and the parsed record of every record in the file."""
+        offset = 0
+        self.file.seek(0, 2)
+        size = self.file.tell()
+        while offset < size:
+            data, end = self._read(offset)
+            if not data.strip():
+                break
+            yield offset, parse_record(data)
+            offset = end
+
+    def get(self, url):
+        """
+        Return the response recorded for a URL.
+
+        :returns: A tuple as returned by :func:`parse_http_response` or :code:`None` if the
+                  URL is not in the archive.
+        """
+        offset = self.index.get(canonicalize_url(url))
+        if offset is None:
+            return None
+        data, _ = self._read(offset)
+        _, block = parse_record(data)
+        return parse_http_response(block)
+
+    def __len__(self):
+        return len(self.index)
+
+    def close(self):
+        self.file.close()
@@ -22,4 +22,10 @@ setup(
         'requests==2.21.0',
         'scrapy==1.6.0',
     ],
+    extras_require={
+        'asyncio': ['aiohttp'],
+        'columnar': ['pyarrow'],
+        'fast': ['orjson'],
+        'zstd': ['backports.zstd; python_version < "3.14"'],
+    },
 )
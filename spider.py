@@ -1,9 +1,47 @@
-from bs4 import BeautifulSoup
+import functools
+import time
+import types
+import weakref
 
 import scrapy
+from twisted.internet import defer
 
 
-from open_parliament.parsers import Row, PersonalPage, CommitteesPage
+from open_parliament import metrics as _metrics
+from open_parliament import pages, parsers, profiling, vocabulary
+from open_parliament.pages import BACKENDS
+from open_parliament.pool import ParsePool
+from open_parliament.records import MP, to_dict
+from open_parliament.store import PageStore, content_hash
+from open_parliament.tracing import Tracer
+
+
+def measured(callback):
+    """
+    Record the time spent in a callback and the download latency and queue depth of its response.
+
+    The work of callbacks returning generators is timed while the generators are consumed.
+    With tracing the spans of the response's request and of the callback are traced as well.
+    """
+    name = callback.__name__
+
+    @functools.wraps(callback)
+    def wrapper(self, response):
+        self._observe_response(response)
+        start = time.perf_counter()
+        traced = self.tracer.now() if self.tracer is not None else None
+        result = callback(self, response)
+        if isinstance(result, types.GeneratorType):
+            result = self.metrics.timed_iter(result, "callback_seconds", callback=name)
+        else:
+            self.metrics.observe(
+                "callback_seconds", time.perf_counter() - start, callback=name
+            )
+        if self.tracer is not None:
+            result = self._trace_callback(response, name, traced, result)
+        return result
+
+    return wrapper
 
 
 class NationalratsSpider(scrapy.Spider):
@@ -12,73 +50,322 @@ class NationalratsSpider(scrapy.Spider):
 
     Scrapes biographical data, contact information, party information and committee membership.
 
-    .. seealso:: :mod:`open_parliament.parsers`
+    The parser backend is chosen with the spider argument :code:`backend`, which is one of
+    the keys of :data:`BACKENDS` (e.g. :code:`scrapy runspider spider.py -a backend=lxml`).
+
+    With the spider argument :code:`store` (the path of a :class:`open_parliament.store.PageStore`)
+    MPs' pages are requested conditionally and the data parsed in a previous run is reused for
+    pages that have not been modified since or whose main content is unchanged.
+    The argument :code:`base` replaces :attr:`BASE`.
+
+    With the spider argument :code:`workers` pages are parsed in a :class:`open_parliament.pool.ParsePool`
+    of that many processes, so that parsing doesn't block downloads. The callbacks then return
+    Deferreds firing with their results.
+
+    The spider arguments :code:`periods` and :code:`chambers` select the MPs tables to crawl as
+    comma separated lists of legislative periods (e.g. :code:`AKT,XXV,XXIV`, where :code:`AKT`
+    are the current MPs) and chambers (:code:`NR` for the Nationalrat, :code:`BR` for the
+    Bundesrat). Every person is fetched once, no matter in how many tables they are listed;
+    their table row is taken from the first table listing them. Both arguments are experimental,
+    see :data:`open_parliament.pages.CURRENT_TABLE`.
+
+    The spider records timing histograms of its callbacks, the downloads and the parsers, the
+    parsed bytes, the queue depth and the scraped items in :attr:`metrics` (see
+    :mod:`open_parliament.metrics`). They are added to Scrapy's stats at the end of the crawl
+    and, with the spider argument :code:`metrics` (a path), written as a Prometheus textfile.
+    With the spider argument :code:`profile` (e.g. :code:`-a profile=1`) the parsers are
+    profiled and the top functions and allocation sites of every parser are logged at the end
+    of the crawl (see :mod:`open_parliament.profiling`).
+
+    With the spider argument :code:`trace` (a path) the requests of every MP are traced
+    and written in the Chrome trace event format (see :mod:`open_parliament.tracing`).
+
+    .. seealso:: :mod:`open_parliament.pages`, :mod:`open_parliament.parsers`,
+                 :mod:`open_parliament.lxml_parsers`
     .. _Nationalrat: https://www.parlament.gv.at/WWER/NR/AKT/
     """
 
     name = "nationalrat"
-    BASE = "https://www.parlament.gv.at"
+    BASE = pages.BASE
     start_urls = [BASE + "/WWER/NR/AKT/index.shtml"]
+    #: The paths of the MPs tables of current and former legislative periods.
+    CURRENT_TABLE = pages.CURRENT_TABLE
+    PERIOD_TABLE = pages.PERIOD_TABLE
+    #: The module providing the parsers and the page lookups.
+    parsers = parsers
+
+    def __init__(
+        self,
+        *args,
+        backend=None,
+        store=None,
+        base=None,
+        workers=None,
+        periods="AKT",
+        chambers="NR",
+        metrics=None,
+        profile=False,
+        trace=None,
+        **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        if backend is not None:
+            self.parsers = BACKENDS[backend]
+        else:
+            backend = "bs4"
+        if base is not None:
+            self.BASE = base
+        self.start_urls = [
+            self.BASE + self.table_path(chamber, period)
+            for chamber in chambers.split(",")
+            for period in periods.split(",")
+        ]
+        #: The ids of all persons requested so far.
+        self.seen_ids = set()
+        self.store = PageStore(store) if store is not None else None
+        self.pool = ParsePool(int(workers), backend) if workers else None
+        self._documents = weakref.WeakKeyDictionary()
+        #: The values interned by the records of this crawl.
+        self.vocabulary = vocabulary.reset()
+        #: The metrics of this crawl.
+        self.metrics = _metrics.reset()
+        self.metrics_path = metrics
+        self.profiler = profiling.enable() if profile else None
+        self.trace_path = trace
+        self.tracer = Tracer() if trace is not None else None
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        if spider.tracer is not None:
+            spider.tracer.connect(crawler.signals)
+        return spider
+
+    def closed(self, reason):
+        if self.store is not None:
+            self.store.close()
+        if self.pool is not None:
+            self.pool.close()
+        self.metrics.finish()
+        if getattr(self, "crawler", None) is not None:
+            self.metrics.to_stats(self.crawler.stats)
+        if self.metrics_path is not None:
+            self.metrics.write_textfile(self.metrics_path)
+        if self.profiler is not None:
+            self.logger.info("Profiles of the parsers:\n%s", self.profiler.report())
+            profiling.disable()
+        if self.tracer is not None:
+            self.tracer.write(self.trace_path)
+
+    def _observe_response(self, response):
+        latency = response.meta.get("download_latency")
+        if latency is not None:
+            self.metrics.observe("download_seconds", latency)
+        if getattr(self, "crawler", None) is not None:
+            stats = self.crawler.stats
+            depth = stats.get_value("scheduler/enqueued", 0) - stats.get_value(
+                "scheduler/dequeued", 0
+            )
+            self.metrics.observe("queue_depth", depth)
+
+    def _trace_callback(self, response, name, start, result):
+        """Trace the spans of a response's request and of its callback."""
+        track = self.tracer.track(response.meta.get("mp"))
+        self.tracer.request_spans(response, track)
+        if isinstance(result, defer.Deferred):
+
+            def parsed(value):
+                self.tracer.span(name, track, start, self.tracer.now())
+                return value
+
+            return result.addBoth(parsed)
+        if isinstance(result, types.GeneratorType):
+            return self.tracer.traced_iter(result, name, track)
+        self.tracer.span(name, track, start, self.tracer.now())
+        return result
+
+    def table_path(self, chamber, period):
+        """Return the path of the MPs table of a chamber in a legislative period."""
+        return pages.table_path(chamber, period, self.CURRENT_TABLE, self.PERIOD_TABLE)
+
+    def get_document(self, response, scope="content"):
+        """
+        Return the parsed document of a response.
+
+        The document is parsed on first access and cached for as long as the response is alive,
+        so that all callbacks and parsers handling the response share a single tree.
+
+        :param scope: The part of the page to parse, see :func:`open_parliament.parsers.parse_html`.
+        """
+        document = self._documents.get(response)
+        if document is None:
+            document = self._documents[response] = pages.parse_html(
+                self.parsers, response.text, scope
+            )
+        return document
+
+    def parse_page(self, response, kind):
+        """
+        Parse a response with the function of :data:`open_parliament.pages.PAGES` for its kind.
 
+        :returns: The parsed data or, with a parse pool, a :class:`~twisted.internet.defer.Deferred`
+                  firing with it.
+        """
+        self.metrics.inc("parsed_bytes_total", len(response.body), kind=kind)
+        if self.pool is not None:
+            start = time.perf_counter()
+            return self.pool.parse(kind, response.text).addCallback(
+                self._page_parsed, kind, start
+            )
+        scope, parse = pages.PAGES[kind]
+        with self.metrics.time("page_parse_seconds", kind=kind):
+            return parse(self.parsers, self.get_document(response, scope))
+
+    def _page_parsed(self, data, kind, start):
+        self.metrics.observe(
+            "page_parse_seconds", time.perf_counter() - start, kind=kind
+        )
+        return data
+
+    @staticmethod
+    def _then(result, function, *args):
+        """Call a function with a result, after it fired if it is a Deferred."""
+        if isinstance(result, defer.Deferred):
+            return result.addCallback(function, *args)
+        return function(result, *args)
+
+    @measured
     def parse(self, response):
-        soup = BeautifulSoup(response.text, features="html.parser")
-        next_page = soup.find("div", class_="paginationRechts").a.attrs["href"]
+        """
+        Follow the link to the whole MPs table.
+
+        Tables that fit on a single page, e.g. the Bundesrat's, have no such link. Their rows
+        are taken from the document the link was looked for in, so the page is parsed once.
+        """
+        document = self.get_document(response)
+        next_page = self.parsers.find_show_all_link(document)
         if next_page is not None:
-            yield response.follow(next_page, self.parse_table)
+            return [response.follow(next_page, self.parse_table)]
+        self.metrics.inc("parsed_bytes_total", len(response.body), kind=pages.TABLE)
+        with self.metrics.time("page_parse_seconds", kind=pages.TABLE):
+            mps = pages.parse_table(self.parsers, document)
+        return self._mp_requests(mps)
 
+    @measured
     def parse_table(self, response):
-        soup = BeautifulSoup(response.text, features="html.parser")
-        table = soup.find(
-            "table",
-            summary="Liste zeigt die ausgewählten Abgeordnete, die derzeit ein Mandat innehaben",
+        """
+        Request the pages of the MPs in the MPs table.
+
+        The requests are yielded while the table is parsed, see :func:`open_parliament.pages.iter_table`.
+        """
+        if self.pool is not None:
+            return self._then(self.parse_page(response, pages.TABLE), self._mp_requests)
+        self.metrics.inc("parsed_bytes_total", len(response.body), kind=pages.TABLE)
+        mps = pages.iter_table(self.parsers, response.body, response.encoding)
+        return self._mp_requests(mps)
+
+    def _mp_requests(self, mps):
+        for mp in mps:
+            if mp["id"] not in self.seen_ids:
+                self.seen_ids.add(mp["id"])
+                if self.tracer is not None:
+                    self.tracer.instant("table row", self.tracer.track(mp))
+                yield self.mp_request(self.BASE + mp["url"], self.parse_mp, mp)
+
+    def mp_request(self, url, callback, mp):
+        """
+        Build the request for one of an MP's pages.
+
+        If the page is in the store, the request is conditional and a :code:`304 Not Modified`
+        response is passed to the callback.
+
+        MPs' pages are requested before further tables, so that the scheduler holds
+        the requests of about one table at a time.
+        """
+        request = scrapy.Request(url, callback=callback, priority=1)
+        request.meta["mp"] = mp
+        if self.store is not None:
+            request.headers.update(self.store.conditional_headers(url))
+            request.meta["handle_httpstatus_list"] = [304]
+        return request
+
+    def load_page(self, response, kind):
+        """
+        Return the data parsed from one of an MP's pages.
+
+        Pages that have not been modified since the last run are not parsed again,
+        instead the data stored for them is returned. This applies to :code:`304 Not Modified`
+        responses as well as to pages whose main content hashes to the same value as when
+        they were stored.
+
+        :param kind: The kind of the page, see :meth:`parse_page`.
+        """
+        if self.store is None:
+            return self.parse_page(response, kind)
+        if response.status == 304:
+            return MP.from_dict(self.store.get(response.url)["data"])
+
+        hash_ = content_hash(response.body)
+        data = self.store.find(response.url, hash_)
+        if data is None:
+            data = self.parse_page(response, kind)
+        else:
+            data = MP.from_dict(data)
+        return self._then(data, self._store_page, response, hash_)
+
+    def _store_page(self, data, response, hash_):
+        self.store.put(
+            response.url,
+            self._header(response, "ETag"),
+            self._header(response, "Last-Modified"),
+            hash_,
+            data.to_dict(),
         )
-        rows = table.find_all("tr")
-        for row in rows:
-            parser = Row(row)
-            mp = parser.parse()
-            if mp:
-                request = scrapy.Request(self.BASE + mp["url"], callback=self.parse_mp)
-                request.meta["mp"] = mp
-                yield request
+        return data
 
+    @staticmethod
+    def _header(response, name):
+        value = response.headers.get(name)
+        return value.decode("latin-1") if value is not None else None
+
+    @measured
     def parse_mp(self, response):
         mp = response.meta["mp"]
-        soup = BeautifulSoup(response.text, features="html.parser")
-        is_president = soup.find(id="biogr_Einleitung") is not None
+        return self._then(self.load_page(response, pages.PERSONAL), self._mp_loaded, mp)
 
-        if is_president:
-            request = scrapy.Request(
-                self.BASE + mp["url"] + "zurPerson.shtml", callback=self.parse_president
-            )
-            request.meta["mp"] = mp
-            yield request
-        else:
-            mp = self.parse_details(response, False)
-            if mp["in_committees"]:
-                url = self.BASE + mp["url"] + "index.shtml#tab-Ausschuesse"
-                request = scrapy.Request(url, callback=self.parse_committees)
-                request.meta["mp"] = mp
-                yield request
-            else:
-                yield mp
+    def _mp_loaded(self, data, mp):
+        mp.update(data)
+        if mp["is_president"]:
+            url = self.BASE + mp["url"] + pages.PRESIDENT_PAGE
+            return [self.mp_request(url, self.parse_president, mp)]
+        self._item_scraped(mp)
+        return [to_dict(mp)]
 
+    @measured
     def parse_president(self, response):
-        mp = self.parse_details(response, True)
-        url = self.BASE + mp["url"] + "ausschuesse.shtml"
+        mp = response.meta["mp"]
+        return self._then(
+            self.load_page(response, pages.PRESIDENT), self._president_loaded, mp
+        )
 
-        request = scrapy.Request(url, callback=self.parse_committees)
-        request.meta["mp"] = mp
-        yield request
+    def _item_scraped(self, mp):
+        self.metrics.inc("items_total")
+        if self.tracer is not None:
+            self.tracer.instant("item", self.tracer.track(mp))
+
+    def _president_loaded(self, data, mp):
+        mp.update(data)
+        url = self.BASE + mp["url"] + pages.COMMITTEES_PAGE
+        return [self.mp_request(url, self.parse_committees, mp)]
 
+    @measured
     def parse_committees(self, response):
         mp = response.meta["mp"]
-        committee_parser = CommitteesPage(response.text)
-        mp.update(committee_parser.parse())
-        yield mp
+        return self._then(
+            self.load_page(response, pages.COMMITTEES), self._committees_loaded, mp
+        )
 
-    @staticmethod
-    def parse_details(response, is_president):
-        mp = response.meta["mp"]
-        parser = PersonalPage(response.text)
-        mp.update(parser.parse(is_president))
-        return mp
+    def _committees_loaded(self, data, mp):
+        mp.update(data)
+        self._item_scraped(mp)
+        return [to_dict(mp)]
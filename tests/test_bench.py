@@ -0,0 +1,96 @@
+"""Tests for the parser benchmarks."""
+import json
+
+from click.testing import CliRunner
+
+from cli import cli
+from open_parliament import bench, corpus
+
+
+def test_page_kinds(shared_datadir):
+    """Test whether saved pages are classified by their content."""
+    pages = dict(corpus.iter_pages(str(shared_datadir)))
+    assert corpus.page_kinds(pages["nationalrat_aktuell.html"]) == [corpus.TABLE]
+    assert corpus.page_kinds(pages["nationalrat_hannes.html"]) == [
+        corpus.PERSONAL,
+        corpus.COMMITTEES,
+    ]
+    assert corpus.page_kinds(pages["nationalrat_sobotka_ausschuesse.html"]) == [corpus.COMMITTEES]
+    assert corpus.is_president_details(pages["nationalrat_sobotka_zur_person.html"])
+    assert not corpus.is_president_details(pages["nationalrat_hannes.html"])
+
+
+def test_run_benchmarks(shared_datadir):
+    """Test whether every parser is measured over the pages of its kind."""
+    results = bench.run_benchmarks(str(shared_datadir), ["lxml"], repeat=1)
+    assert sorted(results) == [
+        "lxml:CommitteesPage.parse",
+        "lxml:PersonalPage.parse",
+        "lxml:Row.parse",
+        "lxml:parse_html",
+    ]
+    assert results["lxml:parse_html"]["pages"] == 18
+    result = results["lxml:Row.parse"]
+    assert result["pages"] == 4
+    assert result["median_ms"] <= result["max_ms"]
+    assert result["pages_per_second"] > 0
+    assert result["peak_memory_kib"] > 0
+
+
+def test_find_regressions():
+    """Test whether only results worse than baseline plus tolerance are regressions."""
+    baseline = {
+        "lxml:Row.parse": {"median_ms": 10.0, "peak_memory_kib": 100.0},
+        "bs4:Row.parse": {"median_ms": 10.0, "peak_memory_kib": 100.0},
+    }
+    results = {
+        "lxml:Row.parse": {"median_ms": 12.0, "peak_memory_kib": 130.0},
+        "bs4:Row.parse": {"median_ms": 9.0, "peak_memory_kib": 100.0},
+        "lxml:PersonalPage.parse": {"median_ms": 100.0, "peak_memory_kib": 100.0},
+    }
+    regressions = bench.find_regressions(results, baseline, tolerance=0.25)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("lxml:Row.parse peak_memory_kib")
+
+
+def test_bench_command(shared_datadir, tmp_path):
+    """Test whether the command saves results and fails on regressions."""
+    runner = CliRunner()
+    saved = str(tmp_path / "bench.json")
+    result = runner.invoke(
+        cli,
+        [
+            "bench",
+            str(shared_datadir),
+            "--backend",
+            "lxml",
+            "--repeat",
+            "1",
+            "--save",
+            saved,
+        ],
+    )
+    assert result.exit_code == 0
+    assert "lxml:PersonalPage.parse" in result.output
+
+    with open(saved) as f:
+        baseline = json.load(f)
+    for values in baseline.values():
+        values["median_ms"] /= 100
+    with open(saved, "w") as f:
+        json.dump(baseline, f)
+    result = runner.invoke(
+        cli,
+        [
+            "bench",
+            str(shared_datadir),
+            "--backend",
+            "lxml",
+            "--repeat",
+            "1",
+            "--baseline",
+            saved,
+        ],
+    )
+    assert result.exit_code == 1
+    assert "Regression: lxml:" in result.output
@@ -0,0 +1,273 @@
+"""Tests for the command line interface."""
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import threading
+
+from click.testing import CliRunner
+
+import cli
+import pytest
+from open_parliament.database import MPDatabase
+
+
+def make_mp(id_, last_name):
+    return {
+        "id": id_,
+        "first_name": "Max",
+        "last_name": last_name,
+        "title": "",
+        "salutation": "Max " + last_name,
+        "emails": [last_name.lower() + "@parlament.gv.at"],
+        "political_affiliation": "Freiheitlicher Parlamentsklub (FPÖ)",
+        "state": "Steiermark",
+        "occupation": "Angestellter",
+        "place_of_birth": "Graz",
+        "date_of_birth": "01.01.1970",
+        "mandates": [{"title": "Abgeordneter zum Nationalrat (XXVI. GP)"}],
+        "committees": {"Mitglied": {"A-AS": {"name": "Sportausschuss"}}},
+    }
+
+
+MPS = [
+    make_mp("51879", "Amesbauer"),
+    make_mp("02349", "Bißmann"),
+    make_mp("14836", "Becher"),
+]
+
+
+def convert(data, *options):
+    result = CliRunner().invoke(
+        cli.cli, ["convert-to-csv", *options], input=data.encode("utf-8")
+    )
+    assert result.exit_code == 0, result.output
+    return list(csv.DictReader(io.StringIO(result.output)))
+
+
+def test_convert_json():
+    """Test whether a JSON feed is converted and sorted by id."""
+    rows = convert(json.dumps(MPS))
+
+    assert [r["identifier"] for r in rows] == ["02349", "14836", "51879"]
+    assert rows[2]["display_name"] == "Amesbauer Max (FPÖ)"
+    assert rows[2]["email"] == "amesbauer@parlament.gv.at"
+    assert rows[2]["committees"] == ",Sportausschuss,"
+
+
+def test_convert_jsonlines():
+    """Test whether JSON Lines are converted like JSON and sorted with a bounded buffer."""
+    jsonlines = "".join(json.dumps(mp) + "\n" for mp in MPS)
+
+    assert convert(jsonlines, "--sort-buffer", "2") == convert(json.dumps(MPS))
+    assert convert(jsonlines, "--sort-buffer", "3") == convert(json.dumps(MPS))
+
+
+def test_convert_stream():
+    """Test whether streamed rows keep the order of the input."""
+    jsonlines = "".join(json.dumps(mp) + "\n" for mp in MPS)
+
+    rows = convert(jsonlines, "--stream")
+
+    assert [r["identifier"] for r in rows] == ["51879", "02349", "14836"]
+
+
+def test_convert_encoded():
+    """Test whether dictionary encoded items are smaller and converted like the original."""
+    jsonlines = "".join(json.dumps(mp) + "\n" for mp in MPS)
+    result = CliRunner().invoke(cli.cli, ["encode"], input=jsonlines.encode("utf-8"))
+    assert result.exit_code == 0, result.output
+
+    assert len(result.output) < len(jsonlines)
+    assert convert(result.output) == convert(json.dumps(MPS))
+
+
+def test_sort_by_id():
+    """Test whether the external sort merges the sorted chunks correctly."""
+    items = [{"id": str(i)} for i in [5, 3, 9, 1, 7, 2, 8, 4, 6, 0]]
+
+    result = list(cli.sort_by_id(iter(items), buffer_size=3))
+
+    assert [int(i["id"]) for i in result] == list(range(10))
+
+
+def test_diff(tmp_path):
+    """Test whether only added, removed and modified MPs are written."""
+    previous = tmp_path / "previous.jl"
+    previous.write_text("".join(json.dumps(mp) + "\n" for mp in MPS), "utf-8")
+    current = [make_mp("14836", "Becher"), make_mp("35520", "Fürst"), MPS[0]]
+    current[0]["state"] = "Wien"
+    current_file = tmp_path / "current.json"
+    current_file.write_text(json.dumps(current), "utf-8")
+
+    result = CliRunner().invoke(cli.cli, ["diff", str(previous), str(current_file)])
+    assert result.exit_code == 0, result.output
+    changes = [json.loads(line) for line in result.output.splitlines()]
+    assert [(c["change"], c["id"]) for c in changes] == [
+        ("removed", "02349"),
+        ("modified", "14836"),
+        ("added", "35520"),
+    ]
+    assert changes[1]["fields"] == {"state": {"old": "Steiermark", "new": "Wien"}}
+
+    result = CliRunner().invoke(
+        cli.cli, ["diff", "--csv", str(previous), str(current_file)]
+    )
+    assert result.exit_code == 0, result.output
+    rows = list(csv.DictReader(io.StringIO(result.output)))
+    assert [(r["change"], r["identifier"], r["changed_fields"]) for r in rows] == [
+        ("removed", "02349", ""),
+        ("modified", "14836", "state"),
+        ("added", "35520", ""),
+    ]
+    assert rows[2]["display_name"] == "Fürst Max (FPÖ)"
+    # Removed MPs only have their identifier.
+    assert {k for k, v in rows[0].items() if v} == {"change", "identifier"}
+
+
+def scrape(tmp_path, *arguments):
+    command = [sys.executable, os.path.abspath(cli.__file__), "scrape", *arguments]
+    subprocess.run(command, check=True, cwd=str(tmp_path))
+
+
+def test_scrape_csv(parlament_server, tmp_path):
+    """Test whether scrape --csv writes the rows of convert-to-csv without a JSON feed."""
+    output = tmp_path / "nationalrat.csv"
+    scrape(tmp_path, "--base", parlament_server.url, "--csv", str(output))
+    jsonlines = tmp_path / "nationalrat.jl"
+    scrape(tmp_path, "--base", parlament_server.url, str(jsonlines))
+
+    with output.open(encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    expected = convert(jsonlines.read_text(encoding="utf-8"))
+
+    assert sorted(r["identifier"] for r in rows) == ["14836", "35468", "51879"]
+    assert sorted(rows, key=lambda r: r["identifier"]) == expected
+
+
+@pytest.mark.parametrize("engine", ["scrapy", "asyncio"])
+def test_scrape_pipe(parlament_server, tmp_path, engine):
+    """Test whether items written to a pipe are flushed one at a time during the crawl."""
+    if engine == "asyncio":
+        pytest.importorskip("aiohttp")
+    held = parlament_server.held["/WWER/PAD_14836/"] = threading.Event()
+    # Ends the crawl if no item arrives while the page is held.
+    timer = threading.Timer(60, held.set)
+    timer.start()
+    command = [sys.executable, os.path.abspath(cli.__file__), "scrape"]
+    command += ["--engine", engine, "--base", parlament_server.url]
+    process = subprocess.Popen(command, cwd=str(tmp_path), stdout=subprocess.PIPE)
+
+    first = process.stdout.readline()
+    crawling = not held.is_set()
+    held.set()
+    timer.cancel()
+    rest = process.communicate()[0]
+
+    assert crawling
+    ids = [
+        json.loads(line.decode("utf-8"))["id"] for line in [first] + rest.splitlines()
+    ]
+    assert ids[0] != "14836"
+    assert sorted(ids) == ["14836", "35468", "51879"]
+
+
+def test_scrape_compressed(parlament_server, tmp_path):
+    """Test whether scrape compresses the feed by the output's extension."""
+    plain = tmp_path / "nationalrat.jl"
+    scrape(tmp_path, "--base", parlament_server.url, str(plain))
+    compressed = tmp_path / "nationalrat.jl.gz"
+    scrape(tmp_path, "--base", parlament_server.url, str(compressed))
+
+    with compressed.open("rb") as f:
+        assert f.read(2) == b"\x1f\x8b"
+    with plain.open("rb") as f, compressed.open("rb") as g:
+        assert sorted(cli.read_items(f), key=lambda mp: mp["id"]) == sorted(
+            cli.read_items(g), key=lambda mp: mp["id"]
+        )
+
+
+def test_scrape_sqlite(parlament_server, tmp_path):
+    """Test whether scrape --sqlite writes the items of the feed to the database."""
+    jsonlines = tmp_path / "nationalrat.jl"
+    database = tmp_path / "nationalrat.db"
+    scrape(
+        tmp_path,
+        "--base",
+        parlament_server.url,
+        "--sqlite",
+        str(database),
+        str(jsonlines),
+    )
+
+    db = MPDatabase(str(database))
+    for item in cli.read_items(jsonlines.open("rb")):
+        assert db.get(item["id"]) == item
+    assert ("35468", "Mitglied") in db.committee_members("A-AS_00001_00834")
+    db.close()
+
+
+def test_convert_to_sqlite(tmp_path):
+    """Test whether items are loaded into the database once."""
+    database = str(tmp_path / "mps.db")
+    jsonlines = "".join(json.dumps(mp) + "\n" for mp in MPS)
+    for _ in range(2):
+        result = CliRunner().invoke(
+            cli.cli, ["convert-to-sqlite", "-", database], input=jsonlines
+        )
+        assert result.exit_code == 0, result.output
+
+    db = MPDatabase(database)
+    assert db.party_members("Freiheitlicher Parlamentsklub (FPÖ)") == [
+        "02349",
+        "14836",
+        "51879",
+    ]
+    db.close()
+
+
+def parse(source, *options):
+    result = CliRunner().invoke(
+        cli.cli, ["parse", str(source), "--backend", "lxml"] + list(options)
+    )
+    assert result.exit_code == 0, result.output
+    return [json.loads(line) for line in result.output.splitlines()]
+
+
+def test_parse_directory(shared_datadir):
+    """Test whether saved MPs' pages are parsed in parallel in the order of the input."""
+    in_pool = parse(shared_datadir, "--workers", "2")
+
+    assert in_pool == parse(shared_datadir, "--workers", "1")
+    assert [mp["page"] for mp in in_pool] == sorted(mp["page"] for mp in in_pool)
+    assert "nationalrat_aktuell.html" not in [mp["page"] for mp in in_pool]
+    hannes = [mp for mp in in_pool if mp["page"] == "nationalrat_hannes.html"][0]
+    assert hannes["kind"] == "personal"
+    assert hannes["salutation"] == "Hannes Amesbauer, BA"
+    assert "A-AS_00001_00834" in hannes["committees"]["Mitglied"]
+    sobotka = [mp for mp in in_pool if mp["page"].startswith("nationalrat_sobotka")]
+    assert [mp["kind"] for mp in sobotka] == ["committees", "president"]
+
+
+def test_parse_tarball(shared_datadir, tmp_path):
+    """Test whether pages in a tarball are parsed in the order of the archive."""
+    names = [
+        "nationalrat_ruth.html",
+        "nationalrat_aktuell.html",
+        "nationalrat_hannes.html",
+    ]
+    tarball = tmp_path / "pages.tar.gz"
+    with tarfile.open(str(tarball), "w:gz") as tar:
+        for name in names:
+            tar.add(str(shared_datadir / name), arcname="pages/" + name)
+
+    mps = parse(tarball, "--workers", "2")
+
+    assert [mp["page"] for mp in mps] == [
+        "pages/nationalrat_ruth.html",
+        "pages/nationalrat_hannes.html",
+    ]
+    assert mps[0]["salutation"] == "Mag. Ruth Becher"
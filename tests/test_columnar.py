@@ -0,0 +1,159 @@
+"""Tests for the columnar export."""
+import json
+
+import pytest
+from click.testing import CliRunner
+
+import cli
+from open_parliament import columnar, pages, parsers
+from open_parliament.records import MP
+
+pyarrow = pytest.importorskip("pyarrow")
+
+MPS = [
+    {
+        "id": "51879",
+        "first_name": "Hannes",
+        "last_name": "Amesbauer",
+        "political_affiliation": "Freiheitlicher Parlamentsklub (FPÖ)",
+        "state": "Steiermark",
+        "emails": ["hannes.amesbauer@parlament.gv.at"],
+        "picture": {"full": "/full.jpg", "thumbnail": "/thumb.jpg"},
+        "mandates": [
+            {"title": "Abgeordneter zum Nationalrat", "party": "FPÖ", "since": "2015"}
+        ],
+        "committees": {
+            "Mitglied": {
+                "A-AS": {"url": "/A-AS/", "name": "Sportausschuss", "since": "2017"}
+            },
+            "Ersatzmitglied": {
+                "A-IA": {"url": "/A-IA/", "name": "Innenausschuss", "since": "2017"}
+            },
+        },
+    },
+    {
+        "id": "14836",
+        "first_name": "Ruth",
+        "last_name": "Becher",
+        "political_affiliation": "Sozialdemokratischer Parlamentsklub (SPÖ)",
+        "state": "Wien",
+        "is_president": False,
+    },
+    {
+        "id": "35520",
+        "first_name": "Susanne",
+        "last_name": "Fürst",
+        "political_affiliation": "Freiheitlicher Parlamentsklub (FPÖ)",
+        "state": "Oberösterreich",
+    },
+]
+
+
+def read_parquet(path):
+    return pyarrow.parquet.ParquetFile(str(path))
+
+
+def to_rows(table):
+    """Return the rows of a table as dictionaries, like Table.to_pylist of pyarrow 7."""
+    columns = table.to_pydict()
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+
+def test_write_parquet(tmp_path):
+    """Test whether all fields are written with lists and dictionary encoded columns."""
+    path = tmp_path / "mps.parquet"
+    assert columnar.write_table(MPS, str(path)) == 3
+
+    table = read_parquet(path).read()
+    rows = to_rows(table)
+    assert [r["id"] for r in rows] == ["51879", "14836", "35520"]
+    assert rows[0]["emails"] == ["hannes.amesbauer@parlament.gv.at"]
+    assert rows[0]["picture"] == {"full": "/full.jpg", "thumbnail": "/thumb.jpg"}
+    assert rows[0]["mandates"][0]["party"] == "FPÖ"
+    assert rows[0]["committees"] == [
+        {
+            "position": "Mitglied",
+            "id": "A-AS",
+            "name": "Sportausschuss",
+            "url": "/A-AS/",
+            "since": "2017",
+        },
+        {
+            "position": "Ersatzmitglied",
+            "id": "A-IA",
+            "name": "Innenausschuss",
+            "url": "/A-IA/",
+            "since": "2017",
+        },
+    ]
+    assert rows[1]["committees"] is None
+    assert rows[1]["is_president"] is False
+    assert pyarrow.types.is_dictionary(table.schema.field("political_affiliation").type)
+
+
+def test_row_groups(tmp_path):
+    """Test whether items are written in row groups of the given size."""
+    path = tmp_path / "mps.parquet"
+    columnar.write_table(iter(MPS), str(path), row_group_size=2)
+
+    parquet = read_parquet(path)
+    assert parquet.metadata.num_row_groups == 2
+    assert parquet.read().column("state").to_pylist() == [
+        "Steiermark",
+        "Wien",
+        "Oberösterreich",
+    ]
+
+
+def test_write_arrow(tmp_path):
+    """Test whether Arrow IPC files contain the same table as Parquet files."""
+    arrow = tmp_path / "mps.arrow"
+    columnar.write_table(MPS, str(arrow), "arrow", row_group_size=2)
+    parquet = tmp_path / "mps.parquet"
+    columnar.write_table(MPS, str(parquet), row_group_size=2)
+
+    reader = pyarrow.ipc.open_file(str(arrow))
+    assert reader.num_record_batches == 2
+    table = reader.read_all()
+    assert table.schema == columnar.make_schema()
+    assert to_rows(table) == to_rows(read_parquet(parquet).read())
+
+
+def scraped_mp(shared_datadir):
+    """Return an MP with the fields of the MPs table and of the personal page."""
+    table = (shared_datadir / "nationalrat_aktuell_full.html").read_text("utf-8")
+    mp = next(mp for mp in pages.iter_table(parsers, table) if mp["id"] == "51879")
+    page = (shared_datadir / "nationalrat_hannes.html").read_text("utf-8")
+    mp.update(pages.parse_personal_page(parsers, parsers.parse_html(page)))
+    return mp.to_dict()
+
+
+def test_round_trip(tmp_path, shared_datadir):
+    """Test whether every field of a scraped item is written and read back."""
+    mp = scraped_mp(shared_datadir)
+    path = tmp_path / "mps.parquet"
+    columnar.write_table([mp], str(path))
+
+    row = to_rows(read_parquet(path).read())[0]
+    assert set(MP.__slots__) <= set(columnar.make_schema().names)
+    assert "in_committees" in mp
+    expected = columnar.mp_to_row(mp)
+    for key in mp:
+        assert row[key] == expected[key], key
+
+
+def test_unknown_field():
+    """Test whether fields that would be dropped are an error."""
+    with pytest.raises(ValueError, match="unknown"):
+        columnar.mp_to_row(dict(MPS[1], unknown=1))
+
+
+def test_convert_command(tmp_path):
+    """Test whether the convert command writes JSON Lines to a Parquet file."""
+    jsonlines = tmp_path / "mps.jl"
+    jsonlines.write_text("".join(json.dumps(mp) + "\n" for mp in MPS), "utf-8")
+    output = tmp_path / "mps.parquet"
+
+    result = CliRunner().invoke(cli.cli, ["convert", str(jsonlines), str(output)])
+    assert result.exit_code == 0, result.output
+    assert read_parquet(output).metadata.num_rows == 3
@@ -0,0 +1,122 @@
+"""Tests for the SQLite database of MPs."""
+import copy
+import sqlite3
+
+from open_parliament.database import MPDatabase
+
+MPS = [
+    {
+        "id": "51879",
+        "first_name": "Hannes",
+        "last_name": "Amesbauer",
+        "political_affiliation": "Freiheitlicher Parlamentsklub (FPÖ)",
+        "state": "Steiermark",
+        "mandates": [
+            {"title": "Abgeordneter zum Nationalrat", "party": "FPÖ", "since": "2015"},
+            {"title": "Abgeordneter zum Landtag", "party": "FPÖ", "since": "2010"},
+        ],
+        "committees": {
+            "Mitglied": {
+                "A-AS": {"url": "/A-AS/", "name": "Sportausschuss", "since": "2017"}
+            },
+            "Ersatzmitglied": {
+                "A-IA": {"url": "/A-IA/", "name": "Innenausschuss", "since": "2017"}
+            },
+        },
+    },
+    {
+        "id": "14836",
+        "first_name": "Ruth",
+        "last_name": "Becher",
+        "political_affiliation": "Sozialdemokratischer Parlamentsklub (SPÖ)",
+        "state": "Wien",
+        "committees": {
+            "Obfrau": {
+                "A-AS": {"url": "/A-AS/", "name": "Sportausschuss", "since": "2018"}
+            }
+        },
+    },
+    {
+        "id": "35520",
+        "first_name": "Susanne",
+        "last_name": "Fürst",
+        "political_affiliation": "Freiheitlicher Parlamentsklub (FPÖ)",
+        "state": "Oberösterreich",
+    },
+]
+
+
+def test_write(tmp_path):
+    """Test whether MPs, mandates and memberships are written and found by the queries."""
+    db = MPDatabase(str(tmp_path / "mps.db"))
+    assert db.write(MPS, batch_size=2) == 3
+
+    assert db.get("51879") == MPS[0]
+    assert db.get("00145") is None
+    assert db.committee_members("A-AS") == [("14836", "Obfrau"), ("51879", "Mitglied")]
+    assert db.party_members("Freiheitlicher Parlamentsklub (FPÖ)") == ["35520", "51879"]
+    assert db.party_members("Freiheitlicher Parlamentsklub (FPÖ)", "Steiermark") == [
+        "51879"
+    ]
+    assert db.connection.execute(
+        "SELECT number, title FROM mandates WHERE mp_id = '51879' ORDER BY number"
+    ).fetchall() == [
+        (0, "Abgeordneter zum Nationalrat"),
+        (1, "Abgeordneter zum Landtag"),
+    ]
+    db.close()
+
+
+def test_indexes(tmp_path):
+    """Test whether the common queries are answered with an index lookup."""
+    db = MPDatabase(str(tmp_path / "mps.db"))
+    queries = [
+        ("SELECT * FROM mps WHERE id = ?", ["51879"]),
+        ("SELECT * FROM mps WHERE political_affiliation = ?", ["FPÖ"]),
+        (
+            "SELECT * FROM mps WHERE political_affiliation = ? AND state = ?",
+            ["FPÖ", "Wien"],
+        ),
+        ("SELECT * FROM mps WHERE state = ?", ["Wien"]),
+        ("SELECT * FROM memberships WHERE committee_id = ?", ["A-AS"]),
+        ("SELECT * FROM mandates WHERE mp_id = ?", ["51879"]),
+    ]
+    for query, parameters in queries:
+        plan = db.connection.execute("EXPLAIN QUERY PLAN " + query, parameters)
+        assert all("USING" in row[-1] for row in plan), query
+    db.close()
+
+
+def test_rewrite_changed(tmp_path):
+    """Test whether re-runs only write the MPs that changed."""
+    path = str(tmp_path / "mps.db")
+    db = MPDatabase(path)
+    db.write(MPS)
+    db.close()
+
+    changed = copy.deepcopy(MPS)
+    del changed[0]["committees"]["Ersatzmitglied"]
+    changed[0]["committees"]["Mitglied"]["A-AS"]["name"] = "Sportausschuss (neu)"
+    db = MPDatabase(path)
+    assert db.write(reversed(changed)) == 1
+    assert db.write(changed) == 0
+
+    assert db.get("51879") == changed[0]
+    assert db.committee_members("A-IA") == []
+    assert db.connection.execute(
+        "SELECT name FROM committees WHERE id = 'A-AS'"
+    ).fetchone() == ("Sportausschuss (neu)",)
+    db.close()
+
+
+def test_large_batch(tmp_path):
+    """Test whether batches with more items than SQLite allows variables are written."""
+    mps = [{"id": str(i), "last_name": "Becher"} for i in range(2500)]
+    db = MPDatabase(str(tmp_path / "mps.db"))
+    if hasattr(db.connection, "setlimit"):
+        # The default limit of SQLite before 3.32.0.
+        db.connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+
+    assert db.write(mps, batch_size=2000) == 2500
+    assert db.write(mps, batch_size=2000) == 0
+    db.close()
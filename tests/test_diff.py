@@ -0,0 +1,65 @@
+"""Tests for the differences between snapshots."""
+from open_parliament.diff import (
+    ADDED,
+    MODIFIED,
+    REMOVED,
+    change_to_row,
+    diff_items,
+    field_changes,
+)
+
+
+def test_field_changes():
+    """Test whether changed, added and removed fields are found."""
+    old = {"id": "51879", "state": "Steiermark", "emails": ["a@parlament.gv.at"]}
+    new = {"id": "51879", "state": "Wien", "title": "BA"}
+
+    assert field_changes(old, new) == {
+        "emails": {"old": ["a@parlament.gv.at"], "new": None},
+        "state": {"old": "Steiermark", "new": "Wien"},
+        "title": {"old": None, "new": "BA"},
+    }
+    assert field_changes(old, dict(old)) == {}
+
+
+def test_diff_items():
+    """Test whether sorted snapshots are compared by id in a single pass."""
+    previous = [
+        {"id": "00145", "state": "Wien"},
+        {"id": "2349", "state": "Tirol"},
+        {"id": "14836", "state": "Wien"},
+    ]
+    current = [
+        {"id": "2349", "state": "Tirol"},
+        {"id": "14836", "state": "Burgenland"},
+        {"id": "51879", "state": "Steiermark"},
+    ]
+
+    assert list(diff_items(iter(previous), iter(current))) == [
+        {"change": REMOVED, "id": "00145"},
+        {
+            "change": MODIFIED,
+            "id": "14836",
+            "fields": {"state": {"old": "Wien", "new": "Burgenland"}},
+            "item": current[1],
+        },
+        {"change": ADDED, "id": "51879", "item": current[2]},
+    ]
+    assert list(diff_items(previous, [])) == [
+        {"change": REMOVED, "id": mp["id"]} for mp in previous
+    ]
+
+
+def test_change_to_row():
+    """Test whether removed MPs are written with only their identifier."""
+    row = {"identifier": "14836", "state": "Burgenland"}
+    changes = diff_items(
+        [{"identifier": "2349"}, {"identifier": "14836", "state": "Wien"}],
+        [row],
+        "identifier",
+    )
+
+    assert [change_to_row(c) for c in changes] == [
+        {"identifier": "2349", "change": REMOVED, "changed_fields": ""},
+        dict(row, change=MODIFIED, changed_fields="state"),
+    ]
@@ -0,0 +1,109 @@
+"""Tests for the asyncio crawl engine."""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from click.testing import CliRunner
+
+pytest.importorskip("aiohttp")
+
+import cli  # noqa: E402
+from open_parliament.engine import Crawler  # noqa: E402
+from open_parliament.records import MP  # noqa: E402
+
+
+def by_id(items):
+    return sorted(items, key=lambda mp: mp["id"])
+
+
+def test_same_items_as_spider(parlament_server, run_spider, shared_datadir):
+    """Test whether the engine scrapes the same items as the spider, fetching every page once."""
+    expected = run_spider("base=" + parlament_server.url)
+    parlament_server.pages["/WWER/NR/ABG/index.shtml?GP=XXV&NRBR=NR"] = (
+        shared_datadir / "synthetic_nationalrat_xxv.html"
+    )
+    parlament_server.pages["/WWER/BR/AKT/index.shtml"] = (
+        shared_datadir / "synthetic_bundesrat.html"
+    )
+    parlament_server.log.clear()
+
+    items = []
+    count = Crawler(
+        base=parlament_server.url, periods="AKT,XXV", chambers="NR,BR"
+    ).crawl(items.append)
+
+    assert count == 3
+    assert all(isinstance(mp, MP) for mp in items)
+    assert by_id(items) == by_id(expected)
+    assert parlament_server.statuses("/WWER/PAD_51879/") == [200]
+    assert parlament_server.statuses("/WWER/PAD_73000/") == [404]
+
+
+def test_broken_page(parlament_server, shared_datadir, caplog):
+    """Test whether an MP whose page can't be parsed is logged and the others are scraped."""
+    parlament_server.pages["/WWER/PAD_35468/"] = (
+        shared_datadir / "nationalrat_sobotka_ausschuesse.html"
+    )
+    crawler = Crawler(base=parlament_server.url)
+
+    items = []
+    count = crawler.crawl(items.append)
+
+    assert count == 2
+    assert sorted(mp["id"] for mp in items) == ["14836", "51879"]
+    assert crawler.errors == 1
+    assert "Error crawling MP 35468" in caplog.text
+
+
+def test_backends(parlament_server):
+    """Test whether both parser backends give the same items."""
+    bs4_items, lxml_items = [], []
+    Crawler(base=parlament_server.url).crawl(bs4_items.append)
+    Crawler(backend="lxml", base=parlament_server.url).crawl(lxml_items.append)
+
+    assert by_id(bs4_items) == by_id(lxml_items)
+
+
+def test_scrape_command(parlament_server, tmp_path):
+    """Test whether scrape --engine asyncio writes JSON Lines and the SQLite database."""
+    database = tmp_path / "mps.db"
+    result = CliRunner().invoke(
+        cli.cli,
+        [
+            "scrape",
+            "--engine",
+            "asyncio",
+            "--base",
+            parlament_server.url,
+            "--sqlite",
+            str(database),
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    items = [json.loads(line) for line in result.output.splitlines()]
+    assert sorted(mp["id"] for mp in items) == ["14836", "35468", "51879"]
+    assert database.exists()
+
+    result = CliRunner().invoke(
+        cli.cli, ["scrape", "--engine", "asyncio", "--store", "pages.db"]
+    )
+    assert result.exit_code == 2
+    assert "doesn't support --store" in result.output
+
+
+def test_scrape_command_logs(parlament_server, tmp_path):
+    """Test whether scrape --engine asyncio logs its summary to stderr."""
+    command = [sys.executable, os.path.abspath(cli.__file__), "scrape"]
+    command += ["--engine", "asyncio", "--base", parlament_server.url]
+    result = subprocess.run(
+        command,
+        check=True,
+        cwd=str(tmp_path),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+
+    assert len(result.stdout.splitlines()) == 3
+    assert b"INFO: Scraped 3 items, 0 errors" in result.stderr
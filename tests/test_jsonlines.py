@@ -0,0 +1,127 @@
+"""Tests for the fast JSON Lines writer and exporters."""
+import gzip
+import io
+import os
+import zlib
+
+import pytest
+
+import cli
+from open_parliament import jsonlines
+from open_parliament.exporters import GzipJsonLinesExporter, JsonLinesExporter
+
+ITEMS = [
+    {"id": str(i), "last_name": "Bißmann", "emails": ["{}@parlament.gv.at".format(i)]}
+    for i in range(2000)
+]
+
+
+def write(compression):
+    output = io.BytesIO()
+    writer = jsonlines.Writer(output, compression)
+    for item in ITEMS:
+        writer.write(item)
+    writer.close()
+    return output.getvalue()
+
+
+@pytest.mark.parametrize("compression", [None, jsonlines.GZIP, jsonlines.ZSTD])
+def test_round_trip(compression):
+    """Test whether written items are read back, decompressed by their magic bytes."""
+    if compression == jsonlines.ZSTD and jsonlines.zstd is None:
+        pytest.skip("zstd is not available")
+    data = write(compression)
+
+    assert list(cli.read_items(io.BytesIO(data))) == ITEMS
+    if compression is not None:
+        assert len(data) < len(write(None)) / 5
+
+
+class Pipe(io.RawIOBase):
+    """A raw stream returning one byte per read, like a slow pipe."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self.data:
+            return 0
+        buffer[0], self.data = self.data[0], self.data[1:]
+        return 1
+
+
+def test_decompress_pipe():
+    """Test whether compressed input is recognised when it arrives a byte at a time."""
+    data = write(jsonlines.GZIP)
+
+    assert list(cli.read_items(io.BufferedReader(Pipe(data)))) == ITEMS
+    assert list(cli.read_items(io.BufferedReader(Pipe(b"")))) == []
+    plain = b'{"id": "1"}\n'
+    assert list(cli.read_items(io.BufferedReader(Pipe(plain)))) == [{"id": "1"}]
+
+
+@pytest.mark.parametrize("compression", [None, jsonlines.GZIP, jsonlines.ZSTD])
+def test_flush_items_to_pipe(compression):
+    """Test whether every item written to a pipe is readable before the writer is closed."""
+    if compression == jsonlines.ZSTD and jsonlines.zstd is None:
+        pytest.skip("zstd is not available")
+    read, write = os.pipe()
+    # Reading fails instead of waiting if nothing was written.
+    os.set_blocking(read, False)
+    with open(read, "rb") as reader, open(write, "wb") as file:
+        writer = jsonlines.Writer(file, compression)
+        writer.write(ITEMS[0])
+        data = os.read(reader.fileno(), 1024)
+        if compression == jsonlines.GZIP:
+            data = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(data)
+        elif compression == jsonlines.ZSTD:
+            data = jsonlines.zstd.ZstdDecompressor().decompress(data)
+        writer.close()
+
+    assert writer.flush_items
+    assert jsonlines.loads(data) == ITEMS[0]
+    assert not jsonlines.Writer(io.BytesIO()).flush_items
+
+
+def test_utf8():
+    """Test whether the lines are UTF-8 without escapes, one item per line."""
+    lines = write(None).splitlines()
+
+    assert len(lines) == len(ITEMS)
+    assert "Bißmann".encode("utf-8") in lines[0]
+
+
+def test_compression_for():
+    assert jsonlines.compression_for("mps.jl.gz") == jsonlines.GZIP
+    assert jsonlines.compression_for("mps.jl.zst") == jsonlines.ZSTD
+    assert jsonlines.compression_for("mps.jl") is None
+    assert jsonlines.compression_for("-") is None
+    with pytest.raises(ValueError):
+        jsonlines.check_compression("bz2")
+
+
+def test_exporters():
+    """Test whether the exporters write the fields to export and end the compressed stream."""
+    output = io.BytesIO()
+    exporter = JsonLinesExporter(output, fields_to_export=["id"])
+    exporter.start_exporting()
+    exporter.export_item(ITEMS[0])
+    exporter.finish_exporting()
+
+    assert output.getvalue().endswith(b"\n")
+    assert jsonlines.loads(output.getvalue()) == {"id": "0"}
+
+    output = io.BytesIO()
+    exporter = GzipJsonLinesExporter(output)
+    exporter.start_exporting()
+    for item in ITEMS[:3]:
+        exporter.export_item(item)
+    exporter.finish_exporting()
+
+    assert not output.closed
+    assert list(cli.read_items(io.BytesIO(gzip.decompress(output.getvalue())))) == (
+        ITEMS[:3]
+    )
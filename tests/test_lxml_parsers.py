@@ -0,0 +1,134 @@
+"""Tests whether the lxml parsers give the same results as the BeautifulSoup parsers."""
+from lxml import etree
+
+import pytest
+from open_parliament import lxml_parsers, pages, parsers
+from open_parliament.parsers import MPS_TABLE_CLASS
+
+TABLE_PAGES = [
+    "nationalrat_aktuell.html",
+    "nationalrat_aktuell_full.html",
+    "synthetic_nationalrat_xxv.html",
+    "synthetic_bundesrat.html",
+]
+PERSONAL_PAGES = [
+    "nationalrat_baumgartner.html",
+    "nationalrat_belakowitsch.html",
+    "nationalrat_belakowitsch_committees.html",
+    "nationalrat_bures.html",
+    "nationalrat_deimek.html",
+    "nationalrat_hammer.html",
+    "nationalrat_hannes.html",
+    "nationalrat_hannes_committees.html",
+    "nationalrat_kitzmueller.html",
+    "nationalrat_lintl.html",
+    "nationalrat_no_comma_dob_pob.html",
+    "nationalrat_ruth.html",
+]
+PRESIDENT_PAGES = ["nationalrat_sobotka_zur_person.html"]
+INTRODUCTION_PAGES = ["nationalrat_sobotka_excerpt.html"]
+COMMITTEE_PAGES = [
+    p for p in PERSONAL_PAGES if p != "nationalrat_no_comma_dob_pob.html"
+] + ["nationalrat_sobotka_ausschuesse.html"]
+
+
+def read(shared_datadir, path):
+    return (shared_datadir / path).read_text(encoding="utf-8")
+
+
+def test_all_fixtures_covered(shared_datadir):
+    """Test whether every page in the data directory is checked by a conformance test."""
+    covered = set(TABLE_PAGES + PERSONAL_PAGES + PRESIDENT_PAGES + COMMITTEE_PAGES)
+    covered.update(INTRODUCTION_PAGES)
+    assert {p.name for p in shared_datadir.glob("*.html")} == covered
+
+
+@pytest.mark.parametrize("path", TABLE_PAGES)
+def test_rows(shared_datadir, path):
+    html = read(shared_datadir, path)
+    table = parsers.parse_html(html).find("table", class_=MPS_TABLE_CLASS)
+    expected = [parsers.Row(row).parse() for row in table.find_all("tr")]
+
+    rows = etree.XPath("//table[contains(@class, $class)]//tr")
+    page = lxml_parsers.parse_html(html)
+    result = [
+        lxml_parsers.Row(row).parse()
+        for row in rows(page, **{"class": MPS_TABLE_CLASS})
+    ]
+
+    assert len([mp for mp in expected if mp]) > 0
+    assert result == expected
+
+
+@pytest.mark.parametrize("path", TABLE_PAGES)
+def test_show_all_link(shared_datadir, path):
+    """Test whether only a table split into pages has a link to the whole table."""
+    html = read(shared_datadir, path)
+    expected = parsers.find_show_all_link(parsers.parse_html(html))
+
+    assert (expected is not None) == (path == "nationalrat_aktuell.html")
+    assert lxml_parsers.find_show_all_link(lxml_parsers.parse_html(html)) == expected
+
+
+@pytest.mark.parametrize("backend", [parsers, lxml_parsers])
+def test_missing_table(shared_datadir, backend):
+    """Test whether a page without an MPs table has no rows and no link."""
+    page = backend.parse_html(read(shared_datadir, "nationalrat_hannes.html"))
+
+    assert list(backend.find_table_rows(page)) == []
+    assert backend.find_show_all_link(page) is None
+
+
+@pytest.mark.parametrize("path", TABLE_PAGES)
+@pytest.mark.parametrize("backend", [parsers, lxml_parsers])
+def test_iter_table_rows(shared_datadir, path, backend):
+    """Test whether rows parsed incrementally give the same results as rows of a whole tree."""
+    html = read(shared_datadir, path)
+    page = parsers.parse_html(html)
+    expected = [parsers.Row(row).parse() for row in parsers.find_table_rows(page)]
+
+    body = (shared_datadir / path).read_bytes()
+    assert [backend.Row(r).parse() for r in backend.iter_table_rows(body)] == expected
+    assert [backend.Row(r).parse() for r in backend.iter_table_rows(html)] == expected
+
+
+def test_iter_table_rows_discards_rows(shared_datadir):
+    """Test whether rows are discarded while the table is parsed."""
+    body = (shared_datadir / "nationalrat_aktuell_full.html").read_bytes()
+    rows = lxml_parsers.iter_table_rows(body)
+    first = next(rows)
+    table = first.getparent()
+
+    for row in rows:
+        assert len(table) <= 2
+    assert len(first) == 0
+
+
+@pytest.mark.parametrize(
+    "path, is_president",
+    [(p, False) for p in PERSONAL_PAGES] + [(p, True) for p in PRESIDENT_PAGES],
+)
+def test_personal_page(shared_datadir, path, is_president):
+    html = read(shared_datadir, path)
+    expected = parsers.PersonalPage(html).parse(is_president)
+    assert lxml_parsers.PersonalPage(html).parse(is_president) == expected
+
+
+@pytest.mark.parametrize("backend", [parsers, lxml_parsers])
+@pytest.mark.parametrize(
+    "path, is_president",
+    [(p, False) for p in PERSONAL_PAGES] + [(p, True) for p in INTRODUCTION_PAGES],
+)
+def test_is_president_page(shared_datadir, path, is_president, backend):
+    """Test whether the first president is recognised by the introduction on their page."""
+    document = backend.parse_html(read(shared_datadir, path))
+    assert backend.is_president_page(document) is is_president
+    assert pages.parse_personal_page(backend, document)["is_president"] is is_president
+
+
+@pytest.mark.parametrize("path", COMMITTEE_PAGES)
+def test_committees_page(shared_datadir, path):
+    html = read(shared_datadir, path)
+    expected = parsers.CommitteesPage(html).parse()
+    assert expected["committees"]
+    assert lxml_parsers.CommitteesPage(html).parse() == expected
@@ -0,0 +1,65 @@
+"""Tests for the metrics of a crawl."""
+from open_parliament.metrics import Metrics
+
+
+class Stats(dict):
+    def set_value(self, key, value):
+        self[key] = value
+
+
+def test_histogram():
+    """Test whether values are counted in cumulative buckets."""
+    metrics = Metrics()
+    for value in [0.0001, 0.003, 0.003, 20]:
+        metrics.observe("parser_seconds", value, parser="Row.parse")
+
+    histogram = metrics.get("parser_seconds", parser="Row.parse")
+    assert histogram.count == 4
+    assert histogram.max == 20
+    buckets = dict(histogram.cumulative())
+    assert buckets[0.0005] == 1
+    assert buckets[0.005] == 3
+    assert buckets[10] == 3
+    assert buckets[float("inf")] == 4
+
+
+def test_timed_iter():
+    """Test whether the time spent in a generator is observed once it is consumed."""
+    metrics = Metrics()
+    items = metrics.timed_iter(iter(range(3)), "callback_seconds", callback="parse")
+
+    assert metrics.get("callback_seconds", callback="parse") is None
+    assert list(items) == [0, 1, 2]
+    assert metrics.get("callback_seconds", callback="parse").count == 1
+
+
+def test_stats_and_prometheus(tmp_path):
+    """Test whether the metrics are added to Scrapy's stats and written as a textfile."""
+    metrics = Metrics()
+    metrics.observe("parser_seconds", 0.002, parser='Personal"Page')
+    metrics.inc("parsed_bytes_total", 100, kind="personal")
+    metrics.inc("parsed_bytes_total", 50, kind="personal")
+    metrics.inc("items_total")
+    metrics.finish()
+
+    stats = Stats()
+    metrics.to_stats(stats)
+    assert stats['open_parliament/parser_seconds/Personal"Page/count'] == 1
+    assert stats["open_parliament/parsed_bytes_total/personal"] == 150
+    assert stats["open_parliament/items_per_second"] > 0
+
+    path = tmp_path / "nationalrat.prom"
+    metrics.write_textfile(str(path))
+    lines = path.read_text().splitlines()
+    assert "# TYPE open_parliament_parser_seconds histogram" in lines
+    assert (
+        'open_parliament_parser_seconds_bucket{parser="Personal\\"Page",le="0.0025"} 1'
+        in lines
+    )
+    assert (
+        'open_parliament_parser_seconds_bucket{parser="Personal\\"Page",le="+Inf"} 1'
+        in lines
+    )
+    assert 'open_parliament_parsed_bytes_total{kind="personal"} 150' in lines
+    assert "open_parliament_items_total 1" in lines
+    assert [p.name for p in tmp_path.iterdir()] == ["nationalrat.prom"]
@@ -1,3 +1,6 @@
+from open_parliament import parsers
+
+
 def test_mps(mps_base):
     """Test whether the MPs are scraped correctly."""
     hannes = {
@@ -34,3 +37,16 @@ def test_name_parsing(mps_base):
     assert klaus["first_name"] == "Klaus Uwe"
     assert klaus["last_name"] == "Feichtinger"
     assert klaus["title"] == "Mag. Dr."
+
+
+def test_scoped_table(shared_datadir):
+    """Test whether parsing only the MPs table gives the same rows as the whole page."""
+    html = (shared_datadir / "nationalrat_aktuell_full.html").read_text(
+        encoding="utf-8"
+    )
+    table = parsers.parse_html(html, scope="table")
+    page = parsers.parse_html(html, scope=None)
+
+    assert [c.name for c in table.children if c.name] == ["table"]
+    rows = [parsers.Row(r).parse() for r in parsers.find_table_rows(table)]
+    assert rows == [parsers.Row(r).parse() for r in parsers.find_table_rows(page)]
@@ -1,5 +1,6 @@
 """Tests for scraping the pages of single MPs."""
-from open_parliament.parsers import PersonalPage
+import pytest
+from open_parliament.parsers import PersonalPage, parse_html
 
 
 def test_president_details(parse_page):
@@ -148,6 +149,7 @@ def test_hannes_mp(parse_page):
 
     hannes = {
         "is_president": False,
+        "in_committees": True,
         "salutation": "Hannes Amesbauer, BA",
         "emails": ["hannes.amesbauer@parlament.gv.at", "hannes.amesbauer@fpoe.at"],
         "address": "Freiheitlicher Parlamentsklub\nDr. Karl Renner-Ring 3\n1017 Wien",
@@ -291,3 +293,32 @@ def test_baumgartner(parse_page):
         is_president=False,
     )
     assert mp["emails"][0] == "angela.baumgartner@parlament.gv.at"
+
+
+def test_parsed_document(shared_datadir):
+    """Test whether an already parsed document gives the same result as its text."""
+    html = (shared_datadir / "nationalrat_ruth.html").read_text(encoding="utf-8")
+    soup = parse_html(html)
+
+    assert parse_html(soup) is soup
+    assert PersonalPage(soup).parse(False) == PersonalPage(html).parse(False)
+
+
+@pytest.mark.parametrize(
+    "path, is_president",
+    [
+        ("nationalrat_bures.html", False),
+        ("nationalrat_hannes.html", False),
+        ("nationalrat_sobotka_zur_person.html", True),
+    ],
+)
+def test_scoped_parsing(shared_datadir, path, is_president):
+    """Test whether parsing only the main content gives the same result as the whole page."""
+    html = (shared_datadir / path).read_text(encoding="utf-8")
+    content = parse_html(html)
+
+    assert content.find("script") is None
+    assert content.find(id="content") is not None
+    assert PersonalPage(content).parse(is_president) == PersonalPage(
+        parse_html(html, scope=None)
+    ).parse(is_president)
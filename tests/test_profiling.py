@@ -0,0 +1,32 @@
+"""Tests for the profiling of the parsers."""
+import tracemalloc
+
+from open_parliament import pages, profiling
+
+
+def test_profile_parsers(shared_datadir):
+    """Test whether every parser is profiled and reported separately."""
+    html = (shared_datadir / "nationalrat_hannes.html").read_text(encoding="utf-8")
+    expected = pages.parse_page("bs4", pages.PERSONAL, html)
+
+    profiler = profiling.enable(snapshot_every=2)
+    try:
+        for _ in range(3):
+            assert pages.parse_page("bs4", pages.PERSONAL, html) == expected
+    finally:
+        profiling.disable()
+    pages.parse_page("bs4", pages.PERSONAL, html)
+
+    assert sorted(profiler.parsers) == [
+        "CommitteesPage.parse",
+        "PersonalPage.parse",
+        "parse_html",
+    ]
+    assert profiler.parsers["PersonalPage.parse"].calls == 3
+    assert profiler.parsers["PersonalPage.parse"].snapshots == 2
+    assert not tracemalloc.is_tracing()
+
+    report = profiler.report(top=5)
+    assert "PersonalPage.parse: 3 calls, allocations traced in 2" in report
+    assert "parsers.py" in report and "(parse)" in report
+    assert "KiB" in report
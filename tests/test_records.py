@@ -0,0 +1,112 @@
+"""Tests for the records of MPs' data."""
+import json
+import pickle
+
+import pytest
+from open_parliament import jsonlines
+from open_parliament.database import serialize
+from open_parliament.records import (
+    MP,
+    CommitteeMembership,
+    Mandate,
+    Picture,
+    json_default,
+)
+
+DATA = {
+    "id": "51879",
+    "salutation": "Hannes Amesbauer, BA",
+    "picture": {"full": "/full.jpg", "thumbnail": "/thumbnail.jpg"},
+    "mandates": [
+        {"title": "Abgeordneter zum Nationalrat", "party": "FPÖ", "since": "2015"}
+    ],
+    "committees": {
+        "Mitglied": {
+            "A-AS_00001_00834": {
+                "url": "/A-AS/",
+                "name": "Sportausschuss",
+                "since": "2017",
+            }
+        }
+    },
+}
+
+
+def make_mp():
+    return MP(
+        id="51879",
+        salutation="Hannes Amesbauer, BA",
+        picture=Picture(full="/full.jpg", thumbnail="/thumbnail.jpg"),
+        mandates=[
+            Mandate(title="Abgeordneter zum Nationalrat", party="FPÖ", since="2015")
+        ],
+        committees={
+            "Mitglied": {
+                "A-AS_00001_00834": CommitteeMembership(
+                    url="/A-AS/", name="Sportausschuss", since="2017"
+                )
+            }
+        },
+    )
+
+
+def test_mapping():
+    """Test whether records behave like dictionaries of their set fields."""
+    mp = make_mp()
+
+    assert mp == DATA
+    assert sorted(mp) == sorted(DATA)
+    assert "occupation" not in mp
+    assert mp.get("occupation") is None
+    with pytest.raises(KeyError):
+        mp["occupation"]
+    assert not hasattr(mp, "__dict__")
+
+
+def test_update():
+    """Test whether MPs are merged from several parsers' records."""
+    mp = MP(id="51879")
+    mp.update(MP(salutation="Hannes Amesbauer, BA", emails=[]))
+    mp["occupation"] = "Vertragsbediensteter"
+
+    assert mp == {
+        "id": "51879",
+        "salutation": "Hannes Amesbauer, BA",
+        "emails": [],
+        "occupation": "Vertragsbediensteter",
+    }
+    assert mp.pop("emails") == []
+    with pytest.raises(KeyError):
+        mp["unknown"] = 1
+
+
+def test_to_dict():
+    """Test whether records are converted to plain dictionaries and back."""
+    data = make_mp().to_dict()
+
+    assert type(data["picture"]) is dict
+    assert type(data["committees"]["Mitglied"]["A-AS_00001_00834"]) is dict
+    assert json.loads(json.dumps(data)) == DATA
+    assert MP.from_dict(data) == make_mp()
+    assert isinstance(MP.from_dict(data)["mandates"][0], Mandate)
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_json(monkeypatch, fast):
+    """Test whether records are written as JSON without converting them first."""
+    if not fast:
+        monkeypatch.setattr(jsonlines, "orjson", None)
+
+    assert jsonlines.loads(jsonlines.dumps(make_mp())) == DATA
+    assert json.loads(json.dumps(make_mp(), default=json_default)) == DATA
+    assert serialize(make_mp()) == serialize(DATA)
+    with pytest.raises(TypeError):
+        json.dumps({"id": object()}, default=json_default)
+
+
+def test_pickle():
+    """Test whether records can be sent to and from worker processes."""
+    mp = pickle.loads(pickle.dumps(make_mp()))
+
+    assert mp == DATA
+    assert "occupation" not in mp
@@ -0,0 +1,94 @@
+"""Tests for replaying a crawl from recorded responses."""
+import gzip
+import json
+import os
+import subprocess
+import sys
+
+import cli
+from open_parliament.warc import WarcArchive
+
+
+def warc_record(url, body):
+    """Build a gzip compressed WARC response record."""
+    http = b"".join(
+        [
+            b"HTTP/1.1 200 OK\r\n",
+            b"Content-Type: text/html; charset=utf-8\r\n",
+            b"Transfer-Encoding: chunked\r\n\r\n",
+            "{:x}\r\n".format(len(body)).encode("ascii"),
+            body,
+            b"\r\n0\r\n\r\n",
+        ]
+    )
+    head = (
+        "WARC/1.0\r\n"
+        "WARC-Type: response\r\n"
+        "WARC-Target-URI: {}\r\n"
+        "Content-Type: application/http; msgtype=response\r\n"
+        "Content-Length: {}\r\n\r\n"
+    ).format(url, len(http))
+    return gzip.compress(head.encode("utf-8") + http + b"\r\n\r\n")
+
+
+def write_warc(path, pages):
+    warcinfo = b"WARC/1.0\r\nWARC-Type: warcinfo\r\nContent-Length: 0\r\n\r\n\r\n\r\n"
+    with open(str(path), "wb") as f:
+        f.write(gzip.compress(warcinfo))
+        for url, page in pages.items():
+            f.write(warc_record(url, page.read_bytes()))
+
+
+def scrape(tmp_path, *arguments):
+    output = tmp_path / "items.jl"
+    command = [sys.executable, os.path.abspath(cli.__file__), "scrape", str(output)]
+    subprocess.run(command + list(arguments), check=True, cwd=str(tmp_path))
+    with output.open(encoding="utf-8") as f:
+        items = [json.loads(line) for line in f]
+    output.unlink()
+    return sorted(items, key=lambda mp: mp["id"])
+
+
+def test_warc_archive(parlament_pages, tmp_path):
+    """Test whether responses are found in a WARC file regardless of the query order."""
+    path = tmp_path / "crawl.warc.gz"
+    write_warc(path, parlament_pages)
+
+    hannes = "https://www.parlament.gv.at/WWER/PAD_51879/"
+    archive = WarcArchive(str(path))
+    status, headers, body = archive.get(hannes)
+    show_all = [u for u in parlament_pages if "?" in u][0]
+    base, query = show_all.split("?")
+    reordered = base + "?" + "&".join(reversed(query.split("&")))
+
+    assert len(archive) == len(parlament_pages)
+    assert status == 200
+    assert ("Content-Type", b"text/html; charset=utf-8") in headers
+    assert body == parlament_pages[hannes].read_bytes()
+    assert archive.get(reordered)[2] == parlament_pages[show_all].read_bytes()
+    assert archive.get("https://www.parlament.gv.at/WWER/PAD_00145/") is None
+    archive.close()
+
+
+def test_replay_warc(parlament_pages, tmp_path):
+    """Test whether a crawl can be replayed from a WARC file."""
+    path = tmp_path / "crawl.warc.gz"
+    write_warc(path, parlament_pages)
+
+    items = scrape(tmp_path, "--replay", str(path))
+
+    assert [mp["id"] for mp in items] == ["14836", "35468", "51879"]
+    assert items[2]["occupation"] == "Vertragsbediensteter"
+
+
+def test_replay_http_cache(parlament_server, tmp_path):
+    """Test whether a crawl recorded in the HTTP cache can be replayed without requests."""
+    cache = str(tmp_path / "cache")
+
+    recorded = scrape(tmp_path, "--base", parlament_server.url, "--record", cache)
+    requests = len(parlament_server.log)
+    replayed = scrape(tmp_path, "--base", parlament_server.url, "--replay", cache)
+
+    assert [mp["id"] for mp in recorded] == ["14836", "35468", "51879"]
+    assert replayed == recorded
+    assert len(parlament_server.log) == requests
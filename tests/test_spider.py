@@ -0,0 +1,269 @@
+"""Tests for the callbacks of the Nationalrat spider."""
+import json
+from unittest.mock import patch
+
+import scrapy
+
+import pytest
+from open_parliament import parsers
+from spider import NationalratsSpider
+
+
+def test_mp_committees_from_personal_page(spider_response):
+    """Test whether an MP's committees are parsed without downloading the personal page again."""
+    spider = NationalratsSpider()
+    response = spider_response(
+        "/WWER/PAD_51879/",
+        "nationalrat_hannes.html",
+        meta={"mp": {"id": "51879", "url": "/WWER/PAD_51879/"}},
+    )
+
+    output = list(spider.parse_mp(response))
+
+    assert len(output) == 1
+    mp = output[0]
+    assert not isinstance(mp, scrapy.Request)
+    assert mp["salutation"] == "Hannes Amesbauer, BA"
+    assert sorted(mp["committees"]) == ["Ersatzmitglied", "Mitglied"]
+    assert "A-AS_00001_00834" in mp["committees"]["Mitglied"]
+
+
+def test_president_committees_request(spider_response):
+    """Test whether the president's committees are requested from their own page."""
+    spider = NationalratsSpider()
+    response = spider_response(
+        "/WWER/PAD_88386/zurPerson.shtml",
+        "nationalrat_sobotka_zur_person.html",
+        meta={"mp": {"id": "88386", "url": "/WWER/PAD_88386/"}},
+    )
+
+    output = list(spider.parse_president(response))
+
+    assert len(output) == 1
+    request = output[0]
+    assert request.url == spider.BASE + "/WWER/PAD_88386/ausschuesse.shtml"
+    assert request.meta["mp"]["salutation"] == "Mag. Wolfgang Sobotka"
+
+
+def test_personal_page_parsed_once(spider_response):
+    """Test whether the personal page is parsed only once for details and committees."""
+    spider = NationalratsSpider()
+    response = spider_response(
+        "/WWER/PAD_35468/",
+        "nationalrat_belakowitsch.html",
+        meta={"mp": {"id": "35468", "url": "/WWER/PAD_35468/"}},
+    )
+
+    with patch.object(
+        parsers, "BeautifulSoup", wraps=parsers.BeautifulSoup
+    ) as beautiful_soup:
+        [mp] = spider.parse_mp(response)
+
+    assert beautiful_soup.call_count == 1
+    assert mp["websites"] == ["http://www.fpoe-parlamentsklub.at/"]
+    assert "Obmannstellvertreterin" in mp["committees"]
+
+
+def test_single_page_table_parsed_once(spider_response):
+    """Test whether a table without a link to the whole table is parsed only once."""
+    spider = NationalratsSpider()
+    response = spider_response("/WWER/BR/AKT/index.shtml", "synthetic_bundesrat.html")
+
+    with patch.object(
+        parsers, "BeautifulSoup", wraps=parsers.BeautifulSoup
+    ) as beautiful_soup:
+        requests = list(spider.parse(response))
+
+    assert beautiful_soup.call_count == 1
+    assert [r.meta["mp"]["id"] for r in requests] == ["02819", "73000", "84060"]
+
+
+@pytest.mark.parametrize("backend", ["bs4", "lxml"])
+def test_backends(spider_response, backend):
+    """Test whether the spider gives the same results with every parser backend."""
+    spider = NationalratsSpider(backend=backend)
+    table = spider_response("/WWER/NR/AKT/index.shtml", "nationalrat_aktuell_full.html")
+    requests = list(spider.parse_table(table))
+    hannes = [r for r in requests if r.meta["mp"]["id"] == "51879"][0]
+    response = spider_response(
+        "/WWER/PAD_51879/", "nationalrat_hannes.html", meta=hannes.meta
+    )
+
+    [mp] = spider.parse_mp(response)
+
+    assert len(requests) == 183
+    assert hannes.url == spider.BASE + "/WWER/PAD_51879/"
+    assert mp["wahlkreis"] == "6D Obersteiermark"
+    assert mp["occupation"] == "Vertragsbediensteter"
+    assert "A-WI_00001_00857" in mp["committees"]["Ersatzmitglied"]
+
+
+def test_unchanged_content(spider_response, tmp_path):
+    """Test whether pages with unchanged content are not parsed again."""
+    spider = NationalratsSpider(store=str(tmp_path / "pages.db"))
+
+    def parse_mp():
+        response = spider_response(
+            "/WWER/PAD_51879/",
+            "nationalrat_hannes.html",
+            meta={"mp": {"id": "51879", "url": "/WWER/PAD_51879/"}},
+        )
+        with patch.object(
+            parsers, "BeautifulSoup", wraps=parsers.BeautifulSoup
+        ) as beautiful_soup:
+            [mp] = spider.parse_mp(response)
+        return mp, beautiful_soup.call_count
+
+    first, first_parses = parse_mp()
+    second, second_parses = parse_mp()
+    spider.closed("finished")
+
+    assert (first_parses, second_parses) == (1, 0)
+    assert second == first
+
+
+def test_same_content_other_page(spider_response, tmp_path):
+    """Test whether a page with the same content as another page is parsed on its own."""
+    spider = NationalratsSpider(store=str(tmp_path / "pages.db"))
+
+    def parse_mp(id_):
+        url = "/WWER/PAD_{}/".format(id_)
+        response = spider_response(
+            url, "nationalrat_hannes.html", meta={"mp": {"id": id_, "url": url}}
+        )
+        with patch.object(
+            parsers, "BeautifulSoup", wraps=parsers.BeautifulSoup
+        ) as beautiful_soup:
+            [mp] = spider.parse_mp(response)
+        return mp, beautiful_soup.call_count
+
+    first, first_parses = parse_mp("51879")
+    second, second_parses = parse_mp("84060")
+    spider.closed("finished")
+
+    assert (first_parses, second_parses) == (1, 1)
+    assert (first["id"], second["id"]) == ("51879", "84060")
+
+
+def test_conditional_requests(parlament_server, run_spider, tmp_path):
+    """Test whether unchanged pages are requested conditionally and their items re-emitted."""
+    arguments = ["base=" + parlament_server.url, "store=" + str(tmp_path / "pages.db")]
+
+    first = run_spider(*arguments)
+    second = run_spider(*arguments)
+
+    def by_id(items):
+        return sorted(items, key=lambda mp: mp["id"])
+
+    assert [mp["id"] for mp in by_id(first)] == ["14836", "35468", "51879"]
+    assert by_id(second) == by_id(first)
+    assert parlament_server.statuses("/WWER/PAD_51879/") == [200, 304]
+    assert parlament_server.statuses("/WWER/PAD_14836/") == [200, 304]
+
+
+def test_parse_pool(parlament_server, run_spider, tmp_path):
+    """Test whether parsing in worker processes gives the same items."""
+    arguments = ["base=" + parlament_server.url, "backend=lxml"]
+
+    in_process = run_spider(*arguments)
+    in_pool = run_spider("workers=2", "store=" + str(tmp_path / "pages.db"), *arguments)
+
+    def by_id(items):
+        return sorted(items, key=lambda mp: mp["id"])
+
+    assert len(in_pool) == 3
+    assert by_id(in_pool) == by_id(in_process)
+
+
+def test_table_urls():
+    """Test whether the spider starts with the tables of all periods and chambers."""
+    spider = NationalratsSpider(periods="AKT,XXV", chambers="NR,BR")
+
+    assert spider.start_urls == [
+        spider.BASE + "/WWER/NR/AKT/index.shtml",
+        spider.BASE + "/WWER/NR/ABG/index.shtml?GP=XXV&NRBR=NR",
+        spider.BASE + "/WWER/BR/AKT/index.shtml",
+        spider.BASE + "/WWER/BR/ABG/index.shtml?GP=XXV&NRBR=BR",
+    ]
+
+
+def test_mps_requested_once(spider_response):
+    """Test whether MPs listed in several tables are requested only once."""
+    spider = NationalratsSpider()
+    table = spider_response("/WWER/NR/AKT/index.shtml", "nationalrat_aktuell_full.html")
+
+    first = list(spider.parse_table(table))
+    second = list(spider.parse_table(table))
+
+    assert len(first) == len({r.url for r in first}) == 183
+    assert second == []
+
+
+def test_periods(parlament_server, run_spider, shared_datadir):
+    """Test whether MPs' pages are fetched once when several periods and chambers list them."""
+    xxv = "/WWER/NR/ABG/index.shtml?GP=XXV&NRBR=NR"
+    bundesrat = "/WWER/BR/AKT/index.shtml"
+    parlament_server.pages[xxv] = shared_datadir / "synthetic_nationalrat_xxv.html"
+    parlament_server.pages[bundesrat] = shared_datadir / "synthetic_bundesrat.html"
+
+    items = run_spider(
+        "base=" + parlament_server.url, "periods=AKT,XXV", "chambers=NR,BR"
+    )
+
+    assert sorted(mp["id"] for mp in items) == ["14836", "35468", "51879"]
+    # The tables of the former period and the Bundesrat are on a single page.
+    assert parlament_server.statuses(xxv) == [200]
+    assert parlament_server.statuses(bundesrat) == [200]
+    assert parlament_server.statuses("/WWER/BR/ABG/index.shtml?GP=XXV&NRBR=BR") == [404]
+    # Persons listed only in the former period or the Bundesrat are requested as well.
+    assert parlament_server.statuses("/WWER/PAD_84060/") == [404]
+    assert parlament_server.statuses("/WWER/PAD_73000/") == [404]
+    assert parlament_server.statuses("/WWER/PAD_51879/") == [200]
+
+
+def test_metrics(parlament_server, run_spider, tmp_path):
+    """Test whether the crawl's metrics are written as a Prometheus textfile."""
+    path = tmp_path / "nationalrat.prom"
+    run_spider("base=" + parlament_server.url, "metrics=" + str(path))
+
+    lines = path.read_text().splitlines()
+    for parser in [
+        "parse_html",
+        "Row.parse",
+        "PersonalPage.parse",
+        "CommitteesPage.parse",
+    ]:
+        assert any('{{parser="{}",le="+Inf"}}'.format(parser) in line for line in lines)
+    assert 'open_parliament_callback_seconds_count{callback="parse_table"} 1' in lines
+    assert 'open_parliament_callback_seconds_count{callback="parse_mp"} 3' in lines
+    assert 'open_parliament_page_parse_seconds_count{kind="personal"} 3' in lines
+    assert any(
+        line.startswith("open_parliament_download_seconds_count") for line in lines
+    )
+    assert any(line.startswith("open_parliament_queue_depth_count") for line in lines)
+    assert "open_parliament_items_total 3" in lines
+
+
+def test_trace(parlament_server, run_spider, tmp_path):
+    """Test whether every MP's requests are traced on a track of their own."""
+    path = tmp_path / "trace.json"
+    run_spider("base=" + parlament_server.url, "trace=" + str(path))
+
+    events = json.loads(path.read_text(encoding="utf-8"))["traceEvents"]
+    tracks = {e["tid"]: e["args"]["name"] for e in events if e["name"] == "thread_name"}
+    assert tracks[51879] == "51879 Hannes Amesbauer"
+
+    mp_events = [e for e in events if e.get("tid") == 51879 and e["ph"] != "M"]
+    spans = [(e["name"], e["ph"]) for e in sorted(mp_events, key=lambda e: e["ts"])]
+    assert spans == [
+        ("table row", "i"),
+        ("scheduler", "X"),
+        ("download", "X"),
+        ("parse_mp", "X"),
+        ("item", "i"),
+    ]
+    table_spans = {e["name"] for e in events if e.get("tid") == 0 and e["ph"] == "X"}
+    assert {"scheduler", "download", "parse", "parse_table"} <= table_spans
+    download = next(e for e in events if e["name"] == "download" and e["tid"] == 51879)
+    assert download["args"]["status"] == 200
+    assert download["dur"] > 0
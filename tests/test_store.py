@@ -0,0 +1,65 @@
+"""Tests for the store of previously scraped pages."""
+from open_parliament.store import PageStore, content_hash
+
+
+def test_page_store(tmp_path):
+    """Test whether pages are stored across runs and turned into conditional headers."""
+    path = str(tmp_path / "pages.db")
+    store = PageStore(path)
+    store.put(
+        "/WWER/PAD_51879/",
+        '"abc"',
+        "Thu, 24 Jan 2019 10:00:00 GMT",
+        "1234",
+        {"salutation": "Hannes Amesbauer, BA"},
+    )
+    store.put("/WWER/PAD_14836/", None, None, "5678", {})
+    store.close()
+
+    store = PageStore(path)
+    assert store.get("/WWER/PAD_51879/")["data"] == {
+        "salutation": "Hannes Amesbauer, BA"
+    }
+    assert store.conditional_headers("/WWER/PAD_51879/") == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Thu, 24 Jan 2019 10:00:00 GMT",
+    }
+    assert store.conditional_headers("/WWER/PAD_14836/") == {}
+    assert store.get("/WWER/PAD_00145/") is None
+    store.close()
+
+
+def test_commit_every(tmp_path):
+    """Test whether stored pages are committed before the store is closed."""
+    path = str(tmp_path / "pages.db")
+    store = PageStore(path, commit_every=2)
+    store.put("/WWER/PAD_51879/", None, None, "1234", {})
+    store.put("/WWER/PAD_14836/", None, None, "5678", {})
+    store.put("/WWER/PAD_35468/", None, None, "9012", {})
+
+    # A second connection only sees committed pages, as a new run would after a crash.
+    other = PageStore(path)
+    assert other.get("/WWER/PAD_14836/") is not None
+    assert other.get("/WWER/PAD_35468/") is None
+    other.connection.close()
+    store.close()
+
+
+def test_find(tmp_path):
+    """Test whether stored data is only reused for the same page with the same content."""
+    store = PageStore(str(tmp_path / "pages.db"))
+    store.put("/WWER/PAD_51879/", None, None, "1234", {"id": "51879"})
+
+    assert store.find("/WWER/PAD_51879/", "1234") == {"id": "51879"}
+    assert store.find("/WWER/PAD_51879/", "5678") is None
+    assert store.find("/WWER/PAD_14836/", "1234") is None
+    store.close()
+
+
+def test_content_hash(shared_datadir):
+    """Test whether only the main content of a page is hashed."""
+    body = (shared_datadir / "nationalrat_hannes.html").read_bytes()
+    changed_footer = body.replace(b"</body>", b"<p>Footer</p></body>")
+
+    assert content_hash(body) == content_hash(changed_footer)
+    assert content_hash(body) != content_hash(body.replace(b"Amesbauer", b"Amesbaur"))
@@ -0,0 +1,58 @@
+"""Tests for the shared vocabulary and the dictionary encoded export."""
+import pickle
+
+from open_parliament import vocabulary
+from open_parliament.records import MP, Mandate
+
+MPS = [
+    {
+        "id": "51879",
+        "political_affiliation": "Freiheitlicher Parlamentsklub (FPÖ)",
+        "state": "Steiermark",
+        "mandates": [
+            {"title": "Abgeordneter zum Nationalrat", "party": None, "since": "2015"}
+        ],
+        "committees": {
+            "Mitglied": {
+                "A-AS": {"url": "/A-AS/", "name": "Sportausschuss", "since": "2017"}
+            }
+        },
+    },
+    {
+        "id": "14836",
+        "political_affiliation": "Freiheitlicher Parlamentsklub (FPÖ)",
+        "state": "Wien",
+        "mandates": [],
+        "committees": {
+            "Mitglied": {
+                "A-AS": {"url": "/A-AS/", "name": "Sportausschuss", "since": "2018"}
+            }
+        },
+    },
+]
+
+
+def test_interned_records():
+    """Test whether equal values of records share a single instance."""
+    vocabulary.reset()
+    party = "".join(["F", "PÖ"])
+    first = Mandate(title="Abgeordneter", party=party, since="2015")
+    second = pickle.loads(
+        pickle.dumps(Mandate(title="Abgeordneter", party="FPÖ", since="2017"))
+    )
+    mp = MP(id="51879", state="Wien".lower().title())
+
+    assert second["party"] is first["party"]
+    assert mp["state"] is vocabulary.intern("Wien")
+    assert len(vocabulary.current) == 5
+
+
+def test_encode_items():
+    """Test whether repeated values are written once and the items decoded again."""
+    header, first, second = vocabulary.encode_items(MPS)
+
+    assert vocabulary.is_encoded(header)
+    assert first["political_affiliation"] == second["political_affiliation"] == 0
+    assert second["vocabulary"] == ["Wien", "2018"]
+    assert second["committees"] == {"4": {"5": {"url": 6, "name": 7, "since": 10}}}
+    assert list(vocabulary.decode_items([first, second])) == MPS